@@ -1,43 +1,189 @@
-from flask import Flask, request, jsonify
+import json
+import os
+import threading
+import time
+import weakref
+from flask import Flask, Response, request, jsonify, make_response, g, stream_with_context
 from flask_cors import CORS
 from src.models.Match import Match
+from src.models.Board import Board
+from src.models.ArrayBoard import ArrayBoard
+from src.models.BitBoard import BitBoard
+from src.models.Engine import Engine, MAX_PLY
+from src.models.ParallelEngine import ParallelEngine
+from src.models.OpeningBook import OpeningBook
+from src.models.Tablebase import Tablebase
+from src.models.SessionManager import SessionManager
+from src.models.GameStore import GameStore
+from src.models.AnalysisQueue import AnalysisQueue, QueueFull, FINISHED
+from src.models.PDN import PDNError, setup_match
+from src.models.Notation import parse_position, position_to_chess
+from src.models.Metrics import (registry, instrument_hot_paths, SamplingProfiler, RequestProfiler,
+                               PROMETHEUS_CONTENT_TYPE)
 
 app = Flask(__name__)
 CORS(app)
 
-# Global game instance
-game_match = Match()
-game_match.start_game()
+# Request latency per route for GET /metrics. CHECKERS_HOT_PATH_METRICS=1 also times
+# move validation, move generation and Match.make_move / check_game_over, which adds
+# about 1.5us per call (see benchmarks/metrics_overhead.py); CHECKERS_PROFILING=1
+# opens POST /profile.
+request_seconds = registry.histogram('checkers_http_request_seconds', 'Time spent answering API requests',
+                                     ('method', 'route', 'status'))
+if os.environ.get('CHECKERS_HOT_PATH_METRICS') == '1':
+    instrument_hot_paths()
+PROFILING = os.environ.get('CHECKERS_PROFILING') == '1'
+request_profiler = RequestProfiler()
+profile_window = threading.Lock()
+MAX_PROFILE_SECONDS = 60
 
-def parse_position(pos_str):
-    """Convert chess notation (e.g., 'A1') to row, col coordinates"""
-    if len(pos_str) != 2:
-        return None, None
-    col_char = pos_str[0].upper()
-    row_char = pos_str[1]
-    
-    if col_char not in 'ABCDEFGH' or row_char not in '12345678':
-        return None, None
-    
-    col = ord(col_char) - ord('A')
-    row = 8 - int(row_char)  # Convert to 0-based index from top
-    
-    return row, col
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    request_profiler.enter()
 
-def position_to_chess(row, col):
-    """Convert row, col coordinates to chess notation"""
-    col_char = chr(ord('A') + col)
-    row_char = str(8 - row)
-    return col_char + row_char
+@app.after_request
+def record_request_time(response):
+    start = g.pop('request_start', None)
+    if start is not None:
+        rule = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        request_seconds.observe(time.perf_counter() - start, request.method, rule, response.status_code)
+    return response
 
-@app.route('/board', methods=['GET'])
-def get_board():
-    """Get current board state"""
+@app.teardown_request
+def stop_request_profile(error):
+    request_profiler.leave()
+
+# Board engine, chosen with CHECKERS_BOARD=list|bitboard|array
+# (array keeps a byte per square: the smallest games, slower move generation)
+BOARD_CLASSES = {'list': Board, 'bitboard': BitBoard, 'array': ArrayBoard}
+BOARD_CLASS = BOARD_CLASSES.get(os.environ.get('CHECKERS_BOARD', 'list'), Board)
+
+# One engine per request thread: an Engine keeps search state and its own hash table.
+# With CHECKERS_ENGINE_WORKERS > 1 every request shares one process pool instead.
+# CHECKERS_OPENING_BOOK names a book file (see opening_book.py) both engines play from,
+# CHECKERS_TABLEBASE an endgame tablebase directory (see tablebase.py) they play endings from.
+ENGINE_WORKERS = int(os.environ.get('CHECKERS_ENGINE_WORKERS', '1'))
+OPENING_BOOK = OpeningBook(os.environ['CHECKERS_OPENING_BOOK']) if os.environ.get('CHECKERS_OPENING_BOOK') else None
+TABLEBASE = Tablebase(os.environ['CHECKERS_TABLEBASE']) if os.environ.get('CHECKERS_TABLEBASE') else None
+parallel_engine = (ParallelEngine(ENGINE_WORKERS, book=OPENING_BOOK, tablebase=TABLEBASE)
+                   if ENGINE_WORKERS > 1 else None)
+engines = threading.local()
+
+# POST /analyze searches run in their own process pool (CHECKERS_ANALYSIS_WORKERS,
+# default one per CPU) with at most CHECKERS_ANALYSIS_QUEUE jobs waiting
+analysis = AnalysisQueue(
+    workers=int(os.environ.get('CHECKERS_ANALYSIS_WORKERS', '0')) or None,
+    max_queued=int(os.environ.get('CHECKERS_ANALYSIS_QUEUE', '1000')),
+    book=OPENING_BOOK,
+    tablebase=TABLEBASE,
+)
+
+def get_engine():
+    if parallel_engine is not None:
+        return parallel_engine
+    if not hasattr(engines, 'engine'):
+        engines.engine = Engine(book=OPENING_BOOK, tablebase=TABLEBASE)
+    return engines.engine
+
+# CHECKERS_STORE names a directory where every game and accepted move is journaled,
+# so a restarted server (or another process taking over) resumes the games in progress.
+# CHECKERS_STORE_FSYNC=0 trades the last moves before a crash for write speed.
+STORE = (GameStore(os.environ['CHECKERS_STORE'], fsync=os.environ.get('CHECKERS_STORE_FSYNC', '1') != '0')
+         if os.environ.get('CHECKERS_STORE') else None)
+recovered_games = STORE.recover(BOARD_CLASS) if STORE is not None else {}
+GLOBAL_GAME_ID = '0' * 32   # store ID of the game behind /board, /move, ...
+
+# Games hosted side by side, sized with CHECKERS_MAX_GAMES / CHECKERS_MAX_MEMORY_MB
+# and dropped after CHECKERS_IDLE_TIMEOUT seconds without requests
+max_memory_mb = os.environ.get('CHECKERS_MAX_MEMORY_MB')
+sessions = SessionManager(
+    max_games=int(os.environ.get('CHECKERS_MAX_GAMES', '10000')),
+    idle_timeout=float(os.environ.get('CHECKERS_IDLE_TIMEOUT', '3600')),
+    max_memory_bytes=int(max_memory_mb) * 1024 * 1024 if max_memory_mb else None,
+    board_class=BOARD_CLASS,
+    store=STORE,
+)
+
+# Global game instance, read and changed only under game_lock like a session's game
+game_lock = threading.Lock()
+game_match = recovered_games.pop(GLOBAL_GAME_ID, None)
+resumed = game_match is not None
+if not resumed:
+    game_match = Match(BOARD_CLASS)
+    game_match.start_game()
+if STORE is not None:
+    STORE.attach(GLOBAL_GAME_ID, game_match, game_lock, new=not resumed)
+sessions.restore(recovered_games)
+
+# Callables run with the new Match whenever /reset replaces the global game
+reset_hooks = []
+if STORE is not None:
+    reset_hooks.append(lambda match: STORE.attach(GLOBAL_GAME_ID, match, game_lock))
+
+# Serialized /board body per match, reused until the match's version changes
+board_snapshots = weakref.WeakKeyDictionary()
+MAX_LONG_POLL_SECONDS = 30
+
+def wait_for_board_change(match):
+    """Hold a ?wait_for_version=N&timeout=S request until the board moves past version N"""
+    wait_for = request.args.get('wait_for_version', type=int)
+    if wait_for is not None:
+        timeout = min(request.args.get('timeout', default=MAX_LONG_POLL_SECONDS, type=float), MAX_LONG_POLL_SECONDS)
+        match.wait_for_version(wait_for, max(timeout, 0))
+
+# ?format= of board responses: body builder and content type. fen and bytes are the
+# compact Board.to_fen / Board.to_bytes encodings of the position and side to move
+BOARD_FORMATS = {
+    'json': (lambda match: board_json(match), 'application/json'),
+    'fen': (lambda match: board_compact_json(match), 'application/json'),
+    'bytes': (lambda match: match.board.to_bytes(match.get_current_player_color()), 'application/octet-stream'),
+}
+
+def board_response(match):
+    """Board state of a match (?format=json|fen|bytes), with an ETag from its version"""
+    board_format = request.args.get('format', 'json')
+    if board_format not in BOARD_FORMATS:
+        return jsonify({'error': f"format must be one of {', '.join(BOARD_FORMATS)}"}), 400
+    version = match.version
+    etag = f'{match.instance_id}-{version}' + ('' if board_format == 'json' else f'-{board_format}')
+    if request.if_none_match.contains(etag):
+        response = make_response('', 304)
+        response.set_etag(etag)
+        return response
+
+    cached = board_snapshots.get(match)
+    if cached is None or cached[0] != version:
+        cached = (version, {})
+        board_snapshots[match] = cached
+    body = cached[1].get(board_format)
+    build, mimetype = BOARD_FORMATS[board_format]
+    if body is None:
+        body = cached[1][board_format] = build(match)
+    response = make_response(body)
+    response.mimetype = mimetype
+    response.set_etag(etag)
+    if board_format == 'bytes':
+        # The packed board holds the position only; the rest of the state travels in headers
+        response.headers['X-Game-Over'] = str(match.is_game_over()).lower()
+        response.headers['X-Winner'] = match.get_winner() or ''
+        response.headers['X-Board-Version'] = str(version)
+    return response
+
+def board_compact_json(match):
+    return jsonify({
+        'fen': match.board.to_fen(match.get_current_player_color()),
+        'game_over': match.is_game_over(),
+        'winner': match.get_winner(),
+        'version': match.version
+    }).get_data()
+
+def board_json(match):
     board_state = []
     for row in range(8):
         row_data = []
         for col in range(8):
-            piece = game_match.board.get_piece(row, col)
+            piece = match.board.get_piece(row, col)
             if piece:
                 row_data.append({
                     'color': piece.color,
@@ -50,15 +196,15 @@ def get_board():
     
     return jsonify({
         'board': board_state,
-        'current_player': game_match.get_current_player_color(),
-        'game_over': game_match.is_game_over(),
-        'winner': game_match.get_winner()
-    })
+        'current_player': match.get_current_player_color(),
+        'game_over': match.is_game_over(),
+        'winner': match.get_winner(),
+        'version': match.version
+    }).get_data()
 
-@app.route('/move', methods=['POST'])
-def make_move():
-    """Make a move"""
-    data = request.get_json()
+def move_response(match):
+    """Apply the move in the request body to a match"""
+    data = request.get_json(silent=True)
     
     if not data or 'player' not in data or 'from' not in data or 'to' not in data:
         return jsonify({'error': 'Missing required fields: player, from, to'}), 400
@@ -68,7 +214,7 @@ def make_move():
     to_pos = data['to']
     
     # Validate player turn
-    if player != game_match.get_current_player_color():
+    if player != match.get_current_player_color():
         return jsonify({'error': f'Not {player}\'s turn'}), 400
     
     # Parse positions
@@ -79,20 +225,89 @@ def make_move():
         return jsonify({'error': 'Invalid position format. Use A1-H8'}), 400
     
     # Make the move
-    if game_match.make_move(from_row, from_col, to_row, to_col):
+    if match.make_move(from_row, from_col, to_row, to_col):
         return jsonify({
             'success': True,
             'message': f'Move made: {from_pos} -> {to_pos}',
-            'current_player': game_match.get_current_player_color(),
-            'game_over': game_match.is_game_over(),
-            'winner': game_match.get_winner()
+            'current_player': match.get_current_player_color(),
+            'game_over': match.is_game_over(),
+            'winner': match.get_winner()
         })
     else:
         return jsonify({'error': 'Invalid move'}), 400
 
-@app.route('/info', methods=['GET'])
-def get_piece_info():
-    """Get information about a piece at a specific position"""
+# 'A1'..'H8' -> (row, col), so batches look squares up instead of parsing each one
+SQUARES = {position_to_chess(row, col): (row, col) for row in range(8) for col in range(8)}
+
+def parse_batch_move(move):
+    """(from_square, to_square) for 'B6-A5', 'B6xA5', ['B6', 'A5'] or {'from': 'B6', 'to': 'A5'}"""
+    if isinstance(move, str):
+        from_pos, _, to_pos = move.upper().replace('X', '-').partition('-')
+    elif isinstance(move, dict):
+        from_pos, to_pos = move.get('from'), move.get('to')
+    elif isinstance(move, list) and len(move) == 2:
+        from_pos, to_pos = move
+    else:
+        return None, None
+    return SQUARES.get(str(from_pos).strip().upper()), SQUARES.get(str(to_pos).strip().upper())
+
+def apply_batch(match, moves, per_ply):
+    """Play moves in order; returns (applied count, index and reason of the first failure, per-ply results)"""
+    plies = [] if per_ply else None
+    for index, move in enumerate(moves):
+        if match.is_game_over():
+            return index, (index, 'Game is over'), plies
+        from_square, to_square = parse_batch_move(move)
+        if from_square is None or to_square is None:
+            return index, (index, 'Invalid position format. Use A1-H8'), plies
+        if not match.make_move(*from_square, *to_square):
+            return index, (index, 'Invalid move'), plies
+        if per_ply:
+            plies.append({
+                'from': position_to_chess(*from_square),
+                'to': position_to_chess(*to_square),
+                'current_player': match.get_current_player_color(),
+                'game_over': match.is_game_over()
+            })
+    return len(moves), None, plies
+
+def batch_moves(data):
+    """Move list of a batch body: 'moves' (list) or 'record' (space-separated moves), or None"""
+    if not isinstance(data, dict):
+        return None
+    if isinstance(data.get('moves'), list):
+        return data['moves']
+    if isinstance(data.get('record'), str):
+        return data['record'].split()
+    return None
+
+def batch_response(match, moves=None):
+    """Apply a list of moves to a match in one request, stopping at the first illegal one"""
+    data = request.get_json(silent=True)
+    if moves is None:
+        moves = batch_moves(data)
+    if moves is None:
+        return jsonify({'error': 'Missing moves: give "moves" (list) or "record" (string)'}), 400
+
+    applied, failure, plies = apply_batch(match, moves, bool(data.get('results')))
+    body = {
+        'applied': applied,
+        'total': len(moves),
+        'current_player': match.get_current_player_color(),
+        'game_over': match.is_game_over(),
+        'winner': match.get_winner(),
+        'version': match.version
+    }
+    if plies is not None:
+        body['plies'] = plies
+    if failure is not None:
+        body['failed_index'], body['error'] = failure
+        return jsonify(body), 400
+    body['success'] = True
+    return jsonify(body)
+
+def info_response(match):
+    """Information about the piece named in the query string"""
     player = request.args.get('player')
     piece_pos = request.args.get('piece')
     
@@ -103,12 +318,12 @@ def get_piece_info():
     if row is None:
         return jsonify({'error': 'Invalid position format. Use A1-H8'}), 400
     
-    piece = game_match.board.get_piece(row, col)
+    piece = match.board.get_piece(row, col)
     if not piece:
         return jsonify({'error': f'No piece at position {piece_pos}'}), 404
     
     # Get possible moves
-    moves = game_match.get_possible_moves_for_piece(row, col)
+    moves = match.get_possible_moves_for_piece(row, col)
     move_positions = [position_to_chess(move[1][0], move[1][1]) for move in moves]
     
     return jsonify({
@@ -118,17 +333,304 @@ def get_piece_info():
         'possible_moves': move_positions
     })
 
+def engine_move_response(current_match, lock):
+    """Let the computer play the current player's move in the match current_match() returns.
+
+    The search runs on a copy of the board without holding the game's lock, so the
+    game can be read meanwhile; the move is played only if the game is still the
+    one searched, and a 409 tells the client it changed in the meantime.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        time_ms = int(data.get('time_ms', 1000))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'time_ms must be an integer'}), 400
+    if not 1 <= time_ms <= 60000:
+        return jsonify({'error': 'time_ms must be between 1 and 60000'}), 400
+
+    with lock:
+        match = current_match()
+        if match.is_game_over():
+            return jsonify({'error': 'Game is over'}), 400
+        board, color, version = match.board.copy(), match.get_current_player_color(), match.version
+
+    result = get_engine().search(board, color, time_ms=time_ms)
+    if result['move'] is None:
+        return jsonify({'error': 'No legal moves'}), 400
+
+    (from_row, from_col), (to_row, to_col) = result['move']
+    from_pos, to_pos = position_to_chess(from_row, from_col), position_to_chess(to_row, to_col)
+    with lock:
+        if (current_match() is not match or match.version != version
+                or not match.make_move(from_row, from_col, to_row, to_col)):
+            return jsonify({'error': f'The position changed during the search; {from_pos} -> {to_pos} was not played',
+                            'version': match.version}), 409
+        return engine_move_json(match, result, from_pos, to_pos)
+
+def engine_move_json(match, result, from_pos, to_pos):
+    return jsonify({
+        'success': True,
+        'message': f'Move made: {from_pos} -> {to_pos}',
+        'from': from_pos,
+        'to': to_pos,
+        'search': {key: result[key] for key in ('score', 'depth', 'nodes', 'nps', 'time_ms', 'book', 'tablebase')},
+        'current_player': match.get_current_player_color(),
+        'game_over': match.is_game_over(),
+        'winner': match.get_winner()
+    })
+
+def with_global_game(respond):
+    with game_lock:
+        return respond(game_match)
+
+@app.route('/board', methods=['GET'])
+def get_board():
+    """Get current board state (supports If-None-Match and ?wait_for_version=N&timeout=S)"""
+    # Long-poll before taking the game lock, so moves can be made meanwhile
+    wait_for_board_change(game_match)
+    return with_global_game(board_response)
+
+@app.route('/move', methods=['POST'])
+def make_move():
+    """Make a move"""
+    return with_global_game(move_response)
+
+@app.route('/info', methods=['GET'])
+def get_piece_info():
+    """Get information about a piece at a specific position"""
+    return with_global_game(info_response)
+
+@app.route('/moves', methods=['POST'])
+def make_moves():
+    """Make several moves in one request"""
+    return with_global_game(batch_response)
+
+@app.route('/engine/move', methods=['POST'])
+def engine_move():
+    """Let the computer play the current player's move"""
+    return engine_move_response(lambda: game_match, game_lock)
+
+# --- Multi-game sessions: /games/<id>/... run on their own Match under their own lock ---
+
+def with_game(game_id, respond):
+    session = sessions.get(game_id)
+    if session is None:
+        return jsonify({'error': f'Unknown game {game_id}'}), 404
+    with session.lock:
+        return respond(session.match)
+
+@app.route('/games', methods=['POST'])
+def create_game():
+    """Start a new game and return its ID; a body with moves or a record replays them first"""
+    moves = batch_moves(request.get_json(silent=True))
+    session = sessions.create()
+    if moves is not None:
+        with session.lock:
+            response = batch_response(session.match, moves)
+        if isinstance(response, tuple):
+            # The replay failed: report where and don't keep a half-built game
+            sessions.delete(session.game_id)
+            return response
+        body = response.get_json()
+        body['game_id'] = session.game_id
+        return jsonify(body), 201
+    return jsonify({
+        'game_id': session.game_id,
+        'current_player': session.match.get_current_player_color()
+    }), 201
+
+@app.route('/games', methods=['GET'])
+def get_games_stats():
+    """Session counters"""
+    return jsonify(sessions.get_stats())
+
+# --- Analysis jobs: searches queued to a process pool, polled, streamed or cancelled ---
+
+def submit_analysis(position, data, color=None):
+    """Queue an analysis of a Match, or of a Board with color to move, with the budget in the request body"""
+    try:
+        time_ms = int(data.get('time_ms', 1000))
+        depth = int(data.get('depth', MAX_PLY))
+        priority = int(data.get('priority', 0))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'time_ms, depth and priority must be integers'}), 400
+    if not 1 <= time_ms <= 60000 or not 1 <= depth <= MAX_PLY:
+        return jsonify({'error': f'time_ms must be between 1 and 60000, depth between 1 and {MAX_PLY}'}), 400
+    try:
+        job = analysis.submit(position, color, time_ms=time_ms, max_depth=depth, priority=priority)
+    except QueueFull as error:
+        response = jsonify({'error': f'Analysis queue is full ({error}), retry later'})
+        response.headers['Retry-After'] = '1'
+        return response, 503
+    return jsonify(job.to_dict()), 202
+
+@app.route('/analyze', methods=['POST'])
+def analyze():
+    """Queue an analysis of a game's position or of a given position; returns a job ID"""
+    data = request.get_json(silent=True) or {}
+    if data.get('board') is not None:
+        try:
+            board, color = BitBoard.from_fen(str(data['board']))
+        except ValueError as error:
+            return jsonify({'error': str(error)}), 400
+        return submit_analysis(board, data, color)
+    if data.get('fen') is not None:
+        match = Match(BitBoard)
+        try:
+            setup_match(match, str(data['fen']))
+        except PDNError as error:
+            return jsonify({'error': str(error)}), 400
+        return submit_analysis(match, data)
+    if data.get('game_id') is not None:
+        return with_game(str(data['game_id']), lambda match: submit_analysis(match, data))
+    return with_global_game(lambda match: submit_analysis(match, data))
+
+@app.route('/analyze', methods=['GET'])
+def get_analysis_stats():
+    """Analysis queue counters"""
+    return jsonify(analysis.get_stats())
+
+@app.route('/analyze/<job_id>', methods=['GET'])
+def get_analysis(job_id):
+    """State of an analysis job; ?wait=S holds the request until it finishes (at most S seconds)"""
+    job = analysis.get(job_id)
+    if job is None:
+        return jsonify({'error': f'Unknown analysis job {job_id}'}), 404
+    wait = min(request.args.get('wait', default=0, type=float), MAX_LONG_POLL_SECONDS)
+    if wait > 0:
+        deadline = time.monotonic() + wait
+        while job.status not in FINISHED and time.monotonic() < deadline:
+            analysis.wait(job, job.version, deadline - time.monotonic())
+    return jsonify(job.to_dict())
+
+@app.route('/analyze/<job_id>/stream', methods=['GET'])
+def stream_analysis(job_id):
+    """Server-sent events with the job's state on every change, until it finishes"""
+    job = analysis.get(job_id)
+    if job is None:
+        return jsonify({'error': f'Unknown analysis job {job_id}'}), 404
+
+    def events():
+        version = -1
+        while True:
+            if job.version != version:
+                version = job.version
+                yield f'event: {job.status}\ndata: {json.dumps(job.to_dict())}\n\n'
+                if job.status in FINISHED:
+                    return
+            if analysis.wait(job, version, MAX_LONG_POLL_SECONDS) == version:
+                yield ': keep-alive\n\n'
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache'})
+
+@app.route('/analyze/<job_id>', methods=['DELETE'])
+def cancel_analysis(job_id):
+    """Cancel an analysis job (shared jobs stop once every submitter has cancelled)"""
+    job = analysis.cancel(job_id)
+    if job is None:
+        return jsonify({'error': f'Unknown analysis job {job_id}'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/store', methods=['GET'])
+def get_store_stats():
+    """Game store counters (journal batches, snapshots, last recovery)"""
+    if STORE is None:
+        return jsonify({'error': 'No game store; start the server with CHECKERS_STORE=<directory>'}), 404
+    return jsonify(STORE.get_stats())
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Request latencies and hot-path timers in the Prometheus text format"""
+    response = make_response(registry.render())
+    response.headers['Content-Type'] = PROMETHEUS_CONTENT_TYPE
+    return response
+
+@app.route('/profile', methods=['POST'])
+def profile():
+    """Profile the server for a time window (only with CHECKERS_PROFILING=1)"""
+    if not PROFILING:
+        return jsonify({'error': 'Profiling is disabled; start the server with CHECKERS_PROFILING=1'}), 404
+    data = request.get_json(silent=True) or {}
+    mode = data.get('mode', 'stacks')
+    if mode not in ('stacks', 'cprofile'):
+        return jsonify({'error': 'mode must be "stacks" or "cprofile"'}), 400
+    try:
+        seconds = float(data.get('seconds', 10))
+        interval_ms = float(data.get('interval_ms', 5))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'seconds and interval_ms must be numbers'}), 400
+    if not 0 < seconds <= MAX_PROFILE_SECONDS or not 1 <= interval_ms <= 1000:
+        return jsonify({'error': f'seconds must be in (0, {MAX_PROFILE_SECONDS}], interval_ms in [1, 1000]'}), 400
+
+    if not profile_window.acquire(blocking=False):
+        return jsonify({'error': 'A profile is already being taken'}), 409
+    try:
+        profiler = SamplingProfiler(interval_ms / 1000) if mode == 'stacks' else request_profiler
+        profiler.start()
+        time.sleep(seconds)
+        report = profiler.stop()
+    finally:
+        profile_window.release()
+    response = make_response(report)
+    response.mimetype = 'text/plain'
+    return response
+
+@app.route('/games/<game_id>', methods=['DELETE'])
+def delete_game(game_id):
+    """End a game and free it"""
+    if not sessions.delete(game_id):
+        return jsonify({'error': f'Unknown game {game_id}'}), 404
+    return jsonify({'message': f'Game {game_id} deleted'})
+
+@app.route('/games/<game_id>/board', methods=['GET'])
+def get_game_board(game_id):
+    """Get the board state of a game (supports If-None-Match and ?wait_for_version=N&timeout=S)"""
+    session = sessions.get(game_id)
+    if session is None:
+        return jsonify({'error': f'Unknown game {game_id}'}), 404
+    # Long-poll before taking the game lock, so moves can be made meanwhile
+    wait_for_board_change(session.match)
+    with session.lock:
+        return board_response(session.match)
+
+@app.route('/games/<game_id>/move', methods=['POST'])
+def make_game_move(game_id):
+    """Make a move in a game"""
+    return with_game(game_id, move_response)
+
+@app.route('/games/<game_id>/moves', methods=['POST'])
+def make_game_moves(game_id):
+    """Make several moves in a game in one request"""
+    return with_game(game_id, batch_response)
+
+@app.route('/games/<game_id>/info', methods=['GET'])
+def get_game_piece_info(game_id):
+    """Get information about a piece in a game"""
+    return with_game(game_id, info_response)
+
+@app.route('/games/<game_id>/engine/move', methods=['POST'])
+def game_engine_move(game_id):
+    """Let the computer play a move in a game"""
+    session = sessions.get(game_id)
+    if session is None:
+        return jsonify({'error': f'Unknown game {game_id}'}), 404
+    return engine_move_response(lambda: session.match, session.lock)
+
 @app.route('/reset', methods=['POST'])
 def reset_game():
     """Reset the game"""
     global game_match
-    game_match = Match()
-    game_match.start_game()
-    
-    return jsonify({
-        'message': 'Game reset successfully',
-        'current_player': game_match.get_current_player_color()
-    })
+    with game_lock:
+        game_match = Match(BOARD_CLASS)
+        game_match.start_game()
+        for hook in reset_hooks:
+            hook(game_match)
+
+        return jsonify({
+            'message': 'Game reset successfully',
+            'current_player': game_match.get_current_player_color()
+        })
 
 @app.route('/', methods=['GET'])
 def home():
@@ -136,9 +638,29 @@ def home():
     return jsonify({
         'message': 'Checkers Game API',
         'endpoints': {
-            'GET /board': 'Get current board state',
+            'GET /board': 'Get current board state (ETag / If-None-Match, ?wait_for_version=N&timeout=S, '
+                          '?format=fen|bytes for the compact encodings)',
             'POST /move': 'Make a move (JSON: {player, from, to})',
             'GET /info': 'Get piece info (params: ?player=Black&piece=2A)',
+            'POST /moves': 'Make several moves (JSON: {moves: ["B6-A5", ...] or record: "B6-A5 C3-B4", results})',
+            'POST /engine/move': 'Let the computer play a move (JSON: {time_ms})',
+            'POST /games': 'Start a new game, returns game_id (optional JSON: {moves} or {record} to replay)',
+            'GET /games': 'Session counters (active, created, evicted)',
+            'POST /analyze': 'Queue an analysis (JSON: {game_id}, {fen} (PDN) or {board} (Board.to_fen), '
+                              'time_ms, depth, priority), returns a job',
+            'GET /analyze/<id>': 'Analysis job state and result (?wait=S to wait for it)',
+            'GET /analyze/<id>/stream': 'Analysis job state as server-sent events until it finishes',
+            'DELETE /analyze/<id>': 'Cancel an analysis job',
+            'GET /analyze': 'Analysis queue counters (running, queued, deduplicated, cache hits)',
+            'GET /store': 'Game store counters, with CHECKERS_STORE set (journal, snapshots, recovery)',
+            'GET /metrics': 'Request latencies and hot-path timers (Prometheus text format)',
+            'POST /profile': 'Profile a window with CHECKERS_PROFILING=1 (JSON: {seconds, mode: stacks|cprofile})',
+            'GET /games/<id>/board': 'Board state of a game',
+            'POST /games/<id>/move': 'Make a move in a game (JSON: {player, from, to})',
+            'POST /games/<id>/moves': 'Make several moves in a game (JSON like POST /moves)',
+            'GET /games/<id>/info': 'Piece info in a game (params: ?piece=A3)',
+            'POST /games/<id>/engine/move': 'Let the computer move in a game',
+            'DELETE /games/<id>': 'End a game',
             'POST /reset': 'Reset the game'
         },
         'example_move': {
@@ -151,5 +673,6 @@ def home():
 if __name__ == '__main__':
     print("Starting Checkers API Server...")
     print("API Documentation available at: http://localhost:5000/")
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    # The reloader would run this module in a second process, which can't open the store
+    app.run(host='0.0.0.0', port=5000, debug=True, use_reloader=STORE is None)
 
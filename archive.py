@@ -0,0 +1,88 @@
+"""Tools for binary game archives (see src/models/GameArchive.py).
+
+    python archive.py import games.jsonl games.ckga     JSON lines (as written by selfplay.py) to an archive
+    python archive.py export games.ckga games.jsonl     archive to JSON lines
+    python archive.py import-pdn games.pdn games.ckga   PDN to an archive (games the rules reject are skipped)
+    python archive.py export-pdn games.ckga games.pdn   archive to PDN
+    python archive.py show games.ckga K [P]             print game K's board after P plies (default: the end)
+    python archive.py index games.ckga                  add the offset index to an archive left without one
+"""
+import json
+import sys
+
+from src.models import PDN
+from src.models.GameArchive import ArchiveReader, ArchiveWriter, encode_moves, decode_moves
+from src.models.Notation import parse_moves, format_moves
+
+
+def import_jsonl(source, target):
+    count = 0
+    with open(source) as lines, ArchiveWriter(target, {'source': source}) as writer:
+        for number, line in enumerate(lines):
+            record = json.loads(line)
+            result = record.get('result')
+            writer.add(record.get('game', number), record.get('seed', 0), None if result == 'draw' else result,
+                       encode_moves(parse_moves(record['moves'])))
+            count += 1
+    return count
+
+
+def export_jsonl(source, target):
+    with ArchiveReader(source) as reader, open(target, 'w') as lines:
+        for number, seed, result, moves in reader:
+            notation = format_moves(decode_moves(moves))
+            lines.write(json.dumps({'game': number, 'seed': seed, 'result': result or 'draw',
+                                    'plies': len(notation), 'moves': notation}) + '\n')
+        return len(reader)
+
+
+def import_pdn(source, target):
+    with open(source) as lines, ArchiveWriter(target, {'source': source}) as writer:
+        reader = PDN.PDNReader(lines, skip_invalid=True)
+        for number, (tags, match) in enumerate(reader):
+            writer.add(number, 0, match.get_winner(), encode_moves(match.history))
+    return reader.get_stats()
+
+
+def export_pdn(source, target):
+    with ArchiveReader(source) as reader, open(target, 'w') as lines:
+        metadata = reader.metadata
+        for number, seed, result, moves in reader:
+            tags = {'Event': metadata.get('source', 'Self-play'), 'Round': number}
+            if 'white' in metadata:
+                tags['White'], tags['Black'] = metadata['white'], metadata['black']
+            PDN.write_moves(lines, decode_moves(moves), result, tags)
+        return len(reader)
+
+
+def main():
+    if len(sys.argv) < 3:
+        sys.exit(__doc__)
+    command, path = sys.argv[1], sys.argv[2]
+    if command == 'import' and len(sys.argv) == 4:
+        print(f"{import_jsonl(path, sys.argv[3])} games imported")
+    elif command == 'export' and len(sys.argv) == 4:
+        print(f"{export_jsonl(path, sys.argv[3])} games exported")
+    elif command == 'import-pdn' and len(sys.argv) == 4:
+        stats = import_pdn(path, sys.argv[3])
+        print(f"{stats['games']} games imported, {stats['skipped']} skipped; "
+              f"{stats['games_per_second']} games/s, {stats['moves_per_second']} moves/s, "
+              f"{stats['megabytes_per_second']} MB/s")
+    elif command == 'export-pdn' and len(sys.argv) == 4:
+        print(f"{export_pdn(path, sys.argv[3])} games exported")
+    elif command == 'show' and len(sys.argv) in (4, 5):
+        with ArchiveReader(path) as reader:
+            k = int(sys.argv[3])
+            ply = int(sys.argv[4]) if len(sys.argv) == 5 else None
+            number, seed, result, moves = reader.game(k)
+            print(f"Game {number} (seed {seed}): {len(moves)} plies, result {result or 'draw'}")
+            reader.replay(k, ply).display()
+    elif command == 'index' and len(sys.argv) == 3:
+        # Reopening for append rebuilds the offsets; closing writes the index
+        ArchiveWriter(path, resume=True).close()
+    else:
+        sys.exit(__doc__)
+
+
+if __name__ == '__main__':
+    main()
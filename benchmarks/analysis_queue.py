@@ -0,0 +1,100 @@
+"""Analysis queue: request-thread latency, throughput, deduplication and cancellation.
+
+Submits short searches of random positions from many threads (a quarter of them
+repeating positions already submitted), measures how long submit() holds the
+calling thread and how long jobs take to finish, then cancels long searches
+and measures how soon their pool slots come back.
+
+Run from the project root:  python -m benchmarks.analysis_queue [jobs] [time_ms]
+"""
+import random
+import statistics
+import sys
+import threading
+import time
+
+from src.models.AnalysisQueue import AnalysisQueue, FINISHED
+from src.models.Match import Match
+
+
+def random_positions(count, seed=5):
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        match = Match()
+        match.start_game()
+        for _ in range(rng.randrange(4, 30)):
+            if match.is_game_over():
+                break
+            move = rng.choice(sorted(match.current_player.get_all_possible_moves(match.board)))
+            match.make_move(*move[0], *move[1])
+        if not match.is_game_over():
+            positions.append(match)
+    return positions
+
+
+def wait_all(queue, jobs, timeout=600):
+    deadline = time.monotonic() + timeout
+    for job in jobs:
+        while job.status not in FINISHED and time.monotonic() < deadline:
+            queue.wait(job, job.version, deadline - time.monotonic())
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    time_ms = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    positions = random_positions(count * 3 // 4)
+    rng = random.Random(1)
+    requests = positions + [rng.choice(positions) for _ in range(count - len(positions))]
+    rng.shuffle(requests)
+
+    with AnalysisQueue() as queue:
+        # Start the pool before timing, as a running server has
+        wait_all(queue, [queue.submit(positions[0], time_ms=1)])
+        latencies = []
+        jobs = []
+        lock = threading.Lock()
+
+        def client(chunk):
+            for match in chunk:
+                start = time.perf_counter()
+                job = queue.submit(match, time_ms=time_ms)
+                elapsed = time.perf_counter() - start
+                with lock:
+                    latencies.append(elapsed)
+                    jobs.append(job)
+
+        threads = [threading.Thread(target=client, args=(requests[slot::16],)) for slot in range(16)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wait_all(queue, jobs)
+        elapsed = time.perf_counter() - start
+        latencies.sort()
+        stats = queue.get_stats()
+        print(f"{count} submissions from 16 threads, {time_ms} ms searches on {stats['workers']} workers")
+        print(f"submit() median {statistics.median(latencies) * 1e6:,.0f} us, "
+              f"p99 {latencies[int(len(latencies) * 0.99)] * 1e6:,.0f} us")
+        print(f"all finished in {elapsed:.2f}s ({count / elapsed:,.1f} jobs/s); "
+              f"searched {stats['completed'] - 1}, deduplicated {stats['deduplicated']}, "
+              f"cache hits {stats['cache_hits']}")
+
+        # Cancelling: how long a slot stays busy after a long search is cancelled
+        delays = []
+        for match in positions[:5]:
+            job = queue.submit(match, time_ms=30000)
+            while job.status != 'running':
+                queue.wait(job, job.version, 1)
+            time.sleep(0.2)
+            start = time.perf_counter()
+            queue.cancel(job.job_id)
+            while queue.get_stats()['running']:
+                time.sleep(0.001)
+            delays.append(time.perf_counter() - start)
+        print(f"cancelled 30 s searches freed their slot in {statistics.median(delays) * 1000:.1f} ms (median)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Binary game archive versus JSON lines: size on disk, load time and random access.
+
+Writes the same random games both ways, then times loading every game's moves
+(parsed notation versus move bytes straight from the map) and rebuilding the
+position at a random ply of random games (game K to ply P).
+
+Run from the project root:  python -m benchmarks.archive_access [games]
+"""
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from src.models.Board import Board
+from src.models.GameArchive import ArchiveReader, ArchiveWriter
+from src.models.Notation import format_moves, parse_moves
+from src.models.SelfPlay import RandomPolicy, play_game
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    policy = RandomPolicy()
+    played = [play_game(policy, policy, seed) for seed in range(games)]
+    directory = tempfile.mkdtemp()
+    jsonl_path = os.path.join(directory, 'games.jsonl')
+    archive_path = os.path.join(directory, 'games.ckga')
+    with open(jsonl_path, 'w') as lines, ArchiveWriter(archive_path) as writer:
+        for number, (winner, moves, codes) in enumerate(played):
+            lines.write(json.dumps({'game': number, 'result': winner or 'draw', 'moves': format_moves(moves)}) + '\n')
+            writer.add(number, number, winner, codes)
+    plies = sum(len(codes) for _, _, codes in played)
+    print(f"{games} games, {plies} plies")
+    print(f"size      jsonl {os.path.getsize(jsonl_path):>12,} bytes   archive {os.path.getsize(archive_path):>12,} bytes")
+
+    start = time.perf_counter()
+    with open(jsonl_path) as lines:
+        loaded = [parse_moves(json.loads(line)['moves']) for line in lines]
+    jsonl_load = time.perf_counter() - start
+    start = time.perf_counter()
+    with ArchiveReader(archive_path) as reader:
+        total = sum(len(moves) for _, _, _, moves in reader)
+    archive_load = time.perf_counter() - start
+    assert total == sum(map(len, loaded))
+    print(f"read all  jsonl {jsonl_load * 1000:>9.1f} ms      archive {archive_load * 1000:>9.1f} ms")
+
+    rng = random.Random(5)
+    samples = [(k, rng.randrange(len(played[k][1]) + 1)) for k in (rng.randrange(games) for _ in range(200))]
+    start = time.perf_counter()
+    for k, ply in samples:
+        # A text file has to be read up to line K before game K can be replayed
+        with open(jsonl_path) as lines:
+            for _ in range(k):
+                next(lines)
+            board = Board()
+            for (from_row, from_col), (to_row, to_col) in parse_moves(json.loads(next(lines))['moves'])[:ply]:
+                board.make_move(from_row, from_col, to_row, to_col)
+    jsonl_seek = (time.perf_counter() - start) / len(samples)
+    start = time.perf_counter()
+    with ArchiveReader(archive_path) as reader:
+        for k, ply in samples:
+            reader.replay(k, ply)
+    archive_seek = (time.perf_counter() - start) / len(samples)
+    print(f"game K to ply P  jsonl {jsonl_seek * 1e6:>9.0f} us  archive {archive_seek * 1e6:>9.0f} us")
+    shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
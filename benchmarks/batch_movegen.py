@@ -0,0 +1,96 @@
+"""Batched NumPy move generation and evaluation against the per-board Python path.
+
+Collects positions from random games, checks that the batch moves and scores
+match Player.get_all_possible_moves and Engine.evaluate, then times both paths
+for batch sizes from 1 to 100k boards. A last line compares move lists: the
+(source, target) pairs of BitBoard.generate_moves board by board against
+BoardBatch.move_arrays of the whole batch, reading the masks off the BitBoards
+with from_bitboards included in the time. Needs numpy (pip install -r
+requirements-dev.txt).
+
+Run from the project root:  python -m benchmarks.batch_movegen [max_batch] [seed]
+"""
+import random
+import sys
+import time
+
+import numpy as np
+
+from src.models import BoardBatch
+from src.models.BitBoard import BitBoard
+from src.models.Engine import evaluate
+from src.models.Player import Player
+
+
+def random_positions(count, seed):
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        board, color = BitBoard(), 'black'
+        for _ in range(150):
+            moves = board.get_all_moves(color)
+            if not moves:
+                break
+            positions.append((board.copy(), color))
+            (from_row, from_col), (to_row, to_col) = rng.choice(moves)
+            board.make_move(from_row, from_col, to_row, to_col)
+            color = 'white' if color == 'black' else 'black'
+    return positions[:count]
+
+
+def python_path(boards, colors):
+    players = {'white': Player('white'), 'black': Player('black')}
+    moves = [players[color].get_all_possible_moves(board) for board, color in zip(boards, colors)]
+    scores = [evaluate(board, color) for board, color in zip(boards, colors)]
+    return moves, scores
+
+
+def main():
+    max_batch = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    positions = random_positions(max_batch, seed)
+    boards = [board for board, _ in positions]
+    colors = [color for _, color in positions]
+    batch = BoardBatch.from_boards(boards)
+    color_array = np.array(colors)
+
+    check = min(len(boards), 5000)
+    masks = BoardBatch.legal_move_masks(batch[:check], colors[:check])
+    scores = BoardBatch.evaluate(batch[:check], colors[:check])
+    moves, expected_scores = python_path(boards[:check], colors[:check])
+    for index in range(check):
+        if sorted(BoardBatch.moves_from_mask(masks[index])) != sorted(moves[index]):
+            raise AssertionError(f"batch moves differ from Player.get_all_possible_moves on board {index}")
+        if scores[index] != expected_scores[index]:
+            raise AssertionError(f"batch score differs from Engine.evaluate on board {index}")
+        if BoardBatch.from_boards([BoardBatch.to_board(batch[index], BitBoard)])[0].tolist() != batch[index].tolist():
+            raise AssertionError(f"board {index} does not survive a round trip through BitBoard")
+    print(f"{check} positions checked against the per-board path")
+
+    print(f"{'boards':>8} {'python':>12} {'numpy':>12} {'speedup':>8}")
+    size = 1
+    while size <= max_batch:
+        start = time.perf_counter()
+        python_path(boards[:size], colors[:size])
+        python = time.perf_counter() - start
+        start = time.perf_counter()
+        BoardBatch.legal_move_masks(batch[:size], color_array[:size])
+        BoardBatch.evaluate(batch[:size], color_array[:size])
+        vectorized = time.perf_counter() - start
+        print(f"{size:>8} {python * 1000:>10.2f}ms {vectorized * 1000:>10.2f}ms {python / vectorized:>7.1f}x")
+        size *= 10
+
+    start = time.perf_counter()
+    count = sum(len(board.generate_moves(color)) for board, color in positions)
+    python = time.perf_counter() - start
+    start = time.perf_counter()
+    found, _, _ = BoardBatch.move_arrays(BoardBatch.bitmask_move_masks(BoardBatch.from_bitboards(boards), colors))
+    vectorized = time.perf_counter() - start
+    if len(found) != count:
+        raise AssertionError("move_arrays lists a different number of moves than BitBoard.generate_moves")
+    print(f"move lists: generate_moves {count / python:>12,.0f} moves/s  "
+          f"move_arrays {count / vectorized:>12,.0f} moves/s  ({python / vectorized:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
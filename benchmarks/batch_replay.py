@@ -0,0 +1,60 @@
+"""Moves applied per second through POST /games/<id>/moves versus one POST /games/<id>/move per ply.
+
+Replays recorded random games through the Flask test client, so the numbers
+cover request parsing, routing and the JSON responses but not the network.
+
+Run from the project root:  python -m benchmarks.batch_replay [games]
+"""
+import sys
+import time
+
+from api_server import app
+from benchmarks.match_throughput import record_games
+from src.models.Notation import format_moves, position_to_chess
+
+
+def per_move(client, records):
+    start = time.perf_counter()
+    count = 0
+    for moves in records:
+        game_id = client.post('/games').get_json()['game_id']
+        player = 'black'
+        for from_square, to_square in moves:
+            response = client.post(f'/games/{game_id}/move', json={
+                'player': player,
+                'from': position_to_chess(*from_square),
+                'to': position_to_chess(*to_square),
+            }).get_json()
+            if not response.get('success'):
+                raise AssertionError("replay diverged")
+            player = response['current_player']
+            count += 1
+        client.delete(f'/games/{game_id}')
+    return count / (time.perf_counter() - start)
+
+
+def batched(client, records):
+    bodies = [{'moves': format_moves(moves)} for moves in records]
+    start = time.perf_counter()
+    count = 0
+    for body in bodies:
+        response = client.post('/games', json=body).get_json()
+        if not response.get('success'):
+            raise AssertionError("replay diverged")
+        count += response['applied']
+        client.delete(f"/games/{response['game_id']}")
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    records = record_games(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
+    print(f"{sum(map(len, records))} moves from {len(records)} random games")
+    client = app.test_client()
+    before = per_move(client, records)
+    after = batched(client, records)
+    print(f"POST /move per ply  {before:>10,.0f} moves/s")
+    print(f"POST /games + moves {after:>10,.0f} moves/s  ({after / before:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Compare move generation speed of Board and BitBoard on random games.
+
+BitBoard's generators make one Python object per move, which keeps them at 2-4x
+Board's rate; generating the moves of many positions at once with NumPy is timed
+by benchmarks/batch_movegen.py.
+
+Run from the project root:  python -m benchmarks.bitboard_movegen [games] [seed]
+"""
+import random
+import sys
+import time
+
+from src.models.Board import Board
+from src.models.BitBoard import BitBoard
+
+
+def random_positions(games, seed):
+    """Play random games on both boards, checking they agree at every ply"""
+    rng = random.Random(seed)
+    positions = []
+    for _ in range(games):
+        board, bitboard, color = Board(), BitBoard(), 'black'
+        for _ in range(200):
+            moves = board.get_all_moves(color)
+            if sorted(moves) != sorted(bitboard.get_all_moves(color)):
+                raise AssertionError("BitBoard moves differ from Board moves")
+            if len(moves) != bitboard.count_moves(color):
+                raise AssertionError("BitBoard move count differs from Board")
+            if not moves:
+                break
+            positions.append((board.copy(), bitboard.copy(), color))
+            (from_row, from_col), (to_row, to_col) = rng.choice(moves)
+            board.move_piece(from_row, from_col, to_row, to_col)
+            bitboard.move_piece(from_row, from_col, to_row, to_col)
+            color = 'white' if color == 'black' else 'black'
+    return positions
+
+
+def moves_per_second(count_moves, positions, repeat=5):
+    best = None
+    for _ in range(repeat):
+        count = 0
+        start = time.perf_counter()
+        for position in positions:
+            count += count_moves(position)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return count / best
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    positions = random_positions(games, seed)
+    print(f"{len(positions)} positions from {games} random games (moves checked against Board)")
+
+    board_rate = moves_per_second(lambda p: len(p[0].get_all_moves(p[2])), positions)
+    print(f"Board.get_all_moves       {board_rate:12,.0f} moves/s")
+    for name, count_moves in (
+        ('BitBoard.get_all_moves', lambda p: len(p[1].get_all_moves(p[2]))),
+        ('BitBoard.generate_moves', lambda p: len(p[1].generate_moves(p[2]))),
+        ('BitBoard.count_moves', lambda p: p[1].count_moves(p[2])),
+    ):
+        rate = moves_per_second(count_moves, positions)
+        print(f"{name:<25} {rate:12,.0f} moves/s  ({rate / board_rate:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
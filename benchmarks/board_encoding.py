@@ -0,0 +1,75 @@
+"""Compact board encodings: speed, size and exact round trips.
+
+Collects the positions of random games, checks that to_fen/from_fen and
+to_bytes/from_bytes give back the same position and key on every board storage,
+then times each direction per board and compares the size and build time of
+the nested JSON that /board answers with and of the two compact forms.
+
+Run from the project root:  python -m benchmarks.board_encoding [games]
+"""
+import json
+import random
+import sys
+import time
+
+from src.models.ArrayBoard import ArrayBoard
+from src.models.BitBoard import BitBoard
+from src.models.Board import Board
+from src.models.Match import Match
+
+
+def collect_positions(board_class, games, seed=8):
+    """(board copy, side to move) after every ply of random games"""
+    rng = random.Random(seed)
+    positions = []
+    for _ in range(games):
+        match = Match(board_class)
+        match.start_game()
+        while not match.is_game_over() and len(match.history) < 200:
+            positions.append((match.board.copy(), match.get_current_player_color()))
+            legal = sorted(match.current_player.get_all_possible_moves(match.board))
+            if not legal:
+                break
+            move = rng.choice(legal)
+            match.make_move(*move[0], *move[1])
+    return positions
+
+
+def board_json(board, color):
+    # What api_server.board_json builds for a position
+    return json.dumps({'board': [[{'color': piece.color, 'is_king': piece.is_king,
+                                   'position': chr(ord('A') + col) + str(8 - row)} if piece else None
+                                  for col, piece in enumerate(board.get_piece(row, c) for c in range(8))]
+                                 for row in range(8)],
+                       'current_player': color}).encode()
+
+
+def per_call(function, items):
+    start = time.perf_counter()
+    for item in items:
+        function(*item)
+    return (time.perf_counter() - start) / len(items) * 1e6
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    for board_class in (Board, BitBoard, ArrayBoard):
+        positions = collect_positions(board_class, games)
+        fens = [(board.to_fen(color),) for board, color in positions]
+        packed = [(board.to_bytes(color),) for board, color in positions]
+        for (board, color), (fen,), (data,) in zip(positions, fens, packed):
+            for decoded, side in (board_class.from_fen(fen), board_class.from_bytes(data)):
+                if side != color or decoded.zobrist != board.zobrist or decoded.to_fen(side) != fen:
+                    raise AssertionError(f"{board_class.__name__} round trip changed {fen}")
+        print(f"{board_class.__name__:<10} {len(positions):,} positions, {len(set(fens)):,} distinct, round trips exact")
+        print(f"  to_fen {per_call(lambda board, color: board.to_fen(color), positions):6.2f} us   "
+              f"from_fen {per_call(board_class.from_fen, fens):6.2f} us   "
+              f"to_bytes {per_call(lambda board, color: board.to_bytes(color), positions):6.2f} us   "
+              f"from_bytes {per_call(board_class.from_bytes, packed):6.2f} us")
+        print(f"  nested JSON {per_call(board_json, positions):6.2f} us, "
+              f"{sum(len(board_json(*position)) for position in positions) / len(positions):,.0f} bytes; "
+              f"fen {len(fens[0][0])} bytes; packed {len(packed[0][0])} bytes")
+
+
+if __name__ == '__main__':
+    main()
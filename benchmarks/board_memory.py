@@ -0,0 +1,54 @@
+"""Memory per board, measured with tracemalloc.
+
+Allocates many boards of each storage (list-of-lists Board, BitBoard and the
+byte-per-square ArrayBoard), fresh and as copies of a mid-game position, plus
+whole Matches, and prints the bytes traced per object.
+
+Run from the project root:  python -m benchmarks.board_memory [count]
+"""
+import gc
+import random
+import sys
+import tracemalloc
+
+from src.models.ArrayBoard import ArrayBoard
+from src.models.BitBoard import BitBoard
+from src.models.Board import Board
+from src.models.Match import Match
+
+
+def traced_bytes(make, count):
+    """Bytes traced per object while count objects made by make() are alive"""
+    gc.collect()
+    tracemalloc.start()
+    objects = [make() for _ in range(count)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return size / count
+
+
+def mid_game(board_class, plies=20, seed=4):
+    rng = random.Random(seed)
+    match = Match(board_class)
+    match.start_game()
+    for _ in range(plies):
+        move = rng.choice(sorted(match.current_player.get_all_possible_moves(match.board)))
+        match.make_move(*move[0], *move[1])
+    board = match.board.copy()
+    return board
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    print(f"bytes per object, {count:,} of each")
+    for board_class in (Board, BitBoard, ArrayBoard):
+        position = mid_game(board_class)
+        fresh = traced_bytes(board_class, count)
+        copied = traced_bytes(position.copy, count)
+        match = traced_bytes(lambda: Match(board_class), count)
+        print(f"{board_class.__name__:<10} new board {fresh:>7,.0f}  copy {copied:>7,.0f}  Match {match:>7,.0f}")
+
+
+if __name__ == '__main__':
+    main()
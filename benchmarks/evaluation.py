@@ -0,0 +1,84 @@
+"""Piece-square evaluation: from scratch against incrementally updated.
+
+Walks the positions of random games the way a search does, playing each legal
+move with make_move, scoring the resulting position and taking the move back,
+once computing the score from scratch (PieceSquareTables.evaluate, a loop over
+the pieces) and once reading the Evaluator kept up to date by the moves. Both
+walks include the make/unmake cost, so the move rate is printed alongside a
+walk that scores nothing; evaluations per second are then the rate with that
+cost taken out. A last walk in debug mode checks both agree.
+
+Run from the project root:  python -m benchmarks.evaluation [games]
+"""
+import random
+import sys
+import time
+
+from src.models.BitBoard import BitBoard
+from src.models.Board import Board
+from src.models.Evaluator import Evaluator, default_tables
+from src.models.Match import Match
+
+
+def record_games(games, seed=7):
+    rng = random.Random(seed)
+    records = []
+    for _ in range(games):
+        match = Match()
+        match.start_game()
+        moves = []
+        while not match.is_game_over() and len(moves) < 200:
+            legal = sorted(match.current_player.get_all_possible_moves(match.board))
+            if not legal:
+                break
+            move = rng.choice(legal)
+            match.make_move(*move[0], *move[1])
+            moves.append(move)
+        records.append(moves)
+    return records
+
+
+def walk(board_class, records, score=None, evaluator=False, debug=False):
+    """Seconds spent, and children scored, trying every legal move along the games"""
+    elapsed = 0.0
+    children = 0
+    for moves in records:
+        match = Match(board_class)
+        match.start_game()
+        board = match.board
+        if evaluator:
+            tracked = Evaluator(board, debug=debug)
+        for (from_row, from_col), (to_row, to_col) in moves:
+            color = match.current_player.color
+            legal = board.list_moves(color)
+            start = time.perf_counter()
+            for (source_row, source_col), (target_row, target_col) in legal:
+                board.make_move(source_row, source_col, target_row, target_col)
+                if evaluator:
+                    tracked.value(color)
+                elif score is not None:
+                    score(board)
+                board.unmake_move()
+            elapsed += time.perf_counter() - start
+            children += len(legal)
+            match.make_move(from_row, from_col, to_row, to_col)
+    return elapsed, children
+
+
+def main():
+    records = record_games(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
+    tables = default_tables()
+    print(f"{sum(map(len, records))} positions from {len(records)} random games")
+    for board_class in (Board, BitBoard):
+        moves_only, children = walk(board_class, records)
+        scratch, _ = walk(board_class, records, score=tables.evaluate)
+        incremental, _ = walk(board_class, records, evaluator=True)
+        walk(board_class, records, evaluator=True, debug=True)
+        print(f"{board_class.__name__:<9} {children:,} children  make/unmake only {children / moves_only:>9,.0f}/s")
+        for name, elapsed in (('from scratch', scratch), ('incremental', incremental)):
+            print(f"  {name:<13} {children / elapsed:>9,.0f} moves+evals/s  "
+                  f"{children / max(elapsed - moves_only, 1e-9):>11,.0f} evals/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""Game store journal write throughput and recovery time.
+
+Plays the opening plies of random games into a store: first on a few hundred
+games from 1 to 32 threads with fsync on (concurrent moves share fsyncs through
+group commit) and with fsync off, then on many games (default 100,000), which
+are recovered from the journal alone, then from a snapshot.
+
+Run from the project root:  python -m benchmarks.game_store [games] [plies]
+"""
+import gc
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+from src.models.GameStore import GameStore
+from src.models.Match import Match
+
+
+def record_games(count, plies, seed=9):
+    rng = random.Random(seed)
+    records = []
+    for _ in range(count):
+        match = Match()
+        match.start_game()
+        moves = []
+        while not match.is_game_over() and len(moves) < plies:
+            move = rng.choice(sorted(match.current_player.get_all_possible_moves(match.board)))
+            match.make_move(*move[0], *move[1])
+            moves.append(move)
+        records.append(moves)
+    return records
+
+
+def play(store, records, games):
+    """Attach games new games and play one record on each; returns the moves played"""
+    played = 0
+    for index in range(games):
+        match = Match()
+        match.start_game()
+        store.attach(uuid.uuid4().hex, match)
+        for (from_row, from_col), (to_row, to_col) in records[index % len(records)]:
+            match.make_move(from_row, from_col, to_row, to_col)
+            played += 1
+    return played
+
+
+def journal_throughput(records, threads, fsync, games_per_thread=20):
+    directory = tempfile.mkdtemp()
+    store = GameStore(directory, fsync=fsync)
+    store.recover()
+    counts = [0] * threads
+
+    def worker(slot):
+        counts[slot] = play(store, records, games_per_thread)
+
+    workers = [threading.Thread(target=worker, args=(slot,)) for slot in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    stats = store.get_stats()
+    store.close()
+    shutil.rmtree(directory)
+    return sum(counts) / elapsed, stats['records_per_batch']
+
+
+def timed_recovery(directory):
+    store = GameStore(directory, snapshot_records=float('inf'))
+    start = time.perf_counter()
+    games = store.recover()
+    elapsed = time.perf_counter() - start
+    return store, games, elapsed
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    plies = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    records = record_games(500, plies)
+
+    for fsync in (True, False):
+        for threads in (1, 8, 32):
+            rate, per_batch = journal_throughput(records, threads, fsync)
+            print(f"fsync {'on ' if fsync else 'off'} {threads:>2} threads {rate:>10,.0f} moves/s  "
+                  f"{per_batch:>7.1f} records per write")
+
+    directory = tempfile.mkdtemp()
+    store = GameStore(directory, fsync=False, snapshot_records=float('inf'))
+    store.recover()
+    start = time.perf_counter()
+    moves = play(store, records, games)
+    elapsed = time.perf_counter() - start
+    store.close()
+    print(f"{games:,} games, {moves:,} moves journaled in {elapsed:.1f}s ({moves / elapsed:,.0f} moves/s, fsync off)")
+
+    store, recovered, elapsed = timed_recovery(directory)
+    print(f"recovery from the journal  {elapsed:>7.2f}s  {len(recovered):,} games")
+    start = time.perf_counter()
+    store.snapshot()
+    print(f"snapshot                   {time.perf_counter() - start:>7.2f}s")
+    store.close()
+    del recovered   # don't time the second recovery with the first one's games still in memory
+    gc.collect()
+
+    store, recovered, elapsed = timed_recovery(directory)
+    print(f"recovery from the snapshot {elapsed:>7.2f}s  {len(recovered):,} games")
+    store.close()
+    shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Compare Board.copy() lookahead with in-place make_move/unmake_move.
+
+Both walk the same game tree from the opening, following the first WIDTH moves (sorted)
+per node so that depths 4-8 stay tractable in pure Python.
+
+Run from the project root:  python -m benchmarks.make_unmake [width]
+"""
+import sys
+import time
+
+from src.models.Board import Board
+from src.models.BitBoard import BitBoard
+
+
+def walk_with_copy(board, color, depth, width):
+    if depth == 0:
+        return 1
+    nodes = 1
+    other = 'white' if color == 'black' else 'black'
+    for (from_row, from_col), (to_row, to_col) in sorted(board.get_all_moves(color))[:width]:
+        child = board.copy()
+        child.make_move(from_row, from_col, to_row, to_col)
+        nodes += walk_with_copy(child, other, depth - 1, width)
+    return nodes
+
+
+def walk_in_place(board, color, depth, width):
+    if depth == 0:
+        return 1
+    nodes = 1
+    other = 'white' if color == 'black' else 'black'
+    for (from_row, from_col), (to_row, to_col) in sorted(board.get_all_moves(color))[:width]:
+        board.make_move(from_row, from_col, to_row, to_col)
+        nodes += walk_in_place(board, other, depth - 1, width)
+        board.unmake_move()
+    return nodes
+
+
+def timed(walk, board_class, depth, width):
+    board = board_class()
+    start = time.perf_counter()
+    nodes = walk(board, 'black', depth, width)
+    return nodes, time.perf_counter() - start
+
+
+def main():
+    width = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    # Warm up BitBoard's lazily built move tables so they don't count against depth 4
+    timed(walk_in_place, BitBoard, 3, width)
+    print(f"{'depth':>5} {'nodes':>8} {'copy nodes/s':>14} {'make/unmake nodes/s':>20} {'BitBoard nodes/s':>17}")
+    for depth in range(4, 9):
+        nodes, copy_time = timed(walk_with_copy, Board, depth, width)
+        in_place_nodes, in_place_time = timed(walk_in_place, Board, depth, width)
+        bit_nodes, bit_time = timed(walk_in_place, BitBoard, depth, width)
+        if not nodes == in_place_nodes == bit_nodes:
+            raise AssertionError("walks visited different trees")
+        print(f"{depth:>5} {nodes:>8} {nodes / copy_time:>14,.0f} {nodes / in_place_time:>20,.0f} {nodes / bit_time:>17,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""Match.make_move throughput with incremental piece tracking versus full rescans.
+
+FullScanMatch reproduces the previous behaviour: after every move it rebuilds
+both players' piece lists from all 64 squares and lists the mover's moves by
+scanning all 64 squares again.
+
+Run from the project root:  python -m benchmarks.match_throughput [games]
+"""
+import random
+import sys
+import time
+
+from src.models.Match import Match
+
+
+class FullScanMatch(Match):
+    def __init__(self):
+        super().__init__()
+        self.pieces = {}   # color -> pieces, rebuilt from the board after every move
+
+    def start_game(self):
+        super().start_game()
+        self._rebuild_pieces()
+
+    def _rebuild_pieces(self):
+        self.pieces = {self.player1.color: [], self.player2.color: []}
+        for row in range(8):
+            for col in range(8):
+                piece = self.board.get_piece(row, col)
+                if piece:
+                    self.pieces[piece.color].append(piece)
+
+    def check_game_over(self):
+        if not self.pieces[self.player1.color]:
+            self.game_over = True
+            self.winner = self.player2
+        elif not self.pieces[self.player2.color]:
+            self.game_over = True
+            self.winner = self.player1
+        elif not self._scan_moves(self.current_player.color):
+            self.game_over = True
+            self.winner = self.player2 if self.current_player == self.player1 else self.player1
+
+    def _scan_moves(self, color):
+        all_moves = []
+        for row in range(8):
+            for col in range(8):
+                piece = self.board.board[row][col]
+                if piece is not None and piece.color == color:
+                    all_moves.extend(piece.get_possible_moves(self.board.board, row, col))
+        return all_moves
+
+    def make_move(self, from_row, from_col, to_row, to_col):
+        piece = self.board.get_piece(from_row, from_col)
+        if piece is None or piece.color != self.current_player.color:
+            return False
+        if self.board.move_piece(from_row, from_col, to_row, to_col):
+            self._rebuild_pieces()
+            self.check_game_over()
+            if not self.game_over:
+                self.switch_player()
+            return True
+        return False
+
+
+def record_games(games, seed=3):
+    rng = random.Random(seed)
+    records = []
+    for _ in range(games):
+        match = Match()
+        match.start_game()
+        moves = []
+        while not match.is_game_over() and len(moves) < 200:
+            legal = sorted(match.current_player.get_all_possible_moves(match.board))
+            if not legal:
+                break
+            move = rng.choice(legal)
+            match.make_move(*move[0], *move[1])
+            moves.append(move)
+        records.append(moves)
+    return records
+
+
+def moves_per_second(match_class, records):
+    start = time.perf_counter()
+    count = 0
+    for moves in records:
+        match = match_class()
+        match.start_game()
+        for (from_row, from_col), (to_row, to_col) in moves:
+            if not match.make_move(from_row, from_col, to_row, to_col):
+                raise AssertionError("replay diverged")
+            count += 1
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    records = record_games(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
+    print(f"{sum(map(len, records))} moves from {len(records)} random games")
+    before = moves_per_second(FullScanMatch, records)
+    after = moves_per_second(Match, records)
+    print(f"full rescans      {before:>10,.0f} make_move/s")
+    print(f"incremental index {after:>10,.0f} make_move/s  ({after / before:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
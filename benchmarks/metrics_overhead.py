@@ -0,0 +1,75 @@
+"""Cost of the hot-path timers (src/models/Metrics.py) on Match throughput.
+
+Replays the same random games (best of three) with the game methods untouched, with the timing
+wrappers installed, and untouched again once they are removed, then prints the
+move rates and the cost of one timed call.
+
+Run from the project root:  python -m benchmarks.metrics_overhead [games]
+"""
+import random
+import sys
+import time
+
+from src.models.ArrayBoard import ArrayBoard
+from src.models.BitBoard import BitBoard
+from src.models.Board import Board
+from src.models.Match import Match
+from src.models.Metrics import Registry, instrument_hot_paths, uninstrument_hot_paths
+
+
+def record_games(games, seed=3):
+    rng = random.Random(seed)
+    records = []
+    for _ in range(games):
+        match = Match()
+        match.start_game()
+        moves = []
+        while not match.is_game_over() and len(moves) < 200:
+            legal = sorted(match.current_player.get_all_possible_moves(match.board))
+            if not legal:
+                break
+            move = rng.choice(legal)
+            match.make_move(*move[0], *move[1])
+            moves.append(move)
+        records.append(moves)
+    return records
+
+
+REPEATS = 3
+
+
+def replay(board_class, records):
+    """(moves replayed, best time of REPEATS replays)"""
+    best = float('inf')
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        count = 0
+        for moves in records:
+            match = Match(board_class)
+            match.start_game()
+            for (from_row, from_col), (to_row, to_col) in moves:
+                if not match.make_move(from_row, from_col, to_row, to_col):
+                    raise AssertionError("replay diverged")
+                count += 1
+        best = min(best, time.perf_counter() - start)
+    return count, best
+
+
+def main():
+    records = record_games(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
+    print(f"{sum(map(len, records))} moves from {len(records)} random games")
+    for board_class in (Board, BitBoard, ArrayBoard):
+        moves, plain = replay(board_class, records)
+        registry = Registry()
+        histogram = instrument_hot_paths(registry)
+        _, timed = replay(board_class, records)
+        uninstrument_hot_paths()
+        _, restored = replay(board_class, records)
+        calls = sum(sum(values[:-1]) for values in histogram.series.values()) / REPEATS
+        print(f"{board_class.__name__:<10} plain {moves / plain:>9,.0f} moves/s  timed {moves / timed:>9,.0f} moves/s "
+              f"({timed / plain:.2f}x time, {(timed - plain) / calls * 1e9:.0f} ns per timed call)  "
+              f"removed {moves / restored:>9,.0f} moves/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Match's move cache: piece move queries with and without it.
+
+Replays random games per board engine in a polling flow where, before each move,
+a few clients ask for the moves of every piece of the side to move (what GET /info
+and GUI clicks do). Uncached, every query generates the piece's moves on the board;
+cached, Match.get_possible_moves_for_piece generates them once per position and
+hands the same tuple to the next clients. Moves themselves never go through the
+cache, so plain replay pays nothing for it. Prints move rates of both.
+
+Run from the project root:  python -m benchmarks.move_cache [games] [clients]
+"""
+import random
+import sys
+import time
+
+from src.models.BitBoard import BitBoard
+from src.models.Board import Board
+from src.models.Match import Match
+
+
+def record_games(games, seed=5):
+    rng = random.Random(seed)
+    records = []
+    for _ in range(games):
+        match = Match()
+        match.start_game()
+        moves = []
+        while not match.is_game_over() and len(moves) < 200:
+            legal = sorted(match.current_player.get_all_possible_moves(match.board))
+            if not legal:
+                break
+            move = rng.choice(legal)
+            match.make_move(*move[0], *move[1])
+            moves.append(move)
+        records.append(moves)
+    return records
+
+
+def generated_piece_moves(match, row, col):
+    """Match.get_possible_moves_for_piece without the cache"""
+    piece = match.board.get_piece(row, col)
+    if not piece or piece.color != match.current_player.color:
+        return ()
+    return match.board.get_piece_moves(row, col)
+
+
+def replay(board_class, records, clients, cached):
+    piece_moves = Match.get_possible_moves_for_piece if cached else generated_piece_moves
+    start = time.perf_counter()
+    count = 0
+    for moves in records:
+        match = Match(board_class)
+        match.start_game()
+        for (from_row, from_col), (to_row, to_col) in moves:
+            for _ in range(clients):
+                for _, row, col in match.board.get_all_pieces(match.get_current_player_color()):
+                    piece_moves(match, row, col)
+            if not match.make_move(from_row, from_col, to_row, to_col):
+                raise AssertionError("replay diverged")
+            count += 1
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    records = record_games(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    print(f"{sum(map(len, records))} moves from {len(records)} random games, {clients} polling clients")
+    for board_class in (Board, BitBoard):
+        uncached = replay(board_class, records, clients, False)
+        cached = replay(board_class, records, clients, True)
+        print(f"{board_class.__name__:<10} uncached {uncached:>9,.0f} moves/s  cached {cached:>9,.0f} moves/s "
+              f"({cached / uncached:.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Opening book build throughput and lookup latency.
+
+Plays random games into an archive, builds a book from it with one worker and
+with every core, then times lookups of positions from the games (hits) and of
+positions past the book depth (mostly misses).
+
+Run from the project root:  python -m benchmarks.opening_book [games]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from src.models.BitBoard import BitBoard
+from src.models.GameArchive import ArchiveReader, ArchiveWriter, decode_move
+from src.models.OpeningBook import OpeningBook, build_book, DEFAULT_PLIES
+from src.models.SelfPlay import GreedyCapturePolicy, play_game
+from src.models.Zobrist import side_key
+
+
+def position_keys(archive, plies):
+    keys = []
+    with ArchiveReader(archive) as reader:
+        for _, _, _, moves in reader:
+            board, color = BitBoard(), 'black'
+            for code in moves[:plies]:
+                keys.append(board.zobrist ^ side_key(color))
+                board.make_move(*decode_move(board, code))
+                color = 'white' if color == 'black' else 'black'
+            del moves
+    return keys
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    directory = tempfile.mkdtemp()
+    archive = os.path.join(directory, 'games.ckga')
+    policy = GreedyCapturePolicy()
+    with ArchiveWriter(archive) as writer:
+        for seed in range(games):
+            winner, _, codes = play_game(policy, policy, seed)
+            writer.add(seed, seed, winner, codes)
+    print(f"{games} greedy games, book depth {DEFAULT_PLIES} plies")
+
+    book_path = os.path.join(directory, 'book.bin')
+    for workers in sorted({1, os.cpu_count() or 1}):
+        start = time.perf_counter()
+        entries = build_book([archive], book_path, min_games=2, workers=workers)
+        elapsed = time.perf_counter() - start
+        print(f"build  {workers:>2} workers {games / elapsed:>10,.0f} games/s  {entries} entries, "
+              f"{os.path.getsize(book_path):,} bytes")
+
+    book = OpeningBook(book_path)
+    for label, keys in (('hits', position_keys(archive, 6)), ('misses', position_keys(archive, 40)[-20000:])):
+        keys = keys[:20000]
+        start = time.perf_counter()
+        found = sum(1 for key in keys if book.lookup(key))
+        elapsed = time.perf_counter() - start
+        print(f"lookup {label:>6} {elapsed / len(keys) * 1e6:>8.2f} us  ({found} of {len(keys)} in the book)")
+    book.close()
+    shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
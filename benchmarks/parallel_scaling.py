@@ -0,0 +1,64 @@
+"""Scaling of ParallelEngine with 1, 2, 4, 8 and 16 workers.
+
+Searches a fixed set of positions (seeded random openings) to a fixed depth and
+compares wall time and total nodes with a single in-process Engine. Speedup is
+serial time / parallel time; overhead is parallel nodes / serial nodes, the extra
+work caused by workers not sharing alpha-beta bounds.
+
+Run from the project root:  python -m benchmarks.parallel_scaling [depth] [positions]
+"""
+import random
+import sys
+import time
+
+from src.models.Board import Board
+from src.models.Engine import Engine
+from src.models.ParallelEngine import ParallelEngine
+
+WORKER_COUNTS = (1, 2, 4, 8, 16)
+NO_TIME_LIMIT_MS = 10 ** 9
+
+
+def fixed_positions(count, plies=6, seed=7):
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        board, color = Board(), 'black'
+        for _ in range(plies):
+            moves = board.get_all_moves(color)
+            if not moves:
+                break
+            (from_row, from_col), (to_row, to_col) = rng.choice(moves)
+            board.move_piece(from_row, from_col, to_row, to_col)
+            color = 'white' if color == 'black' else 'black'
+        else:
+            positions.append((board, color))
+    return positions
+
+
+def run(engine, positions, depth):
+    nodes = 0
+    start = time.perf_counter()
+    for board, color in positions:
+        nodes += engine.search(board, color, NO_TIME_LIMIT_MS, depth)['nodes']
+    return time.perf_counter() - start, nodes
+
+
+def main():
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 7
+    positions = fixed_positions(int(sys.argv[2]) if len(sys.argv) > 2 else 8)
+
+    serial_time, serial_nodes = run(Engine(), positions, depth)
+    print(f"{len(positions)} positions, depth {depth}")
+    print(f"{'workers':>7} {'time s':>8} {'nodes':>10} {'speedup':>8} {'overhead':>9}")
+    print(f"{'serial':>7} {serial_time:>8.2f} {serial_nodes:>10} {1:>8.2f} {1:>9.2f}")
+    for workers in WORKER_COUNTS:
+        with ParallelEngine(workers) as engine:
+            # Start the pool before timing: it is created once and reused in real use
+            engine.search(Board(), 'black', NO_TIME_LIMIT_MS, 1)
+            elapsed, nodes = run(engine, positions, depth)
+        print(f"{workers:>7} {elapsed:>8.2f} {nodes:>10} {serial_time / elapsed:>8.2f} {nodes / serial_nodes:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
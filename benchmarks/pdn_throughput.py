@@ -0,0 +1,40 @@
+"""PDN parse throughput: games, moves and megabytes per second.
+
+Writes random games to a PDN file, then streams it back with PDNReader on each
+board engine, validating every move while the Match is rebuilt.
+
+Run from the project root:  python -m benchmarks.pdn_throughput [games]
+"""
+import os
+import sys
+import tempfile
+
+from src.models import PDN
+from src.models.BitBoard import BitBoard
+from src.models.Board import Board
+from src.models.SelfPlay import RandomPolicy, play_game
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    policy = RandomPolicy()
+    handle, path = tempfile.mkstemp(suffix='.pdn')
+    with os.fdopen(handle, 'w') as file:
+        for seed in range(games):
+            winner, moves, _ = play_game(policy, policy, seed)
+            PDN.write_moves(file, moves, winner, {'Event': 'Random', 'Round': seed})
+    print(f"{games} games, {os.path.getsize(path):,} bytes of PDN")
+    print(f"{'board':>10} {'games/s':>9} {'moves/s':>9} {'MB/s':>7}")
+    for board_class in (Board, BitBoard):
+        with open(path) as file:
+            reader = PDN.PDNReader(file, board_class)
+            for _ in reader:
+                pass
+        stats = reader.get_stats()
+        print(f"{board_class.__name__:>10} {stats['games_per_second']:>9} {stats['moves_per_second']:>9} "
+              f"{stats['megabytes_per_second']:>7}")
+    os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""Perft: count the leaf nodes of the move tree to a fixed depth.
+
+Checks any move generator against stored reference counts produced with the
+list-of-lists Board, and reports nodes per second.
+
+Run from the project root:
+    python -m benchmarks.perft                         # check every stored position
+    python -m benchmarks.perft --depth 6 --board bitboard
+    python -m benchmarks.perft --depth 4 --divide --position opening
+    python -m benchmarks.perft --write-reference       # regenerate reference counts
+"""
+import argparse
+import json
+import os
+import time
+
+from src.models.Board import Board
+from src.models.ArrayBoard import ArrayBoard
+from src.models.BitBoard import BitBoard
+
+REFERENCE_FILE = os.path.join(os.path.dirname(__file__), 'perft_reference.json')
+BOARD_CLASSES = {'list': Board, 'bitboard': BitBoard, 'array': ArrayBoard}
+
+
+def other_color(color):
+    return 'white' if color == 'black' else 'black'
+
+
+def perft(board, color, depth, bulk=True):
+    """Number of leaf nodes depth plies below the position (0 when a side has no moves)"""
+    if depth == 0:
+        return 1
+    moves = board.get_all_moves(color)
+    if depth == 1 and bulk:
+        # Bulk counting: the last ply only needs the number of moves, not the children
+        return len(moves)
+    nodes = 0
+    for (from_row, from_col), (to_row, to_col) in moves:
+        board.make_move(from_row, from_col, to_row, to_col)
+        nodes += perft(board, other_color(color), depth - 1, bulk)
+        board.unmake_move()
+    return nodes
+
+
+def divide(board, color, depth, bulk=True):
+    """Leaf counts per root move, as {((from_row, from_col), (to_row, to_col)): nodes}"""
+    counts = {}
+    for move in board.get_all_moves(color):
+        (from_row, from_col), (to_row, to_col) = move
+        board.make_move(from_row, from_col, to_row, to_col)
+        counts[move] = perft(board, other_color(color), depth - 1, bulk)
+        board.unmake_move()
+    return counts
+
+
+def load_reference():
+    with open(REFERENCE_FILE) as reference_file:
+        return json.load(reference_file)
+
+
+def setup_position(board_class, position):
+    """Board and side to move after playing the position's moves from the opening"""
+    board, color = board_class(), 'black'
+    for (from_row, from_col), (to_row, to_col) in position['moves']:
+        if not board.move_piece(from_row, from_col, to_row, to_col):
+            raise ValueError(f"Illegal move in position {position['name']}")
+        color = other_color(color)
+    return board, color
+
+
+def write_reference(max_nodes=1000000):
+    """Recount every stored position with Board, deepening while counts stay under max_nodes"""
+    reference = load_reference()
+    for position in reference['positions']:
+        board, color = setup_position(Board, position)
+        position['counts'] = []
+        while True:
+            nodes = perft(board, color, len(position['counts']) + 1)
+            if nodes > max_nodes:
+                break
+            position['counts'].append(nodes)
+    save_reference(reference)
+
+
+def save_reference(reference):
+    # One position per line keeps the file diffable without spreading every move over 8 lines
+    lines = ',\n    '.join(json.dumps(position) for position in reference['positions'])
+    with open(REFERENCE_FILE, 'w') as reference_file:
+        reference_file.write('{"positions": [\n    ' + lines + '\n]}\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--board', choices=BOARD_CLASSES, default='list')
+    parser.add_argument('--depth', type=int, help='depth to count (default: every stored depth)')
+    parser.add_argument('--position', help='only this stored position')
+    parser.add_argument('--divide', action='store_true', help='list counts per root move')
+    parser.add_argument('--no-bulk', action='store_true', help='make every last-ply move too')
+    parser.add_argument('--write-reference', action='store_true',
+                        help='recompute the reference counts with Board')
+    args = parser.parse_args()
+
+    if args.write_reference:
+        write_reference()
+        return
+
+    failures = 0
+    for position in load_reference()['positions']:
+        if args.position and position['name'] != args.position:
+            continue
+        depths = [args.depth] if args.depth else range(1, len(position['counts']) + 1)
+        for depth in depths:
+            board, color = setup_position(BOARD_CLASSES[args.board], position)
+            start = time.perf_counter()
+            if args.divide:
+                counts = divide(board, color, depth, not args.no_bulk)
+                nodes = sum(counts.values())
+            else:
+                nodes = perft(board, color, depth, not args.no_bulk)
+            elapsed = time.perf_counter() - start
+
+            expected = position['counts'][depth - 1] if depth <= len(position['counts']) else None
+            status = 'no reference' if expected is None else 'ok' if nodes == expected else f'FAIL (expected {expected})'
+            failures += expected is not None and nodes != expected
+            print(f"{position['name']:<12} depth {depth}: {nodes:>10} nodes  {nodes / elapsed:>12,.0f} nodes/s  {status}")
+            if args.divide:
+                for ((from_row, from_col), (to_row, to_col)), count in sorted(counts.items()):
+                    print(f"    ({from_row}, {from_col}) -> ({to_row}, {to_col}): {count}")
+    raise SystemExit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
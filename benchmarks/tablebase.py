@@ -0,0 +1,69 @@
+"""Endgame tablebase generation throughput and probe latency.
+
+Solves every ending with up to the given number of pieces with one worker and
+with every core, then times raw probes of random positions, full probes through
+the Board API and tablebase move selection.
+
+Run from the project root:  python -m benchmarks.tablebase [pieces]
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from src.models.Tablebase import (Tablebase, generate, signatures, slice_size, position_at, _bit_board,
+                                  INVALID, HEADER, slice_name)
+
+
+def random_positions(directory, pieces, count, rng):
+    positions = []
+    slices = signatures(pieces)
+    while len(positions) < count:
+        signature = rng.choice(slices)
+        index = rng.randrange(slice_size(signature))
+        with open(os.path.join(directory, slice_name(signature)), 'rb') as file:
+            file.seek(HEADER.size + index)
+            if file.read(1)[0] != INVALID:
+                positions.append(position_at(signature, index))
+    return positions
+
+
+def main():
+    pieces = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    total = sum(slice_size(signature) for signature in signatures(pieces))
+    print(f"up to {pieces} pieces: {len(signatures(pieces))} slices, {total:,} indexes")
+    directory = None
+    for workers in sorted({1, os.cpu_count() or 1}):
+        if directory is not None:
+            shutil.rmtree(directory)
+        directory = tempfile.mkdtemp()
+        start = time.perf_counter()
+        generate(directory, pieces, workers)
+        elapsed = time.perf_counter() - start
+        print(f"generate {workers:>2} workers {total / elapsed:>12,.0f} indexes/s  ({elapsed:.1f}s)")
+
+    rng = random.Random(0)
+    positions = random_positions(directory, pieces, 20000, rng)
+    tablebase = Tablebase(directory)
+    start = time.perf_counter()
+    for *masks, black_to_move in positions:
+        tablebase.probe_bits(*masks, black_to_move)
+    elapsed = time.perf_counter() - start
+    print(f"probe_bits {elapsed / len(positions) * 1e6:>9.2f} us")
+
+    boards = [(_bit_board(*masks), 'black' if black_to_move else 'white')
+              for *masks, black_to_move in positions[:2000]]
+    for label, probe in (('probe', tablebase.probe), ('best_move', tablebase.best_move)):
+        start = time.perf_counter()
+        for board, color in boards:
+            probe(board, color)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<10} {elapsed / len(boards) * 1e6:>9.2f} us")
+    tablebase.close()
+    shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""Load test for ws_server.py: spectators per process and broadcast latency.
+
+Starts the WebSocket server in this process, connects N spectators to one game
+from separate client processes, plays moves through Match.make_move and measures,
+for every spectator and move, the time from the accepted move to the event
+arriving at the client.
+
+Run from the project root:  python -m benchmarks.ws_spectators [counts] [moves]
+    e.g. python -m benchmarks.ws_spectators 100,1000,5000 20
+"""
+import asyncio
+import json
+import multiprocessing
+import random
+import sys
+import threading
+import time
+
+from websockets.asyncio.client import connect
+
+import ws_server
+from api_server import sessions
+
+PORT = 8799
+CLIENT_PROCESSES = 4
+
+
+def run_clients(url, count, moves, ready, results):
+    async def spectator(arrivals, connected):
+        async with connect(url, open_timeout=60, max_queue=None) as connection:
+            json.loads(await connection.recv())   # snapshot
+            connected.append(True)
+            if len(connected) == count:
+                ready.put(count)
+            for index in range(moves):
+                json.loads(await connection.recv())
+                arrivals.append((index, time.time()))
+
+    async def main():
+        arrivals, connected = [], []
+        await asyncio.gather(*(spectator(arrivals, connected) for _ in range(count)))
+        return arrivals
+
+    results.put(asyncio.run(main()))
+
+
+def start_server():
+    started = threading.Event()
+    thread = threading.Thread(
+        target=lambda: asyncio.run(ws_server.run('127.0.0.1', PORT, ready=lambda *_: started.set())),
+        daemon=True)
+    thread.start()
+    started.wait()
+
+
+def measure(spectators, moves):
+    session = sessions.create()
+    url = f'ws://127.0.0.1:{PORT}/games/{session.game_id}'
+    ready, results = multiprocessing.Queue(), multiprocessing.Queue()
+    shares = [spectators // CLIENT_PROCESSES + (index < spectators % CLIENT_PROCESSES)
+              for index in range(CLIENT_PROCESSES)]
+    shares = [share for share in shares if share]
+    processes = [multiprocessing.Process(target=run_clients, args=(url, share, moves, ready, results))
+                 for share in shares]
+    for process in processes:
+        process.start()
+    for _ in processes:
+        ready.get()
+
+    rng = random.Random(1)
+    sent = []
+    match = session.match
+    for _ in range(moves):
+        # Let the previous broadcast drain so each sample is one move's latency
+        time.sleep(0.05 + spectators / 50000)
+        with session.lock:
+            (from_row, from_col), (to_row, to_col) = rng.choice(sorted(match.current_player.get_all_possible_moves(match.board)))
+            sent.append(time.time())
+            match.make_move(from_row, from_col, to_row, to_col)
+
+    arrivals = []
+    for _ in processes:
+        arrivals.extend(results.get())
+    for process in processes:
+        process.join()
+    sessions.delete(session.game_id)
+
+    # Events arrive in move order, so a spectator's i-th event is move i
+    return sorted(arrival - sent[index] for index, arrival in arrivals)
+
+
+def main():
+    counts = [int(count) for count in (sys.argv[1] if len(sys.argv) > 1 else '100,1000,5000').split(',')]
+    moves = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    start_server()
+    print(f"{'spectators':>10} {'events':>8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for spectators in counts:
+        samples = measure(spectators, moves)
+        p50 = samples[len(samples) // 2] * 1000
+        p99 = samples[int(len(samples) * 0.99)] * 1000
+        print(f"{spectators:>10} {len(samples):>8} {p50:>8.1f} {p99:>8.1f} {samples[-1] * 1000:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,26 +1,9 @@
 import sys
 from src.models.Match import Match
-
-def parse_position(pos_str):
-    """Convert chess notation (e.g., 'A1') to row, col coordinates"""
-    if len(pos_str) != 2:
-        return None, None
-    col_char = pos_str[0].upper()
-    row_char = pos_str[1]
-    
-    if col_char not in 'ABCDEFGH' or row_char not in '12345678':
-        return None, None
-    
-    col = ord(col_char) - ord('A')
-    row = 8 - int(row_char)  # Convert to 0-based index from top
-    
-    return row, col
-
-def position_to_chess(row, col):
-    """Convert row, col coordinates to chess notation"""
-    col_char = chr(ord('A') + col)
-    row_char = str(8 - row)
-    return col_char + row_char
+from src.models.Board import Board
+from src.models.BitBoard import BitBoard
+from src.models.Engine import Engine
+from src.models.Notation import parse_position, position_to_chess
 
 def display_help():
     print("\n=== COMMANDS ===")
@@ -28,6 +11,7 @@ def display_help():
     print("2 - Show piece details")
     print("3 - Show current board")
     print("4 - Leave the game")
+    print("5 - Let the computer move")
     print("Help - Display this help")
     print("\nMove format: A1-H8 (ex: A1, B2, etc.)")
     print("===============================\n")
@@ -37,8 +21,10 @@ def main():
     print("Welcome To Checkers!")
     display_help()
     
-    match = Match()
+    # --bitboard switches to the bitmask board engine
+    match = Match(BitBoard if "--bitboard" in sys.argv else Board)
     match.start_game()
+    engine = Engine()
     
     while not match.is_game_over():
         print(f"\nPlayer's turn: {match.get_current_player_color()}")
@@ -94,6 +80,16 @@ def main():
             print("Ciao!")
             sys.exit()
             
+        elif choice == "5":
+            result = engine.search(match, time_ms=1000)
+            if result['move'] is None:
+                print("No movements available.")
+                continue
+            (from_row, from_col), (to_row, to_col) = result['move']
+            match.make_move(from_row, from_col, to_row, to_col)
+            print(f"Computer played: {position_to_chess(from_row, from_col)} -> {position_to_chess(to_row, to_col)}"
+                  f" (depth {result['depth']}, {result['nps']} nodes/s)")
+            
         elif choice.lower() == "Help":
             display_help()
             
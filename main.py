@@ -1,5 +1,6 @@
 import pygame
 import sys
+import time
 from src.models.Match import Match # Importe la classe Match qui contient toute la logique du jeu
 
 # --- Initialisation de Pygame ---
@@ -27,6 +28,12 @@ PIECE_RADIUS = SQUARE_SIZE // 3 # Rayon des cercles représentant les pièces
 
 # --- Police de Caractères ---
 FONT = pygame.font.SysFont("Arial", 30) # Définit la police et la taille pour le texte (ex: 'K' pour les rois)
+OVERLAY_FONT = pygame.font.SysFont("Arial", 18) # Police de l'affichage des performances (--overlay)
+
+# --- Surlignage ---
+SELECTED_COLOR = (0, 255, 0)  # Contour vert de la pièce sélectionnée
+TARGET_COLOR = (255, 255, 0)  # Contour jaune des cases de destination possibles
+HIGHLIGHT_WIDTH = 3           # Épaisseur des contours
 
 # --- Fonctions de Dessin ---
 
@@ -71,6 +78,120 @@ def draw_pieces(win, match):
                     text_rect = text_surface.get_rect(center=(center_x, center_y))
                     win.blit(text_surface, text_rect) # Affiche le texte sur la pièce
 
+def draw_highlights(win, selected_piece, possible_moves):
+    """
+    Entoure la pièce sélectionnée en vert et ses cases de destination en jaune.
+    """
+    if selected_piece:
+        s_row, s_col = selected_piece
+        pygame.draw.rect(win, SELECTED_COLOR, (s_col * SQUARE_SIZE, s_row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE), HIGHLIGHT_WIDTH)
+        for _, (t_row, t_col) in possible_moves:
+            pygame.draw.rect(win, TARGET_COLOR, (t_col * SQUARE_SIZE, t_row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE), HIGHLIGHT_WIDTH)
+
+# --- Rendu par zones modifiées ---
+
+class BoardRenderer:
+    """
+    Dessine le plateau en ne retraçant que les cases qui ont changé.
+    Le fond du plateau, les pièces (avec le 'K' des rois) et les contours sont
+    rendus une fois au démarrage ; ensuite chaque case se redessine en trois blits.
+    L'état affiché de chaque case est mémorisé : après un coup ou une sélection,
+    seules les cases dont la pièce ou le contour diffère sont retracées, et
+    render() renvoie leurs rectangles pour pygame.display.update().
+    """
+
+    def __init__(self, win):
+        self.win = win
+        self.background = pygame.Surface((WIDTH, HEIGHT)).convert()
+        draw_board(self.background)
+        self.pieces = {}
+        for color, fill, letter_color in (("white", WHITE_PIECE_COLOR, BLACK), ("black", BLACK_PIECE_COLOR, WHITE)):
+            for is_king in (False, True):
+                surface = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA).convert_alpha()
+                pygame.draw.circle(surface, fill, (SQUARE_SIZE // 2, SQUARE_SIZE // 2), PIECE_RADIUS)
+                if is_king:
+                    text_surface = FONT.render("K", True, letter_color)
+                    surface.blit(text_surface, text_surface.get_rect(center=(SQUARE_SIZE // 2, SQUARE_SIZE // 2)))
+                self.pieces[color, is_king] = surface
+        self.highlights = {}
+        for name, color in (("selected", SELECTED_COLOR), ("target", TARGET_COLOR)):
+            surface = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA).convert_alpha()
+            pygame.draw.rect(surface, color, (0, 0, SQUARE_SIZE, SQUARE_SIZE), HIGHLIGHT_WIDTH)
+            self.highlights[name] = surface
+        self.shown = {} # (row, col) -> (pièce, contour) actuellement à l'écran
+
+    def square_state(self, match, row, col, selected_piece, targets):
+        piece = match.board.get_piece(row, col)
+        highlight = None
+        if (row, col) == selected_piece:
+            highlight = "selected"
+        elif (row, col) in targets:
+            highlight = "target"
+        return (piece.color, piece.is_king) if piece else None, highlight
+
+    def invalidate(self, rect):
+        """Force le retraçage des cases sous rect (par exemple sous l'affichage des performances)"""
+        for row in range(rect.top // SQUARE_SIZE, min(ROWS, (rect.bottom - 1) // SQUARE_SIZE + 1)):
+            for col in range(rect.left // SQUARE_SIZE, min(COLS, (rect.right - 1) // SQUARE_SIZE + 1)):
+                self.shown.pop((row, col), None)
+
+    def render(self, match, selected_piece, possible_moves):
+        targets = {target for _, target in possible_moves} if selected_piece else set()
+        dirty = []
+        for row in range(ROWS):
+            for col in range(COLS):
+                state = self.square_state(match, row, col, selected_piece, targets)
+                if self.shown.get((row, col)) == state:
+                    continue
+                self.shown[row, col] = state
+                rect = pygame.Rect(col * SQUARE_SIZE, row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE)
+                self.win.blit(self.background, rect, rect)
+                piece, highlight = state
+                if piece:
+                    self.win.blit(self.pieces[piece], rect)
+                if highlight:
+                    self.win.blit(self.highlights[highlight], rect)
+                dirty.append(rect)
+        return dirty
+
+class PerformanceOverlay:
+    """
+    Affiche en haut à gauche le temps du dernier rendu, le nombre d'images par
+    seconde et l'utilisation du processeur par le jeu, mesurés sur chaque seconde.
+    """
+    INTERVAL = 1.0 # Secondes entre deux mises à jour des mesures
+
+    def __init__(self):
+        self.frames = 0
+        self.frame_ms = 0.0
+        self.started = time.perf_counter()
+        self.cpu_started = time.process_time()
+        self.text = "measuring..."
+        self.rect = pygame.Rect(0, 0, 0, 0)
+
+    def frame_done(self, seconds):
+        self.frames += 1
+        self.frame_ms = seconds * 1000
+
+    def refresh(self):
+        """Met à jour les mesures si INTERVAL est écoulé ; renvoie True si le texte a changé"""
+        now = time.perf_counter()
+        elapsed = now - self.started
+        if elapsed < self.INTERVAL:
+            return False
+        cpu = time.process_time()
+        self.text = (f"frame {self.frame_ms:.2f} ms  {self.frames / elapsed:.1f} fps  "
+                     f"cpu {(cpu - self.cpu_started) / elapsed:.0%}")
+        self.frames = 0
+        self.started, self.cpu_started = now, cpu
+        return True
+
+    def draw(self, win):
+        text_surface = OVERLAY_FONT.render(self.text, True, WHITE, BLACK)
+        self.rect = text_surface.get_rect(topleft=(4, 4))
+        win.blit(text_surface, self.rect)
+        return self.rect
+
 def get_row_col_from_mouse(pos):
     """
     Convertit les coordonnées de la souris en coordonnées de ligne/colonne du plateau.
@@ -104,7 +225,20 @@ def main():
     Fonction principale qui gère la boucle de jeu Pygame.
     Elle initialise la partie, gère les événements utilisateur (clics de souris),
     met à jour l'état du jeu et redessine l'écran.
+
+    Par défaut la boucle attend les événements et ne retrace que les cases qui
+    ont changé (BoardRenderer) ; --full-redraw repeint tout le plateau à chaque
+    tour de boucle, sans attendre. --overlay affiche le temps de rendu, les images
+    par seconde et l'utilisation du processeur.
     """
+    full_redraw = "--full-redraw" in sys.argv
+    overlay = PerformanceOverlay() if "--overlay" in sys.argv else None
+    renderer = None if full_redraw else BoardRenderer(WIN)
+    if renderer:
+        # Seuls ces événements changent l'affichage : les mouvements de souris ne réveillent plus la boucle
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed([pygame.QUIT, pygame.MOUSEBUTTONDOWN, pygame.VIDEOEXPOSE])
+
     match = Match() # Crée une nouvelle instance de la partie de dames
     match.start_game() # Initialise le plateau et les pièces pour la partie
     
@@ -114,12 +248,22 @@ def main():
     running = True # Variable de contrôle de la boucle de jeu
     while running:
         # --- Gestion des Événements Pygame ---
-        for event in pygame.event.get(): # Parcourt tous les événements en attente
+        if full_redraw or not renderer.shown:
+            events = pygame.event.get() # Parcourt tous les événements en attente
+        else:
+            # Une fois le plateau affiché, bloque jusqu'au prochain événement (au plus une
+            # seconde avec --overlay, pour rafraîchir les mesures) au lieu de tourner à vide
+            events = [pygame.event.wait(int(overlay.INTERVAL * 1000) if overlay else 0)]
+            events += pygame.event.get()
+        for event in events:
             if event.type == pygame.QUIT: # Si l'utilisateur clique sur le bouton de fermeture de la fenêtre
                 running = False # Arrête la boucle de jeu
 
+            if event.type == pygame.VIDEOEXPOSE and renderer: # La fenêtre doit être repeinte en entier
+                renderer.shown.clear()
+
             if event.type == pygame.MOUSEBUTTONDOWN: # Si un clic de souris est détecté
-                row, col = get_row_col_from_mouse(pygame.mouse.get_pos()) # Obtient la case cliquée
+                row, col = get_row_col_from_mouse(event.pos) # Obtient la case cliquée
                 piece = match.board.get_piece(row, col) # Récupère la pièce (s'il y en a une) sur la case cliquée
 
                 if selected_piece: # Si une pièce était déjà sélectionnée
@@ -141,21 +285,26 @@ def main():
                     possible_moves = match.get_possible_moves_for_piece(row, col) # Calcule ses mouvements possibles
 
         # --- Dessin de l'Écran ---
-        WIN.fill(BLACK) # Remplit l'écran en noir (efface le contenu précédent)
-        draw_board(WIN) # Dessine le plateau
-        draw_pieces(WIN, match) # Dessine les pièces
-
-        # --- Surlignage de la Pièce Sélectionnée et des Mouvements Possibles ---
-        if selected_piece:
-            s_row, s_col = selected_piece
-            # Dessine un rectangle vert autour de la pièce sélectionnée
-            pygame.draw.rect(WIN, (0, 255, 0), (s_col * SQUARE_SIZE, s_row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE), 3)
-            for move in possible_moves:     
-                _, (t_row, t_col) = move
-                # Dessine un rectangle jaune autour des cases de destination possibles
-                pygame.draw.rect(WIN, (255, 255, 0), (t_col * SQUARE_SIZE, t_row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE), 3)
-
-        pygame.display.flip() # Met à jour l'affichage de la fenêtre (rend visible tout ce qui a été dessiné)
+        frame_start = time.perf_counter()
+        if full_redraw:
+            WIN.fill(BLACK) # Remplit l'écran en noir (efface le contenu précédent)
+            draw_board(WIN) # Dessine le plateau
+            draw_pieces(WIN, match) # Dessine les pièces
+            draw_highlights(WIN, selected_piece, possible_moves) # Surligne la sélection et ses mouvements
+            if overlay:
+                overlay.refresh()
+                overlay.draw(WIN)
+            pygame.display.flip() # Met à jour l'affichage de la fenêtre (rend visible tout ce qui a été dessiné)
+        else:
+            if overlay and overlay.refresh():
+                renderer.invalidate(overlay.rect) # Efface l'ancien texte en retraçant les cases dessous
+            dirty = renderer.render(match, selected_piece, possible_moves) # Cases modifiées seulement
+            if overlay and dirty:
+                dirty.append(overlay.draw(WIN))
+            if dirty:
+                pygame.display.update(dirty) # N'envoie à l'écran que les rectangles modifiés
+        if overlay and (full_redraw or dirty):
+            overlay.frame_done(time.perf_counter() - frame_start)
 
         # --- Vérification de la Fin de Partie ---
         if match.is_game_over():
@@ -0,0 +1,67 @@
+"""Build and inspect opening books (see src/models/OpeningBook.py).
+
+    python opening_book.py build book.bin games1.ckga [games2.ckga ...] [--plies 16] [--min-games 2] [--workers N]
+    python opening_book.py probe book.bin [B6-A5 C3-B4 ...]
+
+build counts the first --plies moves of every game in the archives (PDN files can
+be converted first with archive.py import-pdn); probe lists the book moves of the
+position reached by the given moves from the start.
+"""
+import argparse
+import sys
+import time
+
+from src.models.Match import Match
+from src.models.Notation import parse_moves, format_move
+from src.models.OpeningBook import OpeningBook, build_book, DEFAULT_PLIES
+
+
+def build(args):
+    start = time.perf_counter()
+    entries = build_book(args.archives, args.book, args.min_games, args.plies, args.workers)
+    print(f"{entries} entries written to {args.book} in {time.perf_counter() - start:.1f}s")
+
+
+def probe(args):
+    match = Match()
+    match.start_game()
+    try:
+        moves = parse_moves(args.moves)
+    except ValueError as error:
+        sys.exit(str(error))
+    for (from_row, from_col), (to_row, to_col) in moves:
+        if not match.make_move(from_row, from_col, to_row, to_col):
+            sys.exit(f"illegal move after {len(match.history)} plies")
+    book = OpeningBook(args.book)
+    start = time.perf_counter()
+    found = book.lookup(match.get_position_key())
+    elapsed = time.perf_counter() - start
+    print(f"{len(found)} book moves for {match.get_current_player_color()} ({elapsed * 1e6:.1f} us)")
+    for (from_square, to_square), games, wins, draws, losses in sorted(found, key=lambda entry: -entry[1]):
+        print(f"{format_move(from_square, to_square)}  "
+              f"games {games:>7}  wins {wins:>7}  draws {draws:>7}  losses {losses:>7}")
+    best = book.best_move(match.board, match.get_current_player_color())
+    if best:
+        print(f"book move: {format_move(*best)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and inspect opening books")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build_parser = commands.add_parser('build')
+    build_parser.add_argument('book')
+    build_parser.add_argument('archives', nargs='+')
+    build_parser.add_argument('--plies', type=int, default=DEFAULT_PLIES, help="moves counted from each game")
+    build_parser.add_argument('--min-games', type=int, default=2, help="leave out moves played fewer times")
+    build_parser.add_argument('--workers', type=int, default=None, help="processes (default: CPU count)")
+    build_parser.set_defaults(run=build)
+    probe_parser = commands.add_parser('probe')
+    probe_parser.add_argument('book')
+    probe_parser.add_argument('moves', nargs='*')
+    probe_parser.set_defaults(run=probe)
+    args = parser.parse_args()
+    args.run(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+"""Headless self-play: play many games between two move-selection policies.
+
+Games are played on a process pool and each one is appended to the output file
+the moment it finishes, as a JSON line (.jsonl) or into a binary game archive
+(any other extension, see src/models/GameArchive.py and archive.py). Game K
+always uses seed (seed << 32) + K, so a run is reproducible whatever the number
+of workers, and --resume plays only the games missing from an existing file,
+e.g. after a crash. The first JSON line (or the archive header) records the run's
+settings: policies, seed, game count, ply limit, book and tablebase. --resume
+refuses a file started with other settings, whose games would not belong together.
+
+    python selfplay.py --games 1000 --white greedy --black depth:3 --out games.jsonl
+    python selfplay.py --games 100000 --white random --black random --out games.ckga --resume
+
+Policies: random, greedy (captures first), depth:N (search N plies), time:MS (search MS per move).
+With --book the search policies play from an opening book (see opening_book.py) first,
+and with --tablebase they play endings from an endgame tablebase (see tablebase.py).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from src.models import GameArchive
+from src.models.Notation import format_moves
+from src.models.OpeningBook import OpeningBook
+from src.models.Tablebase import Tablebase
+from src.models.SelfPlay import make_policy, play_game, MAX_GAME_PLIES
+
+
+# Policies of this worker process, created once by the pool initializer
+_white = _black = None
+
+
+def _init_worker(white, black, book_path, tablebase_path):
+    global _white, _black
+    book = OpeningBook(book_path) if book_path else None
+    tablebase = Tablebase(tablebase_path) if tablebase_path else None
+    _white, _black = make_policy(white, book, tablebase), make_policy(black, book, tablebase)
+
+
+def _play(number, seed, max_plies):
+    start = time.perf_counter()
+    winner, moves, codes = play_game(_white, _black, seed, max_plies)
+    return number, seed, winner, format_moves(moves), codes, os.getpid(), time.perf_counter() - start
+
+
+def check_resume(path, found, metadata):
+    """Raise ValueError when the output being resumed was started with other settings"""
+    changed = [key for key in sorted(set(found) | set(metadata)) if found.get(key) != metadata.get(key)]
+    if changed:
+        raise ValueError(f"cannot resume {path}: it was started with "
+                         + ', '.join(f"{key}={found.get(key)!r}" for key in changed)
+                         + ", not " + ', '.join(f"{key}={metadata.get(key)!r}" for key in changed))
+
+
+class JsonlOutput:
+    def __init__(self, path, metadata, resume):
+        self.metadata = metadata
+        self.done = set()
+        if resume and os.path.exists(path):
+            with open(path, 'rb+') as file:
+                end = 0
+                for line in file:
+                    if not line.endswith(b'\n'):
+                        break   # game cut off mid-write
+                    record = json.loads(line)
+                    if not end:
+                        if 'run' in record:
+                            check_resume(path, record['run'], metadata)
+                        else:
+                            # Written before the settings were recorded: what every record has
+                            check_resume(path, {'white': record['white'], 'black': record['black'],
+                                                'seed': record['seed'] >> 32},
+                                         {key: metadata[key] for key in ('white', 'black', 'seed')})
+                    self.done.add(record['game'])
+                    end += len(line)
+                file.truncate(end)
+        # The run's settings go into the first record of the file
+        self.first = not self.done
+        self.file = open(path, 'a' if resume else 'w')
+
+    def write(self, number, seed, winner, notation, codes):
+        record = {'game': number, 'seed': seed, 'white': self.metadata['white'], 'black': self.metadata['black'],
+                  'result': winner or 'draw', 'plies': len(notation), 'moves': notation}
+        if self.first:
+            record['run'] = self.metadata
+            self.first = False
+        self.file.write(json.dumps(record) + '\n')
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class ArchiveOutput:
+    def __init__(self, path, metadata, resume):
+        self.writer = GameArchive.ArchiveWriter(path, metadata, resume)
+        try:
+            check_resume(path, self.writer.metadata, metadata)
+        except ValueError:
+            self.writer.close()   # puts the index back, the games stay as they were
+            raise
+        self.done = self.writer.done
+
+    def write(self, number, seed, winner, notation, codes):
+        self.writer.add(number, seed, winner, codes)
+        self.writer.flush()
+
+    def close(self):
+        self.writer.close()
+
+
+def print_stats(workers, wall):
+    games = sum(stat['games'] for stat in workers.values())
+    plies = sum(stat['plies'] for stat in workers.values())
+    print(f"{'worker':>8} {'games':>8} {'plies':>10} {'games/s':>9} {'plies/s':>10}")
+    for pid, stat in sorted(workers.items()):
+        busy = stat['seconds'] or 1e-9
+        print(f"{pid:>8} {stat['games']:>8} {stat['plies']:>10} {stat['games'] / busy:>9.1f} {stat['plies'] / busy:>10.0f}")
+    wall = wall or 1e-9
+    print(f"{'total':>8} {games:>8} {plies:>10} {games / wall:>9.1f} {plies / wall:>10.0f}  ({wall:.1f}s wall)")
+
+
+def run(games, white, black, out, workers=None, seed=0, max_plies=MAX_GAME_PLIES, resume=False, progress=10.0,
+        book=None, tablebase=None):
+    # Fail on a bad policy name, book or tablebase before any worker starts
+    make_policy(white), make_policy(black)
+    if book:
+        OpeningBook(book).close()
+    if tablebase and not Tablebase(tablebase).max_pieces:
+        raise ValueError(f"no tablebase slices in {tablebase}")
+    metadata = {'white': white, 'black': black, 'seed': seed, 'games': games, 'max_plies': max_plies}
+    if book:
+        metadata['book'] = book
+    if tablebase:
+        metadata['tablebase'] = tablebase
+    output = (JsonlOutput if out.endswith('.jsonl') else ArchiveOutput)(out, metadata, resume)
+    pending = (number for number in range(games) if number not in output.done)
+    if output.done:
+        print(f"Resuming: {len(output.done)} games already in {out}")
+
+    workers = workers or os.cpu_count() or 1
+    stats = {}
+    start = last_report = time.perf_counter()
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(white, black, book, tablebase)) as executor:
+        # Keep a few games queued per worker rather than submitting the whole run up front
+        running = set()
+        try:
+            while True:
+                for number in pending:
+                    running.add(executor.submit(_play, number, (seed << 32) + number, max_plies))
+                    if len(running) >= workers * 4:
+                        break
+                if not running:
+                    break
+                finished, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    number, game_seed, winner, notation, codes, pid, seconds = future.result()
+                    output.write(number, game_seed, winner, notation, codes)
+                    stat = stats.setdefault(pid, {'games': 0, 'plies': 0, 'seconds': 0.0})
+                    stat['games'] += 1
+                    stat['plies'] += len(codes)
+                    stat['seconds'] += seconds
+                now = time.perf_counter()
+                if progress and now - last_report >= progress:
+                    last_report = now
+                    done = sum(stat['games'] for stat in stats.values())
+                    print(f"{done} games, {done / (now - start):.1f} games/s", flush=True)
+        finally:
+            output.close()
+    print_stats(stats, time.perf_counter() - start)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play checkers games between two policies")
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--white', default='random', help="random, greedy, depth:N or time:MS")
+    parser.add_argument('--black', default='random', help="random, greedy, depth:N or time:MS")
+    parser.add_argument('--out', default='games.jsonl', help=".jsonl for JSON lines, anything else for a binary archive")
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: CPU count)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-plies', type=int, default=MAX_GAME_PLIES, help="longer games are draws")
+    parser.add_argument('--resume', action='store_true', help="keep the games already in --out and play the rest")
+    parser.add_argument('--progress', type=float, default=10.0, help="seconds between progress lines (0: off)")
+    parser.add_argument('--book', default=None, help="opening book file for the search policies")
+    parser.add_argument('--tablebase', default=None, help="endgame tablebase directory for the search policies")
+    args = parser.parse_args()
+    try:
+        run(args.games, args.white, args.black, args.out, args.workers, args.seed, args.max_plies,
+            args.resume, args.progress, args.book, args.tablebase)
+    except ValueError as error:
+        sys.exit(str(error))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,284 @@
+import heapq
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from .BitBoard import BitBoard
+from .Engine import Engine, MAX_PLY, evaluate
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+CANCELLED = 'cancelled'
+FAILED = 'failed'
+FINISHED = (DONE, CANCELLED, FAILED)
+
+# Engine of each worker process and the stop flags it watches, one per pool slot
+_worker_engine = None
+_stop_flags = None
+
+
+def _init_worker(tt_bytes, book, tablebase, stop_flags):
+    global _worker_engine, _stop_flags
+    _worker_engine = Engine(tt_bytes, book=book, tablebase=tablebase)
+    _stop_flags = stop_flags
+
+
+def _analyze(board, color, time_ms, max_depth, slot):
+    result = _worker_engine.search(board, color, time_ms, max_depth, stop=lambda: _stop_flags[slot] != 0)
+    result['evaluation'] = evaluate(board, color)
+    return result
+
+
+class QueueFull(Exception):
+    pass
+
+
+class Job:
+    """One analysis request: a position, its side to move and a depth/time budget"""
+
+    def __init__(self, key, board, color, time_ms, max_depth, priority):
+        self.job_id = uuid.uuid4().hex
+        self.key = key
+        self.board = board
+        self.color = color
+        self.time_ms = time_ms
+        self.max_depth = max_depth
+        self.priority = priority
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.cached = False
+        self.requests = 1          # submissions sharing this job; cancelled when all have cancelled
+        self.slot = None
+        self.created = time.monotonic()
+        self.started = self.finished = None
+        self.version = 0           # bumped on every status change, for waiting and streaming
+
+    def to_dict(self):
+        body = {
+            'job_id': self.job_id,
+            'status': self.status,
+            'color': self.color,
+            'priority': self.priority,
+            'time_ms': self.time_ms,
+            'depth': self.max_depth,
+            'cached': self.cached,
+            'queued_ms': round(((self.started or self.finished or time.monotonic()) - self.created) * 1000, 1),
+        }
+        if self.result is not None:
+            body['result'] = self.result
+        if self.error is not None:
+            body['error'] = self.error
+        return body
+
+
+class AnalysisQueue:
+    """Runs engine searches on positions in a process pool, off the request threads.
+
+    submit() returns at once with a Job; at most `workers` jobs run at a time and
+    up to max_queued more wait, highest priority first (then oldest first). A
+    position already queued or running with the same budget is not searched twice:
+    the submission joins that job. Finished results are kept in an LRU keyed by
+    position and budget, so repeated questions are answered without a search.
+    Cancelling a running job raises the stop flag its worker's Engine checks
+    between nodes, and the search ends within a few milliseconds.
+    """
+
+    def __init__(self, workers=None, max_queued=1000, cache_size=10000, keep_finished=10000,
+                 tt_bytes=16 * 1024 * 1024, book=None, tablebase=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queued = max_queued
+        self.cache_size = cache_size
+        self.keep_finished = keep_finished
+        self.tt_bytes = tt_bytes
+        self.book = book
+        self.tablebase = tablebase
+        self.stop_flags = multiprocessing.RawArray('b', self.workers)
+        self.free_slots = list(range(self.workers))
+        self.executor = None
+        self.condition = threading.Condition()
+        self.heap = []                   # (-priority, sequence, job) of queued jobs, cancelled ones included
+        self.sequence = itertools.count()
+        self.queued = 0
+        self.jobs = OrderedDict()        # job id -> Job, oldest first; finished ones are dropped past keep_finished
+        self.in_flight = {}              # key -> queued or running Job
+        self.results = OrderedDict()     # key -> result, least recently used first
+        self.submitted = self.completed = self.cancelled = self.failed = 0
+        self.deduplicated = self.cache_hits = self.rejected = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _get_executor(self):
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                                initargs=(self.tt_bytes, self.book, self.tablebase, self.stop_flags))
+        return self.executor
+
+    def close(self):
+        with self.condition:
+            for job in list(self.in_flight.values()):
+                self._cancel(job)
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def submit(self, position, color=None, time_ms=1000, max_depth=MAX_PLY, priority=0):
+        """Queue a search of a Match (for its current player) or a Board (for color); returns its Job.
+
+        Raises QueueFull when max_queued jobs are already waiting.
+        """
+        if hasattr(position, 'current_player'):
+            color = color or position.current_player.color
+            position = position.board
+        if color is None:
+            raise ValueError("color is required when analysing a Board")
+        # Ship the compact bitboard to the workers; it is also the exact key of the position
+        board = BitBoard.from_board(position)
+        key = (board.white_men, board.white_kings, board.black_men, board.black_kings, color, time_ms, max_depth)
+        with self.condition:
+            self.submitted += 1
+            job = self.in_flight.get(key)
+            if job is not None:
+                job.requests += 1
+                self.deduplicated += 1
+                if priority > job.priority and job.status == QUEUED:
+                    # Queue it again at the higher priority; the old heap entry is skipped
+                    job.priority = priority
+                    heapq.heappush(self.heap, (-priority, next(self.sequence), job))
+                return job
+            job = Job(key, board, color, time_ms, max_depth, priority)
+            result = self.results.get(key)
+            if result is not None:
+                self.results.move_to_end(key)
+                self.cache_hits += 1
+                job.cached = True
+                self._finish(job, DONE, result=result)
+                self._remember(job)
+                return job
+            if self.queued >= self.max_queued:
+                self.rejected += 1
+                raise QueueFull(f"{self.queued} analysis jobs already waiting")
+            self.in_flight[key] = job
+            self.queued += 1
+            heapq.heappush(self.heap, (-priority, next(self.sequence), job))
+            self._remember(job)
+            self._dispatch()
+            return job
+
+    def get(self, job_id):
+        with self.condition:
+            return self.jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """Withdraw one submission of a job; the job stops once every submitter has withdrawn.
+        Returns the job, or None if there is no such job."""
+        with self.condition:
+            job = self.jobs.get(job_id)
+            if job is None or job.status in FINISHED:
+                return job
+            job.requests -= 1
+            if job.requests <= 0:
+                self._cancel(job)
+            return job
+
+    def wait(self, job, version, timeout):
+        """Block until job changes past version or is finished, or timeout seconds pass"""
+        with self.condition:
+            self.condition.wait_for(lambda: job.version > version or job.status in FINISHED, timeout)
+            return job.version
+
+    def _cancel(self, job):
+        if job.status == RUNNING:
+            # The worker sees the flag within ~1000 nodes; the job finishes as cancelled then
+            self.stop_flags[job.slot] = 1
+        else:
+            self.queued -= 1
+        self._finish(job, CANCELLED)
+
+    def _remember(self, job):
+        self.jobs[job.job_id] = job
+        while len(self.jobs) > self.keep_finished + len(self.in_flight):
+            oldest_id, oldest = next(iter(self.jobs.items()))
+            if oldest.status not in FINISHED:
+                break
+            del self.jobs[oldest_id]
+
+    def _finish(self, job, status, result=None, error=None):
+        """Record a job's end; the caller holds the condition"""
+        if job.status in FINISHED:
+            return
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished = time.monotonic()
+        job.version += 1
+        job.board = None
+        if self.in_flight.get(job.key) is job:
+            del self.in_flight[job.key]
+        if status == DONE and not job.cached:
+            self.completed += 1
+            self.results[job.key] = result
+            while len(self.results) > self.cache_size:
+                self.results.popitem(last=False)
+        elif status == CANCELLED:
+            self.cancelled += 1
+        elif status == FAILED:
+            self.failed += 1
+        self.condition.notify_all()
+
+    def _dispatch(self):
+        """Start queued jobs while pool slots are free; the caller holds the condition"""
+        while self.free_slots and self.heap:
+            neg_priority, _, job = heapq.heappop(self.heap)
+            if job.status != QUEUED or -neg_priority != job.priority:
+                continue   # cancelled, or an entry left behind by a priority raise
+            self.queued -= 1
+            job.slot = self.free_slots.pop()
+            self.stop_flags[job.slot] = 0
+            job.status = RUNNING
+            job.started = time.monotonic()
+            job.version += 1
+            future = self._get_executor().submit(_analyze, job.board, job.color, job.time_ms, job.max_depth, job.slot)
+            future.add_done_callback(lambda future, job=job: self._done(job, future))
+            self.condition.notify_all()
+
+    def _done(self, job, future):
+        with self.condition:
+            self.free_slots.append(job.slot)
+            error = future.exception()
+            if isinstance(error, BrokenProcessPool):
+                # A worker died (e.g. killed for memory): start a fresh pool for the next jobs
+                self.executor = None
+            if error is not None:
+                self._finish(job, FAILED, error=f'{type(error).__name__}: {error}')
+            else:
+                self._finish(job, DONE, result=future.result())
+            self._dispatch()
+
+    def get_stats(self):
+        with self.condition:
+            return {
+                'workers': self.workers,
+                'running': self.workers - len(self.free_slots),
+                'queued': self.queued,
+                'max_queued': self.max_queued,
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'cancelled': self.cancelled,
+                'failed': self.failed,
+                'deduplicated': self.deduplicated,
+                'cache_hits': self.cache_hits,
+                'cached_results': len(self.results),
+                'rejected': self.rejected,
+            }
@@ -0,0 +1,167 @@
+from .Board import Board, SQUARE_OF, SQUARE_AT, FEN_CHARS
+from .Piece import Man, King
+from .Zobrist import PIECE_KEYS
+
+EMPTY = 0
+# Piece code -> shared piece (index 0 is the empty square)
+PIECE_OF_CODE = (None, Man('white'), King('white'), Man('black'), King('black'))
+CODE_OF_PIECE = {(piece.color, piece.is_king): code for code, piece in enumerate(PIECE_OF_CODE) if piece}
+# Codes are in the order of Board's KINDS (code - 1), so squares map straight to to_fen
+FEN_OF_CODE = bytes.maketrans(bytes(range(5)), ('.' + FEN_CHARS).encode())
+# Zobrist key of each piece code on each square, the same keys as Board's
+KEYS = [[0] * 32] + [[PIECE_KEYS[piece.color, piece.is_king][row][col] for row, col in SQUARE_AT]
+                     for piece in PIECE_OF_CODE[1:]]
+START = bytes(3 if row < 3 else 1 if row > 4 else EMPTY for row, _ in SQUARE_AT)
+START_KEY = 0
+for _square, _code in enumerate(START):
+    START_KEY ^= KEYS[_code][_square]
+
+
+class ArrayBoard(Board):
+    """Board with the same API as Board, storing one byte per dark square.
+
+    The 32 playable squares, in SQUARE_AT order, are a bytearray of piece codes
+    and get_piece hands out the shared Man/King pieces. A board is a small object,
+    32 bytes of squares and its undo stack, a tenth of a list-backed Board, and a
+    copy is a bytearray copy. Move generation runs the pieces' get_possible_moves
+    on an 8x8 grid built for the call, which makes it slower than Board's; this
+    storage is for the many boards that are kept (sessions, caches), not for search.
+    """
+
+    def __init__(self):
+        self.squares = bytearray(START)
+        self.undo_stack = []
+        self.zobrist = START_KEY
+
+    @property
+    def board(self):
+        # 8x8 grid view for code, and piece move generation, that reads squares directly
+        grid = [[None] * 8 for _ in range(8)]
+        for square, code in enumerate(self.squares):
+            if code:
+                row, col = SQUARE_AT[square]
+                grid[row][col] = PIECE_OF_CODE[code]
+        return grid
+
+    def get_piece(self, row, col):
+        if 0 <= row < 8 and 0 <= col < 8:
+            square = SQUARE_OF[row][col]
+            if square >= 0:
+                return PIECE_OF_CODE[self.squares[square]]
+        return None
+
+    def set_piece(self, row, col, piece):
+        if 0 <= row < 8 and 0 <= col < 8 and SQUARE_OF[row][col] >= 0:
+            self.remove_piece(row, col)
+            if piece is None:
+                return
+            square = SQUARE_OF[row][col]
+            code = CODE_OF_PIECE[piece.color, piece.is_king]
+            self.squares[square] = code
+            self.zobrist ^= KEYS[code][square]
+            if self.evaluator is not None:
+                self.evaluator.added(piece, row, col)
+
+    def remove_piece(self, row, col):
+        piece = self.get_piece(row, col)
+        if piece is not None:
+            square = SQUARE_OF[row][col]
+            self.zobrist ^= KEYS[self.squares[square]][square]
+            self.squares[square] = EMPTY
+            if self.evaluator is not None:
+                self.evaluator.removed(piece, row, col)
+        return piece
+
+    def make_move(self, from_row, from_col, to_row, to_col):
+        """Play a move in place, without validating it, and push its undo record"""
+        squares = self.squares
+        source = SQUARE_OF[from_row][from_col]
+        target = SQUARE_OF[to_row][to_col]
+        code = squares[source]
+        previous_key = key = self.zobrist
+        key ^= KEYS[code][source]
+        squares[source] = EMPTY
+
+        # The captured piece sits just before the landing square (further away for a king)
+        captured = captured_code = captured_row = captured_col = None
+        if abs(to_row - from_row) >= 2:
+            captured_row = to_row - (1 if to_row > from_row else -1)
+            captured_col = to_col - (1 if to_col > from_col else -1)
+            captured = SQUARE_OF[captured_row][captured_col]
+            captured_code = squares[captured]
+            if captured_code:
+                key ^= KEYS[captured_code][captured]
+                squares[captured] = EMPTY
+
+        # Men are codes 1 (white) and 3 (black); the king of each is the next code
+        promoted = code in (1, 3) and to_row == (0 if code == 1 else 7)
+        landed = code + 1 if promoted else code
+        squares[target] = landed
+        self.zobrist = key ^ KEYS[landed][target]
+        self.undo_stack.append((source, target, code, captured, captured_code, previous_key))
+        if self.evaluator is not None:
+            self.evaluator.moved(PIECE_OF_CODE[code], from_row, from_col, to_row, to_col,
+                                 PIECE_OF_CODE[captured_code] if captured_code else None,
+                                 captured_row, captured_col, promoted)
+
+    def unmake_move(self):
+        """Take back the last move played with make_move or move_piece"""
+        source, target, code, captured, captured_code, self.zobrist = self.undo_stack.pop()
+        squares = self.squares
+        squares[target] = EMPTY
+        squares[source] = code
+        if captured_code:
+            squares[captured] = captured_code
+        if self.evaluator is not None:
+            self.evaluator.unmoved()
+
+    def list_moves(self, color):
+        grid = self.board
+        all_moves = []
+        for piece, row, col in self.get_all_pieces(color):
+            all_moves.extend(piece.get_possible_moves(grid, row, col))
+        return all_moves
+
+    def get_all_pieces(self, color):
+        codes = (1, 2) if color == 'white' else (3, 4)
+        return [(PIECE_OF_CODE[code], *SQUARE_AT[square])
+                for square, code in enumerate(self.squares) if code in codes]
+
+    def count_pieces(self, color):
+        squares = self.squares
+        if color == 'white':
+            return squares.count(1) + squares.count(2)
+        return squares.count(3) + squares.count(4)
+
+    def copy(self):
+        new_board = ArrayBoard.__new__(ArrayBoard)
+        new_board.squares = bytearray(self.squares)
+        new_board.undo_stack = []
+        new_board.zobrist = self.zobrist
+        return new_board
+
+    def square_masks(self):
+        masks = [0, 0, 0, 0]
+        for square, code in enumerate(self.squares):
+            if code:
+                masks[code - 1] |= 1 << square
+        return tuple(masks)
+
+    @classmethod
+    def from_square_masks(cls, masks):
+        board = cls.__new__(cls)
+        board.squares = squares = bytearray(32)
+        board.undo_stack = []
+        key = 0
+        for code, mask in enumerate(masks, 1):
+            while mask:
+                low = mask & -mask
+                square = low.bit_length() - 1
+                squares[square] = code
+                key ^= KEYS[code][square]
+                mask ^= low
+        board.zobrist = key
+        return board
+
+    def to_fen(self, color):
+        return ('B:' if color == 'black' else 'W:') + self.squares.translate(FEN_OF_CODE).decode()
@@ -0,0 +1,477 @@
+from .Board import Board
+from .Piece import Man, King
+from .Zobrist import PIECE_KEYS
+
+# The 32 dark squares are stored as bits of Python ints. Each pair of rows takes
+# 9 bits (4 + 4 squares + 1 unused "ghost" bit), so every diagonal step is a
+# constant shift: +4 down-left, +5 down-right, -5 up-left, -4 up-right.
+# Steps that leave the board land on a ghost bit or outside VALID_MASK.
+BIT_INDEX = [[-1] * 8 for _ in range(8)]   # (row, col) -> bit index, -1 on light squares
+BIT_SQUARE = [None] * 36                   # bit index -> (row, col)
+for _row in range(8):
+    for _col in range(8):
+        if (_row + _col) % 2 == 1:
+            _bit = _row * 4 + _col // 2 + _row // 2
+            BIT_INDEX[_row][_col] = _bit
+            BIT_SQUARE[_bit] = (_row, _col)
+
+VALID_MASK = 0
+for _bit, _square in enumerate(BIT_SQUARE):
+    if _square is not None:
+        VALID_MASK |= 1 << _bit
+
+BLACK_START = sum(1 << BIT_INDEX[r][c] for r in range(3) for c in range(8) if (r + c) % 2 == 1)
+WHITE_START = sum(1 << BIT_INDEX[r][c] for r in range(5, 8) for c in range(8) if (r + c) % 2 == 1)
+WHITE_KING_ROW = sum(1 << BIT_INDEX[0][c] for c in range(8) if c % 2 == 1)
+BLACK_KING_ROW = sum(1 << BIT_INDEX[7][c] for c in range(8) if c % 2 == 0)
+
+UP_STEPS = (-5, -4)
+DOWN_STEPS = (4, 5)
+ALL_STEPS = (-5, -4, 4, 5)
+STEP_OF_DIRECTION = {(1, -1): 4, (1, 1): 5, (-1, -1): -5, (-1, 1): -4}
+
+# (source, target) -> bit of the square just before target, for diagonal moves of 2+ rows.
+# A piece standing there is the one captured by the move.
+BEFORE_LANDING = {}
+for _source, _from in enumerate(BIT_SQUARE):
+    if _from is None:
+        continue
+    for (_dr, _dc), _step in STEP_OF_DIRECTION.items():
+        for _distance in range(2, 8):
+            _row, _col = _from[0] + _dr * _distance, _from[1] + _dc * _distance
+            if not (0 <= _row < 8 and 0 <= _col < 8):
+                break
+            _target = BIT_INDEX[_row][_col]
+            BEFORE_LANDING[_source, _target] = _target - _step
+
+# Zobrist keys of each piece kind, indexed by bit instead of (row, col)
+WHITE_MAN_KEYS, BLACK_MAN_KEYS, WHITE_KING_KEYS, BLACK_KING_KEYS = (
+    [PIECE_KEYS[kind][square[0]][square[1]] if square else 0 for square in BIT_SQUARE]
+    for kind in (('white', False), ('black', False), ('white', True), ('black', True))
+)
+
+# Shared piece objects handed out by get_piece; the bitboard itself stores no objects
+PIECES = {
+    ('white', False): Man('white'), ('black', False): Man('black'),
+    ('white', True): King('white'), ('black', True): King('black'),
+}
+
+
+class _MoveTables(dict):
+    """delta -> per-byte tables listing the moves (target - delta -> target) for each target bit set.
+
+    rays[source] holds, for each king direction, the ray mask, whether the ray walks
+    down the bit indexes, the position of each ray square, the ray squares and their moves.
+    The value type of a move is chosen by make_move, so the same tables feed both the
+    raw (source_bit, target_bit) pairs and the ((row, col), (row, col)) tuples of the API.
+    """
+
+    def __init__(self, make_move):
+        super().__init__()
+        self.make_move = make_move
+        self.rays = [[] for _ in BIT_SQUARE]
+        for source, square in enumerate(BIT_SQUARE):
+            if square is None:
+                continue
+            for (dr, dc), step in STEP_OF_DIRECTION.items():
+                ray_bits = []
+                row, col = square[0] + dr, square[1] + dc
+                while 0 <= row < 8 and 0 <= col < 8:
+                    ray_bits.append(BIT_INDEX[row][col])
+                    row, col = row + dr, col + dc
+                if ray_bits:
+                    self.rays[source].append((
+                        sum(1 << bit for bit in ray_bits),
+                        step < 0,
+                        {bit: index for index, bit in enumerate(ray_bits)},
+                        tuple(ray_bits),
+                        tuple(make_move(source, bit) for bit in ray_bits),
+                    ))
+
+    def __missing__(self, delta):
+        chunks = []
+        for shift in range(0, 40, 8):
+            chunk = []
+            for byte in range(256):
+                moves = []
+                for offset in range(8):
+                    target = shift + offset
+                    if byte >> offset & 1 and 0 <= target < len(BIT_SQUARE) and 0 <= target - delta < len(BIT_SQUARE):
+                        if BIT_SQUARE[target] is not None and BIT_SQUARE[target - delta] is not None:
+                            moves.append(self.make_move(target - delta, target))
+                chunk.append(tuple(moves))
+            chunks.append(chunk)
+        self[delta] = chunks
+        return chunks
+
+
+RAW_MOVES = _MoveTables(lambda source, target: (source, target))
+SQUARE_MOVES = _MoveTables(lambda source, target: (BIT_SQUARE[source], BIT_SQUARE[target]))
+
+
+def _extend(moves, tables, delta, mask):
+    chunks = tables[delta]
+    index = 0
+    while mask:
+        byte = mask & 0xFF
+        if byte:
+            moves.extend(chunks[index][byte])
+        mask >>= 8
+        index += 1
+
+
+def _bits(mask):
+    """Yield the bit indexes set in mask, lowest first"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class BitBoard(Board):
+    """Board with the same API as Board, backed by four integer bitmasks"""
+
+    def __init__(self):
+        self.white_men = 0
+        self.black_men = 0
+        self.white_kings = 0
+        self.black_kings = 0
+        self.undo_stack = []
+        self.zobrist = 0
+        self.initialize_board()
+
+    def initialize_board(self):
+        self.white_men |= WHITE_START
+        self.black_men |= BLACK_START
+        self.zobrist = self.compute_zobrist()
+        if self.evaluator is not None:
+            self.evaluator.reset()
+
+    def compute_zobrist(self):
+        key = 0
+        for mask, keys in ((self.white_men, WHITE_MAN_KEYS), (self.black_men, BLACK_MAN_KEYS),
+                           (self.white_kings, WHITE_KING_KEYS), (self.black_kings, BLACK_KING_KEYS)):
+            for bit in _bits(mask):
+                key ^= keys[bit]
+        return key
+
+    @classmethod
+    def from_board(cls, board):
+        new_board = cls.__new__(cls)
+        new_board.clear()
+        new_board.undo_stack = []
+        for color in ('white', 'black'):
+            for piece, row, col in board.get_all_pieces(color):
+                new_board.set_piece(row, col, piece)
+        return new_board
+
+    def clear(self):
+        self.white_men = self.black_men = self.white_kings = self.black_kings = 0
+        self.zobrist = 0
+        if self.evaluator is not None:
+            self.evaluator.reset()
+
+    @property
+    def board(self):
+        # Compatibility view for code that still reads the 8x8 grid directly
+        return [[self.get_piece(row, col) for col in range(8)] for row in range(8)]
+
+    def occupied(self):
+        return self.white_men | self.black_men | self.white_kings | self.black_kings
+
+    def get_piece(self, row, col):
+        if 0 <= row < 8 and 0 <= col < 8:
+            bit = BIT_INDEX[row][col]
+            if bit < 0:
+                return None
+            mask = 1 << bit
+            if self.white_men & mask:
+                return PIECES['white', False]
+            if self.black_men & mask:
+                return PIECES['black', False]
+            if self.white_kings & mask:
+                return PIECES['white', True]
+            if self.black_kings & mask:
+                return PIECES['black', True]
+        return None
+
+    def set_piece(self, row, col, piece):
+        if 0 <= row < 8 and 0 <= col < 8 and BIT_INDEX[row][col] >= 0:
+            self.remove_piece(row, col)
+            if piece is None:
+                return
+            bit = BIT_INDEX[row][col]
+            mask = 1 << bit
+            if piece.color == 'white':
+                if piece.is_king:
+                    self.white_kings |= mask
+                    self.zobrist ^= WHITE_KING_KEYS[bit]
+                else:
+                    self.white_men |= mask
+                    self.zobrist ^= WHITE_MAN_KEYS[bit]
+            else:
+                if piece.is_king:
+                    self.black_kings |= mask
+                    self.zobrist ^= BLACK_KING_KEYS[bit]
+                else:
+                    self.black_men |= mask
+                    self.zobrist ^= BLACK_MAN_KEYS[bit]
+            if self.evaluator is not None:
+                self.evaluator.added(piece, row, col)
+
+    def remove_piece(self, row, col):
+        piece = self.get_piece(row, col)
+        if piece is not None:
+            self.zobrist ^= PIECE_KEYS[piece.color, piece.is_king][row][col]
+            keep = ~(1 << BIT_INDEX[row][col])
+            self.white_men &= keep
+            self.black_men &= keep
+            self.white_kings &= keep
+            self.black_kings &= keep
+            if self.evaluator is not None:
+                self.evaluator.removed(piece, row, col)
+        return piece
+
+    def move_piece(self, from_row, from_col, to_row, to_col):
+        if not self.is_valid_move(from_row, from_col, to_row, to_col):
+            return False
+        self.make_bit_move(BIT_INDEX[from_row][from_col], BIT_INDEX[to_row][to_col])
+        return True
+
+    def make_move(self, from_row, from_col, to_row, to_col):
+        self.make_bit_move(BIT_INDEX[from_row][from_col], BIT_INDEX[to_row][to_col])
+
+    def make_bit_move(self, source, target):
+        # The four masks and the key are the whole position, so they are the undo record
+        self.undo_stack.append((self.white_men, self.black_men, self.white_kings, self.black_kings, self.zobrist))
+        if self.evaluator is None:
+            self.apply_move(source, target)
+            return
+        (from_row, from_col), (to_row, to_col) = BIT_SQUARE[source], BIT_SQUARE[target]
+        piece = self.get_piece(from_row, from_col)
+        captured = captured_row = captured_col = None
+        before = BEFORE_LANDING.get((source, target))
+        if before is not None:
+            captured_row, captured_col = BIT_SQUARE[before]
+            captured = self.get_piece(captured_row, captured_col)
+        promoted = not piece.is_king and bool(1 << target & (WHITE_KING_ROW if piece.color == 'white' else BLACK_KING_ROW))
+        self.apply_move(source, target)
+        self.evaluator.moved(piece, from_row, from_col, to_row, to_col, captured, captured_row, captured_col, promoted)
+
+    def unmake_move(self):
+        self.white_men, self.black_men, self.white_kings, self.black_kings, self.zobrist = self.undo_stack.pop()
+        if self.evaluator is not None:
+            self.evaluator.unmoved()
+
+    def is_valid_move(self, from_row, from_col, to_row, to_col):
+        if not (0 <= from_row < 8 and 0 <= from_col < 8 and 0 <= to_row < 8 and 0 <= to_col < 8):
+            return False
+        source = BIT_INDEX[from_row][from_col]
+        target = BIT_INDEX[to_row][to_col]
+        if source < 0 or target < 0:
+            return False
+        return (source, target) in self.generate_piece_moves(source)
+
+    def apply_move(self, source, target):
+        """Play a pseudo-legal move given as bit indexes (no validation)"""
+        from_mask = 1 << source
+        to_mask = 1 << target
+
+        # Captured piece is the one just before the landing square
+        before = BEFORE_LANDING.get((source, target))
+        if before is not None:
+            captured = 1 << before
+            if self.white_men & captured:
+                self.white_men ^= captured
+                self.zobrist ^= WHITE_MAN_KEYS[before]
+            elif self.black_men & captured:
+                self.black_men ^= captured
+                self.zobrist ^= BLACK_MAN_KEYS[before]
+            elif self.white_kings & captured:
+                self.white_kings ^= captured
+                self.zobrist ^= WHITE_KING_KEYS[before]
+            elif self.black_kings & captured:
+                self.black_kings ^= captured
+                self.zobrist ^= BLACK_KING_KEYS[before]
+
+        if (self.white_men | self.white_kings) & from_mask:
+            if self.white_kings & from_mask:
+                self.white_kings ^= from_mask | to_mask
+                self.zobrist ^= WHITE_KING_KEYS[source] ^ WHITE_KING_KEYS[target]
+            elif to_mask & WHITE_KING_ROW:
+                self.white_men ^= from_mask
+                self.white_kings |= to_mask
+                self.zobrist ^= WHITE_MAN_KEYS[source] ^ WHITE_KING_KEYS[target]
+            else:
+                self.white_men ^= from_mask | to_mask
+                self.zobrist ^= WHITE_MAN_KEYS[source] ^ WHITE_MAN_KEYS[target]
+        else:
+            if self.black_kings & from_mask:
+                self.black_kings ^= from_mask | to_mask
+                self.zobrist ^= BLACK_KING_KEYS[source] ^ BLACK_KING_KEYS[target]
+            elif to_mask & BLACK_KING_ROW:
+                self.black_men ^= from_mask
+                self.black_kings |= to_mask
+                self.zobrist ^= BLACK_MAN_KEYS[source] ^ BLACK_KING_KEYS[target]
+            else:
+                self.black_men ^= from_mask | to_mask
+                self.zobrist ^= BLACK_MAN_KEYS[source] ^ BLACK_MAN_KEYS[target]
+
+    def generate_moves(self, color):
+        """All moves for color as (source_bit, target_bit) pairs"""
+        return self._generate(color, RAW_MOVES)
+
+    def _generate(self, color, tables):
+        # Every move family is one shifted mask of target squares; the byte lookup
+        # tables turn each mask into its moves without a per-move Python loop.
+        empty = VALID_MASK & ~self.occupied()
+        moves = []
+        if color == 'white':
+            men, kings = self.white_men, self.white_kings
+            opponent = self.black_men | self.black_kings
+            # Men move up: -5 is up-left, -4 is up-right
+            _extend(moves, tables, -5, (men >> 5) & empty)
+            _extend(moves, tables, -4, (men >> 4) & empty)
+            _extend(moves, tables, -10, (((men >> 5) & opponent) >> 5) & empty)
+            _extend(moves, tables, -8, (((men >> 4) & opponent) >> 4) & empty)
+        else:
+            men, kings = self.black_men, self.black_kings
+            opponent = self.white_men | self.white_kings
+            # Men move down: +4 is down-left, +5 is down-right
+            _extend(moves, tables, 4, (men << 4) & empty)
+            _extend(moves, tables, 5, (men << 5) & empty)
+            _extend(moves, tables, 8, (((men << 4) & opponent) << 4) & empty)
+            _extend(moves, tables, 10, (((men << 5) & opponent) << 5) & empty)
+        for source in _bits(kings):
+            for ray_mask, descending, positions, ray_bits, ray_moves in tables.rays[source]:
+                blockers = ray_mask & ~empty
+                if not blockers:
+                    moves.extend(ray_moves)
+                    continue
+                # Nearest blocker: highest bit when walking down the bits, lowest otherwise
+                blocker = blockers.bit_length() - 1 if descending else (blockers & -blockers).bit_length() - 1
+                index = positions[blocker]
+                moves.extend(ray_moves[:index])
+                if opponent >> blocker & 1 and index + 1 < len(ray_bits) and empty >> ray_bits[index + 1] & 1:
+                    moves.append(ray_moves[index + 1])
+        return moves
+
+    def is_capture(self, source, target):
+        before = BEFORE_LANDING.get((source, target))
+        return before is not None and self.occupied() >> before & 1 == 1
+
+    def captured_is_king(self, source, target):
+        before = BEFORE_LANDING.get((source, target))
+        return before is not None and (self.white_kings | self.black_kings) >> before & 1 == 1
+
+    def generate_captures(self, color):
+        occupied = self.occupied()
+        captures = []
+        for move in self.generate_moves(color):
+            before = BEFORE_LANDING.get(move)
+            if before is not None and occupied >> before & 1:
+                captures.append(move)
+        return captures
+
+    def count_moves(self, color):
+        """Number of moves for color, counted with popcounts instead of listing them"""
+        empty = VALID_MASK & ~self.occupied()
+        if color == 'white':
+            men, kings = self.white_men, self.white_kings
+            opponent = self.black_men | self.black_kings
+            count = (((men >> 5) & empty).bit_count() + ((men >> 4) & empty).bit_count()
+                     + ((((men >> 5) & opponent) >> 5) & empty).bit_count()
+                     + ((((men >> 4) & opponent) >> 4) & empty).bit_count())
+        else:
+            men, kings = self.black_men, self.black_kings
+            opponent = self.white_men | self.white_kings
+            count = (((men << 4) & empty).bit_count() + ((men << 5) & empty).bit_count()
+                     + ((((men << 4) & opponent) << 4) & empty).bit_count()
+                     + ((((men << 5) & opponent) << 5) & empty).bit_count())
+        for source in _bits(kings):
+            for ray_mask, descending, positions, ray_bits, _ in RAW_MOVES.rays[source]:
+                blockers = ray_mask & ~empty
+                if not blockers:
+                    count += len(ray_bits)
+                    continue
+                blocker = blockers.bit_length() - 1 if descending else (blockers & -blockers).bit_length() - 1
+                index = positions[blocker]
+                count += index
+                if opponent >> blocker & 1 and index + 1 < len(ray_bits) and empty >> ray_bits[index + 1] & 1:
+                    count += 1
+        return count
+
+    def generate_piece_moves(self, source):
+        """Moves of the single piece on bit index source"""
+        mask = 1 << source
+        empty = VALID_MASK & ~self.occupied()
+        moves = []
+        if (self.white_men | self.white_kings) & mask:
+            opponent = self.black_men | self.black_kings
+            steps = ALL_STEPS if self.white_kings & mask else UP_STEPS
+        elif (self.black_men | self.black_kings) & mask:
+            opponent = self.white_men | self.white_kings
+            steps = ALL_STEPS if self.black_kings & mask else DOWN_STEPS
+        else:
+            return moves
+        king = steps is ALL_STEPS
+        for step in steps:
+            target = source + step
+            while target >= 0 and empty >> target & 1:
+                moves.append((source, target))
+                if not king:
+                    break
+                target += step
+            if target >= 0 and opponent >> target & 1:
+                jump = target + step
+                if jump >= 0 and empty >> jump & 1:
+                    moves.append((source, jump))
+        return moves
+
+    def list_piece_moves(self, row, col):
+        if not (0 <= row < 8 and 0 <= col < 8) or BIT_INDEX[row][col] < 0:
+            return []
+        return [(BIT_SQUARE[s], BIT_SQUARE[t]) for s, t in self.generate_piece_moves(BIT_INDEX[row][col])]
+
+    def list_moves(self, color):
+        return self._generate(color, SQUARE_MOVES)
+
+    def get_all_pieces(self, color):
+        if color == 'white':
+            men, kings = self.white_men, self.white_kings
+        else:
+            men, kings = self.black_men, self.black_kings
+        pieces = []
+        for bit in _bits(men | kings):
+            row, col = BIT_SQUARE[bit]
+            pieces.append((PIECES[color, bool(kings >> bit & 1)], row, col))
+        return pieces
+
+    def count_pieces(self, color):
+        if color == 'white':
+            return (self.white_men | self.white_kings).bit_count()
+        return (self.black_men | self.black_kings).bit_count()
+
+    def square_masks(self):
+        # Dropping the ghost bit after each pair of rows turns bit indexes into square numbers
+        return tuple(mask & 0xFF | mask >> 1 & 0xFF00 | mask >> 2 & 0xFF0000 | mask >> 3 & 0xFF000000
+                     for mask in (self.white_men, self.white_kings, self.black_men, self.black_kings))
+
+    @classmethod
+    def from_square_masks(cls, masks):
+        board = cls.__new__(cls)
+        board.white_men, board.white_kings, board.black_men, board.black_kings = (
+            mask & 0xFF | (mask & 0xFF00) << 1 | (mask & 0xFF0000) << 2 | (mask & 0xFF000000) << 3 for mask in masks)
+        board.undo_stack = []
+        board.zobrist = board.compute_zobrist()
+        return board
+
+    def copy(self):
+        new_board = BitBoard.__new__(BitBoard)
+        new_board.white_men = self.white_men
+        new_board.black_men = self.black_men
+        new_board.white_kings = self.white_kings
+        new_board.black_kings = self.black_kings
+        new_board.zobrist = self.zobrist
+        new_board.undo_stack = []
+        return new_board
@@ -1,8 +1,35 @@
+import struct
+
 from .Piece import Man, King
+from .Zobrist import PIECE_KEYS, piece_key
+
+# One (row, col) tuple per square, shared as piece_squares keys by every board
+SQUARES = [[(row, col) for col in range(8)] for row in range(8)]
+
+# The dark squares are numbered 0-31 row by row from the top left, the one
+# numbering of the compact encodings, GameArchive, GameStore, PDN, OpeningBook,
+# ArrayBoard and BoardBatch. Square masks keep one mask per piece kind, in this order
+SQUARE_OF = [[row * 4 + col // 2 if (row + col) % 2 == 1 else -1 for col in range(8)] for row in range(8)]
+SQUARE_AT = [(square // 4, square % 4 * 2 + (1 - square // 4 % 2)) for square in range(32)]
+KINDS = (('white', False), ('white', True), ('black', False), ('black', True))
+PIECE_OF_KIND = tuple(King(color) if is_king else Man(color) for color, is_king in KINDS)
+
+# to_fen: side to move, ':', then one character per square ('.' when empty)
+FEN_CHARS = 'wWbB'
+FEN_INVALID = str.maketrans('', '', '.' + FEN_CHARS)
+FEN_BITS = [str.maketrans({char: '1' if char == kind else '0' for char in '.' + FEN_CHARS}) for kind in FEN_CHARS]
+# to_bytes: side to move (0 white, 1 black), then white, black and king square masks
+PACKED = struct.Struct('<BIII')
 
 class Board:
+    evaluator = None    # Evaluator told about every change below, when set
+
     def __init__(self):
         self.board = [[None for _ in range(8)] for _ in range(8)]
+        self.undo_stack = []
+        self.zobrist = 0   # Zobrist key of the pieces, kept up to date by every change
+        # Per-colour index {(row, col): piece}, kept up to date like the key
+        self.piece_squares = {'white': {}, 'black': {}}
         self.initialize_board()
 
     def initialize_board(self):
@@ -10,13 +37,13 @@ class Board:
         for row in range(3):
             for col in range(8):
                 if (row + col) % 2 == 1:  # Dark squares
-                    self.board[row][col] = Man('black')
+                    self.set_piece(row, col, Man('black'))
 
         # Place white pieces (bottom 3 rows, dark squares only)
         for row in range(5, 8):
             for col in range(8):
                 if (row + col) % 2 == 1:  # Dark squares
-                    self.board[row][col] = Man('white')
+                    self.set_piece(row, col, Man('white'))
 
     def get_piece(self, row, col):
         if 0 <= row < 8 and 0 <= col < 8:
@@ -25,12 +52,23 @@ class Board:
 
     def set_piece(self, row, col, piece):
         if 0 <= row < 8 and 0 <= col < 8:
+            self.remove_piece(row, col)
+            if piece is not None:
+                self.zobrist ^= piece_key(piece, row, col)
+                self.piece_squares[piece.color][SQUARES[row][col]] = piece
             self.board[row][col] = piece
+            if piece is not None and self.evaluator is not None:
+                self.evaluator.added(piece, row, col)
 
     def remove_piece(self, row, col):
         if 0 <= row < 8 and 0 <= col < 8:
             piece = self.board[row][col]
+            if piece is not None:
+                self.zobrist ^= piece_key(piece, row, col)
+                del self.piece_squares[piece.color][row, col]
             self.board[row][col] = None
+            if piece is not None and self.evaluator is not None:
+                self.evaluator.removed(piece, row, col)
             return piece
         return None
 
@@ -43,23 +81,56 @@ class Board:
         if not self.is_valid_move(from_row, from_col, to_row, to_col):
             return False
 
-        # Move the piece
-        self.remove_piece(from_row, from_col)
-        self.set_piece(to_row, to_col, piece)
+        self.make_move(from_row, from_col, to_row, to_col)
+        return True
+
+    def make_move(self, from_row, from_col, to_row, to_col):
+        """Play a move in place, without validating it, and push its undo record"""
+        piece = self.board[from_row][from_col]
+        self.board[from_row][from_col] = None
+        own_squares = self.piece_squares[piece.color]
+        del own_squares[from_row, from_col]
+        previous_key = self.zobrist
+        key = previous_key ^ PIECE_KEYS[piece.color, piece.is_king][from_row][from_col]
 
-        # Check for capture
-        if abs(to_row - from_row) == 2:
-            captured_row = (from_row + to_row) // 2
-            captured_col = (from_col + to_col) // 2
-            captured_piece = self.remove_piece(captured_row, captured_col)
+        # Check for capture (the captured piece sits just before the landing square,
+        # which is the middle square for a man and can be further away for a king)
+        captured_piece = captured_row = captured_col = None
+        if abs(to_row - from_row) >= 2:
+            captured_row = to_row - (1 if to_row > from_row else -1)
+            captured_col = to_col - (1 if to_col > from_col else -1)
+            captured_piece = self.board[captured_row][captured_col]
+            if captured_piece is not None:
+                self.board[captured_row][captured_col] = None
+                del self.piece_squares[captured_piece.color][captured_row, captured_col]
+                key ^= PIECE_KEYS[captured_piece.color, captured_piece.is_king][captured_row][captured_col]
 
         # Check for king promotion
-        if piece.color == 'white' and to_row == 0 and not piece.is_king:
-            self.board[to_row][to_col] = King(piece.color)
-        elif piece.color == 'black' and to_row == 7 and not piece.is_king:
-            self.board[to_row][to_col] = King(piece.color)
+        promoted = not piece.is_king and to_row == (0 if piece.color == 'white' else 7)
+        self.board[to_row][to_col] = own_squares[SQUARES[to_row][to_col]] = King(piece.color) if promoted else piece
+        self.zobrist = key ^ PIECE_KEYS[piece.color, piece.is_king or promoted][to_row][to_col]
 
-        return True
+        # Undo record: moved piece, its squares, captured piece and square, promotion flag, old key
+        self.undo_stack.append((piece, from_row, from_col, to_row, to_col,
+                                captured_piece, captured_row, captured_col, promoted, previous_key))
+        if self.evaluator is not None:
+            self.evaluator.moved(piece, from_row, from_col, to_row, to_col,
+                                 captured_piece, captured_row, captured_col, promoted)
+
+    def unmake_move(self):
+        """Take back the last move played with make_move or move_piece"""
+        (piece, from_row, from_col, to_row, to_col,
+         captured_piece, captured_row, captured_col, _, self.zobrist) = self.undo_stack.pop()
+        self.board[to_row][to_col] = None
+        self.board[from_row][from_col] = piece
+        own_squares = self.piece_squares[piece.color]
+        del own_squares[to_row, to_col]
+        own_squares[SQUARES[from_row][from_col]] = piece
+        if captured_piece is not None:
+            self.board[captured_row][captured_col] = captured_piece
+            self.piece_squares[captured_piece.color][SQUARES[captured_row][captured_col]] = captured_piece
+        if self.evaluator is not None:
+            self.evaluator.unmoved()
 
     def is_valid_move(self, from_row, from_col, to_row, to_col):
         # Check bounds
@@ -80,17 +151,30 @@ class Board:
             return False
 
         # Get possible moves for the piece
-        possible_moves = piece.get_possible_moves(self.board, from_row, from_col)
+        possible_moves = self.get_piece_moves(from_row, from_col)
         return ((from_row, from_col), (to_row, to_col)) in possible_moves
 
+    def get_piece_moves(self, row, col):
+        return self.list_piece_moves(row, col)
+
+    def list_piece_moves(self, row, col):
+        piece = self.get_piece(row, col)
+        return piece.get_possible_moves(self.board, row, col) if piece is not None else []
+
+    def get_all_moves(self, color):
+        return self.list_moves(color)
+
+    def list_moves(self, color):
+        all_moves = []
+        for (row, col), piece in self.piece_squares[color].items():
+            all_moves.extend(piece.get_possible_moves(self.board, row, col))
+        return all_moves
+
     def get_all_pieces(self, color):
-        pieces = []
-        for row in range(8):
-            for col in range(8):
-                piece = self.board[row][col]
-                if piece is not None and piece.color == color:
-                    pieces.append((piece, row, col))
-        return pieces
+        return [(piece, row, col) for (row, col), piece in sorted(self.piece_squares[color].items())]
+
+    def count_pieces(self, color):
+        return len(self.piece_squares[color])
 
     def display(self):
         print("  A B C D E F G H")
@@ -100,7 +184,7 @@ class Board:
                 if (row + col) % 2 == 0:
                     print("□", end=" ")  # Light square
                 else:
-                    piece = self.board[row][col]
+                    piece = self.get_piece(row, col)
                     if piece is None:
                         print("■", end=" ")  # Dark empty square
                     else:
@@ -112,16 +196,82 @@ class Board:
         print("  A B C D E F G H")
 
     def copy(self):
-        new_board = Board()
-        for row in range(8):
-            for col in range(8):
-                if self.board[row][col] is not None:
-                    piece = self.board[row][col]
-                    if piece.is_king:
-                        new_board.board[row][col] = King(piece.color)
-                    else:
-                        new_board.board[row][col] = Man(piece.color)
-                else:
-                    new_board.board[row][col] = None
+        # Pieces are shared and immutable: copy the squares, not the pieces
+        new_board = Board.__new__(Board)
+        new_board.board = [row[:] for row in self.board]
+        new_board.undo_stack = []
+        new_board.zobrist = self.zobrist
+        new_board.piece_squares = {color: dict(squares) for color, squares in self.piece_squares.items()}
         return new_board
 
+    # --- Compact encodings: exact, hashable snapshots of a position and side to move ---
+
+    def square_masks(self):
+        """(white men, white kings, black men, black kings) masks of the squares in SQUARE_AT order"""
+        masks = [0, 0, 0, 0]
+        for color, kind in (('white', 0), ('black', 2)):
+            for (row, col), piece in self.piece_squares[color].items():
+                masks[kind + piece.is_king] |= 1 << SQUARE_OF[row][col]
+        return tuple(masks)
+
+    @classmethod
+    def from_square_masks(cls, masks):
+        """New board holding the pieces of square_masks() masks, which must not overlap"""
+        board = cls.__new__(cls)
+        board.board = grid = [[None] * 8 for _ in range(8)]
+        board.undo_stack = []
+        board.piece_squares = {'white': {}, 'black': {}}
+        key = 0
+        for (color, is_king), piece, mask in zip(KINDS, PIECE_OF_KIND, masks):
+            own_squares = board.piece_squares[color]
+            keys = PIECE_KEYS[color, is_king]
+            while mask:
+                low = mask & -mask
+                row, col = SQUARE_AT[low.bit_length() - 1]
+                grid[row][col] = own_squares[SQUARES[row][col]] = piece
+                key ^= keys[row][col]
+                mask ^= low
+        board.zobrist = key
+        return board
+
+    def to_fen(self, color):
+        """34-character string of the position with color to move, e.g. 'B:bbbbbbbbbbbb........wwwwwwwwwwww'
+
+        'W:' or 'B:' names the side to move, then each dark square in SQUARE_AT
+        order is w/W for a white man/king, b/B for a black one, '.' when empty.
+        """
+        cells = ['.'] * 32
+        for char, mask in zip(FEN_CHARS, self.square_masks()):
+            while mask:
+                low = mask & -mask
+                cells[low.bit_length() - 1] = char
+                mask ^= low
+        return ('B:' if color == 'black' else 'W:') + ''.join(cells)
+
+    @classmethod
+    def from_fen(cls, text):
+        """(board, side to move) of a to_fen string; raises ValueError if it is not one"""
+        squares = text[2:]
+        if len(text) != 34 or text[:2] not in ('W:', 'B:') or squares.translate(FEN_INVALID):
+            raise ValueError(f"bad board string {text!r}")
+        # Each kind's mask is its characters read as binary digits, square 0 lowest
+        masks = [int(squares.translate(bits)[::-1], 2) for bits in FEN_BITS]
+        return cls.from_square_masks(masks), 'white' if text[0] == 'W' else 'black'
+
+    def to_bytes(self, color):
+        """13-byte packed form of the position with color to move (see PACKED)"""
+        white_men, white_kings, black_men, black_kings = self.square_masks()
+        return PACKED.pack(color == 'black', white_men | white_kings, black_men | black_kings,
+                           white_kings | black_kings)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """(board, side to move) of a to_bytes string; raises ValueError if it is not one"""
+        if len(data) != PACKED.size:
+            raise ValueError(f"packed board must be {PACKED.size} bytes, got {len(data)}")
+        side, white, black, kings = PACKED.unpack(data)
+        if side > 1 or white & black or kings & ~(white | black):
+            raise ValueError(f"bad packed board {bytes(data).hex()}")
+        board = cls.from_square_masks((white & ~kings, white & kings, black & ~kings, black & kings))
+        return board, 'black' if side else 'white'
+
@@ -0,0 +1,252 @@
+"""Move generation and evaluation over many boards at once, with NumPy.
+
+A batch of boards is an (N, 32) int8 array over the dark squares, numbered 0-31
+row by row from the top left (square = row * 4 + col // 2, Board's SQUARE_AT),
+holding EMPTY, WHITE_MAN, WHITE_KING, BLACK_MAN or BLACK_KING. An (N, 8, 8) array
+with the same codes (light squares ignored) is accepted wherever a batch is.
+BitBoards go straight to their masks with from_bitboards, for bitmask_move_masks.
+
+Requires numpy (in requirements-dev.txt).
+"""
+from operator import attrgetter
+
+import numpy as np
+
+from .BitBoard import BIT_SQUARE, VALID_MASK, STEP_OF_DIRECTION
+from .Board import Board, SQUARE_OF, SQUARE_AT
+from .Engine import MAN_VALUE, KING_VALUE, ADVANCE_BONUS
+from .Piece import Man, King
+
+EMPTY = 0
+WHITE_MAN = 1
+WHITE_KING = 2
+BLACK_MAN = -1
+BLACK_KING = -2
+CODES = {('white', False): WHITE_MAN, ('white', True): WHITE_KING,
+         ('black', False): BLACK_MAN, ('black', True): BLACK_KING}
+PIECES = {WHITE_MAN: Man('white'), WHITE_KING: King('white'), BLACK_MAN: Man('black'), BLACK_KING: King('black')}
+
+SQUARE_ROWS = np.array([row for row, _ in SQUARE_AT])
+SQUARE_COLS = np.array([col for _, col in SQUARE_AT])
+
+# Move generation runs on uint64 bitmasks laid out like BitBoard, where every
+# diagonal step is a constant shift, one mask per board and piece kind.
+VALID = np.uint64(VALID_MASK)
+BYTE_MASKS = [np.uint64(0xFF << shift) for shift in range(0, 32, 8)]
+ONE, TWO, THREE = np.uint64(1), np.uint64(2), np.uint64(3)
+DIRECTIONS = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+STEPS = [STEP_OF_DIRECTION[direction] for direction in DIRECTIONS]
+WHITE_FORWARD = (0, 1)   # white men move up the board, black men down
+# Bit distance from a move's start to its landing square, per direction and distance
+MOVE_OFFSETS = np.array([(k + 1) * step for step in STEPS for k in range(7)], dtype=np.int64)
+
+# (piece code, value of that piece on each square) from white's point of view.
+# The piece-square tables match Engine.evaluate.
+PIECE_SQUARE = [
+    (WHITE_MAN, (MAN_VALUE + ADVANCE_BONUS * (7 - SQUARE_ROWS)).astype(np.float32)),
+    (WHITE_KING, np.full(32, KING_VALUE, dtype=np.float32)),
+    (BLACK_MAN, (-MAN_VALUE - ADVANCE_BONUS * SQUARE_ROWS).astype(np.float32)),
+    (BLACK_KING, np.full(32, -KING_VALUE, dtype=np.float32)),
+]
+MATERIAL = [(code, np.full(32, value, dtype=np.float32))
+            for code, value in ((WHITE_MAN, MAN_VALUE), (WHITE_KING, KING_VALUE),
+                                (BLACK_MAN, -MAN_VALUE), (BLACK_KING, -KING_VALUE))]
+
+
+def as_squares(boards):
+    """(N, 32) view of a batch given as (N, 32) or (N, 8, 8)"""
+    boards = np.asarray(boards, dtype=np.int8)
+    if boards.ndim == 3 and boards.shape[1:] == (8, 8):
+        return boards[:, SQUARE_ROWS, SQUARE_COLS]
+    if boards.ndim == 2 and boards.shape[1] == 32:
+        return boards
+    raise ValueError(f"expected an (N, 32) or (N, 8, 8) batch, got shape {boards.shape}")
+
+
+def to_grid(boards):
+    """(N, 8, 8) array of a batch, with EMPTY on the light squares"""
+    boards = as_squares(boards)
+    grid = np.zeros((len(boards), 8, 8), dtype=np.int8)
+    grid[:, SQUARE_ROWS, SQUARE_COLS] = boards
+    return grid
+
+
+def from_boards(boards):
+    """Batch of Board objects (Board, BitBoard or anything with get_all_pieces)"""
+    batch = np.zeros((len(boards), 32), dtype=np.int8)
+    for index, board in enumerate(boards):
+        for color in ('white', 'black'):
+            for piece, row, col in board.get_all_pieces(color):
+                batch[index, SQUARE_OF[row][col]] = CODES[color, piece.is_king]
+    return batch
+
+
+def to_board(squares, board_class=Board):
+    """board_class object for one row of a batch"""
+    board = board_class()
+    for color in ('white', 'black'):
+        for _, row, col in board.get_all_pieces(color):
+            board.remove_piece(row, col)
+    squares = np.asarray(squares)
+    for square in np.flatnonzero(squares).tolist():
+        board.set_piece(*SQUARE_AT[square], PIECES[int(squares[square])])
+    return board
+
+
+def to_boards(boards, board_class=Board):
+    return [to_board(squares, board_class) for squares in as_squares(boards)]
+
+
+def _black_to_move(colors, count):
+    """(N,) bool array, True where black is to move; colors is one color or one per board"""
+    if isinstance(colors, str):
+        return np.full(count, colors == 'black')
+    black = np.fromiter((color == 'black' for color in colors), dtype=bool)
+    if black.shape != (count,):
+        raise ValueError(f"expected {count} colors, got {black.shape[0]}")
+    return black
+
+
+def to_bitmasks(boards):
+    """(N, 4) uint64 array of the white men, white kings, black men and black kings
+    masks of each board, in BitBoard's bit layout"""
+    boards = as_squares(boards)
+    masks = []
+    for code in (WHITE_MAN, WHITE_KING, BLACK_MAN, BLACK_KING):
+        squares = np.packbits(boards == code, axis=1, bitorder='little').view('<u4').ravel().astype(np.uint64)
+        # BitBoard leaves one unused bit after every pair of rows (8 squares)
+        masks.append(squares & BYTE_MASKS[0] | (squares & BYTE_MASKS[1]) << ONE | (squares & BYTE_MASKS[2]) << TWO
+                     | (squares & BYTE_MASKS[3]) << THREE)
+    return np.stack(masks, axis=1)
+
+
+def _shift(mask, step):
+    shifted = mask << np.uint64(step) if step > 0 else mask >> np.uint64(-step)
+    return shifted & VALID
+
+
+def from_bitboards(bitboards):
+    """(N, 4) uint64 array of BitBoards' masks, as to_bitmasks gives for a batch.
+
+    BitBoard already keeps these masks, so this skips building an (N, 32) batch.
+    """
+    count = len(bitboards)
+    return np.stack([np.fromiter(map(attrgetter(name), bitboards), dtype=np.uint64, count=count)
+                     for name in ('white_men', 'white_kings', 'black_men', 'black_kings')], axis=1)
+
+
+def legal_move_masks(boards, colors):
+    """(N, 4, 7) uint64 move masks: bit t of [n, direction, k] is set when colors[n]
+    has a move on board n landing on bit t, k + 1 steps away in DIRECTIONS[direction].
+
+    colors is one color for the whole batch or one per board. The moves are those
+    of Player.get_all_possible_moves: men step or jump forward, kings slide over
+    empty squares and jump the first piece in their way when it is an opponent's.
+    A landing square, direction and distance name one move, as they fix its start.
+    """
+    return bitmask_move_masks(to_bitmasks(boards), colors)
+
+
+def bitmask_move_masks(masks, colors):
+    """legal_move_masks of boards given as the (N, 4) masks of to_bitmasks or from_bitboards"""
+    masks = np.asarray(masks, dtype=np.uint64)
+    count = len(masks)
+    black = _black_to_move(colors, count)
+    white_men, white_kings, black_men, black_kings = masks.T
+    zero = np.uint64(0)
+    men_forward = {True: np.where(black, zero, white_men), False: np.where(black, black_men, zero)}
+    kings = np.where(black, black_kings, white_kings)
+    opponent = np.where(black, white_men | white_kings, black_men | black_kings)
+    empty = VALID & ~(white_men | white_kings | black_men | black_kings)
+
+    # Filled direction by direction, one contiguous row of boards at a time
+    moves = np.zeros((4, 7, count), dtype=np.uint64)
+    for direction, step in enumerate(STEPS):
+        rows = moves[direction]
+        men = men_forward[direction in WHITE_FORWARD]
+        ahead = _shift(men, step)
+        rows[0] = ahead & empty
+        rows[1] = _shift(ahead & opponent, step) & empty
+        # Kings slide until no board has a king with an empty square further on
+        reach = kings
+        for k in range(7):
+            # Squares k + 1 steps away over empty squares, and jumps over the piece found there
+            ahead = _shift(reach, step)
+            if k < 6:
+                rows[k + 1] |= _shift(ahead & opponent, step) & empty
+            reach = ahead & empty
+            rows[k] |= reach
+            if not reach.any():
+                break
+    return moves.transpose(2, 0, 1)
+
+
+def _popcount(masks):
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(masks)
+    return np.unpackbits(masks[..., None].view(np.uint8), axis=-1).sum(axis=-1)
+
+
+def move_counts(boards, colors):
+    """(N,) number of moves of colors on each board"""
+    return _popcount(legal_move_masks(boards, colors)).sum(axis=(1, 2), dtype=np.int64)
+
+
+def move_arrays(move_masks):
+    """(boards, sources, targets) int64 arrays with one entry per move of a
+    (N, 4, 7) move mask array; sources and targets are BitBoard bit indexes, the
+    pairs BitBoard.generate_moves returns.
+
+    Bits are taken off all the non-empty masks together, lowest first, so the
+    Python loop runs as many times as the fullest mask has moves, not per move.
+    """
+    count = len(move_masks)
+    # legal_move_masks' result is a view of a contiguous (4, 7, N) array
+    rows = np.ascontiguousarray(move_masks.transpose(1, 2, 0)).ravel()
+    found = np.flatnonzero(rows)
+    targets = rows[found]
+    found_rows, exponents = [], []
+    while len(targets):
+        rest = targets & (targets - ONE)
+        # The lowest bit, 2 ** target, is exact as a float, whose frexp exponent is target + 1
+        exponents.append(np.frexp((targets ^ rest).astype(np.float64))[1])
+        found_rows.append(found)
+        left = rest != 0
+        found, targets = found[left], rest[left]
+    if not found_rows:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+    kinds, boards = np.divmod(np.concatenate(found_rows), count)
+    targets = np.concatenate(exponents).astype(np.int64) - 1
+    return boards, targets - MOVE_OFFSETS[kinds], targets
+
+
+def moves_from_mask(mask):
+    """[((from_row, from_col), (to_row, to_col))] of one board's (4, 7) move mask"""
+    moves = []
+    for direction, step in enumerate(STEPS):
+        for k in range(7):
+            targets = int(mask[direction, k])
+            while targets:
+                low = targets & -targets
+                target = low.bit_length() - 1
+                moves.append((BIT_SQUARE[target - (k + 1) * step], BIT_SQUARE[target]))
+                targets ^= low
+    return moves
+
+
+def _scores(tables, boards, colors):
+    boards = as_squares(boards)
+    # One matrix product per piece kind; float32 holds these integer sums exactly
+    white = sum((boards == code).astype(np.float32) @ table for code, table in tables).astype(np.int32)
+    return np.where(_black_to_move(colors, len(boards)), -white, white)
+
+
+def material_scores(boards, colors):
+    """(N,) material balance of each board from colors' point of view"""
+    return _scores(MATERIAL, boards, colors)
+
+
+def evaluate(boards, colors):
+    """(N,) piece-square scores, equal to Engine.evaluate board by board"""
+    return _scores(PIECE_SQUARE, boards, colors)
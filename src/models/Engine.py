@@ -0,0 +1,305 @@
+import time
+
+from .BitBoard import BitBoard, BIT_INDEX, BIT_SQUARE
+from .Tablebase import DRAW
+from .TranspositionTable import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+from .Zobrist import side_key
+
+MAN_VALUE = 100
+KING_VALUE = 250
+ADVANCE_BONUS = 3          # per row a man has advanced towards promotion
+WIN_SCORE = 100000         # side to move has no moves: loss in (WIN_SCORE - score) plies
+MAX_PLY = 128
+
+# Row masks for the advancement bonus, built from the board's bit layout
+ROW_MASKS = [sum(1 << BIT_INDEX[row][col] for col in range(8) if BIT_INDEX[row][col] >= 0) for row in range(8)]
+
+
+class _Timeout(Exception):
+    pass
+
+
+def other_color(color):
+    return 'white' if color == 'black' else 'black'
+
+
+def evaluate(board, color):
+    """Static score of a BitBoard from color's point of view"""
+    white = MAN_VALUE * board.white_men.bit_count() + KING_VALUE * board.white_kings.bit_count()
+    black = MAN_VALUE * board.black_men.bit_count() + KING_VALUE * board.black_kings.bit_count()
+    for row in range(8):
+        # White men advance towards row 0, black men towards row 7
+        white += ADVANCE_BONUS * (7 - row) * (board.white_men & ROW_MASKS[row]).bit_count()
+        black += ADVANCE_BONUS * row * (board.black_men & ROW_MASKS[row]).bit_count()
+    return white - black if color == 'white' else black - white
+
+
+def book_result(move, start):
+    """Search result for a move taken from the opening book"""
+    return {
+        'move': move,
+        'score': 0,
+        'depth': 0,
+        'nodes': 0,
+        'nps': 0,
+        'time_ms': round((time.perf_counter() - start) * 1000, 3),
+        'book': True,
+        'tablebase': False,
+    }
+
+
+def tablebase_score(value, ply):
+    """Search score of a stored tablebase byte for a node ply plies from the root"""
+    if value == DRAW:
+        return 0
+    if value % 2:
+        return -WIN_SCORE + ply + value - 1
+    return WIN_SCORE - ply - (value - 1)
+
+
+def tablebase_result(tablebase, move, board, color, start):
+    """Search result for a move taken from the endgame tablebase"""
+    board = BitBoard.from_board(board)
+    value = tablebase.probe_bits(board.white_men, board.white_kings, board.black_men, board.black_kings,
+                                 int(color == 'black'))
+    return {
+        'move': move,
+        'score': tablebase_score(value, 0),
+        'depth': 0,
+        'nodes': 0,
+        'nps': 0,
+        'time_ms': round((time.perf_counter() - start) * 1000, 3),
+        'book': False,
+        'tablebase': True,
+    }
+
+
+def _to_tt(score, ply):
+    # Wins and losses are stored relative to the node, not the root
+    if score > WIN_SCORE - MAX_PLY:
+        return score + ply
+    if score < -WIN_SCORE + MAX_PLY:
+        return score - ply
+    return score
+
+
+def _from_tt(score, ply):
+    if score > WIN_SCORE - MAX_PLY:
+        return score - ply
+    if score < -WIN_SCORE + MAX_PLY:
+        return score + ply
+    return score
+
+
+class Engine:
+    """Computer player: iterative-deepening alpha-beta with a wall-clock budget.
+
+    Moves are ordered hash move first, then captures (kings before men), killer
+    moves and the history heuristic. Leaves are resolved with a capture-only
+    quiescence search. The position is copied to a BitBoard and searched in place
+    with make/unmake, so the caller's Board or Match is never touched. With an
+    OpeningBook, positions found in the book are answered from it without searching.
+    With a Tablebase, endings it covers are played from it, and search nodes that
+    reach them take their exact value from it instead of being searched further.
+    """
+
+    def __init__(self, tt_bytes=16 * 1024 * 1024, book=None, tablebase=None):
+        self.tt = TranspositionTable(tt_bytes)
+        self.book = book
+        self.tablebase = tablebase
+        self.nodes = 0
+        self.deadline = None
+        self.stop = None
+        self.killers = []
+        self.history = {}
+        self.root_moves = []
+        self.root_restricted = False
+        self.root_best = None
+        self.iterations = []    # (move, score) of the last search after each depth it completed
+        self.last_search = None
+
+    def best_move(self, position, color=None, time_ms=1000, max_depth=MAX_PLY):
+        return self.search(position, color, time_ms, max_depth)['move']
+
+    def search(self, position, color=None, time_ms=1000, max_depth=MAX_PLY, root_moves=None, stop=None):
+        """Search a Match (for its current player) or a Board (for color).
+
+        root_moves optionally restricts the root to some of the legal moves, given as
+        ((from_row, from_col), (to_row, to_col)) like Player.get_all_possible_moves.
+        stop, a callable checked as often as the clock, ends the search early like
+        running out of time does when it returns True.
+        Returns a dict with the best move in that form, its score, the depth completed,
+        the node count, nodes per second, time used and whether the move came from the
+        book or the tablebase.
+        """
+        if hasattr(position, 'current_player'):
+            color = color or position.current_player.color
+            position = position.board
+        if color is None:
+            raise ValueError("color is required when searching a Board")
+
+        start = time.perf_counter()
+        if self.book is not None and root_moves is None:
+            move = self.book.best_move(position, color)
+            if move is not None:
+                self.last_search = book_result(move, start)
+                return self.last_search
+        if self.tablebase is not None and root_moves is None:
+            move = self.tablebase.best_move(position, color)
+            if move is not None:
+                self.last_search = tablebase_result(self.tablebase, move, position, color, start)
+                return self.last_search
+        board = BitBoard.from_board(position)
+
+        self.deadline = start + time_ms / 1000
+        self.stop = stop
+        self.nodes = 0
+        self.killers = [[None, None] for _ in range(MAX_PLY + 1)]
+        self.history = {}
+        self.tt.new_search()
+
+        best_move, best_score, depth_reached = None, 0, 0
+        self.iterations = []
+        legal_moves = board.generate_moves(color)
+        if root_moves is not None:
+            wanted = {(BIT_INDEX[fr][fc], BIT_INDEX[tr][tc]) for (fr, fc), (tr, tc) in root_moves}
+            legal_moves = [move for move in legal_moves if move in wanted]
+        self.root_moves = legal_moves
+        self.root_restricted = root_moves is not None
+        if legal_moves:
+            best_move = legal_moves[0]
+            for depth in range(1, max_depth + 1):
+                self.root_best = None
+                try:
+                    best_score = self._search_root(board, color, depth, best_move)
+                except _Timeout:
+                    # Keep a move from the unfinished iteration only if it beat the previous best
+                    if self.root_best is not None:
+                        best_move, best_score = self.root_best
+                    break
+                best_move = self.root_best[0]
+                depth_reached = depth
+                self.iterations.append(((BIT_SQUARE[best_move[0]], BIT_SQUARE[best_move[1]]), best_score))
+                if abs(best_score) > WIN_SCORE - MAX_PLY:
+                    break
+
+        elapsed = time.perf_counter() - start
+        self.last_search = {
+            'move': (BIT_SQUARE[best_move[0]], BIT_SQUARE[best_move[1]]) if best_move else None,
+            'score': best_score,
+            'depth': depth_reached,
+            'nodes': self.nodes,
+            'nps': int(self.nodes / elapsed) if elapsed > 0 else 0,
+            'time_ms': round(elapsed * 1000, 1),
+            'book': False,
+            'tablebase': False,
+        }
+        return self.last_search
+
+    def _search_root(self, board, color, depth, previous_best):
+        moves = self._order(board, self.root_moves, previous_best, 0)
+        alpha, beta = -WIN_SCORE - 1, WIN_SCORE + 1
+        for move in moves:
+            board.make_bit_move(*move)
+            score = -self._alpha_beta(board, other_color(color), depth - 1, -beta, -alpha, 1)
+            board.unmake_move()
+            if score > alpha:
+                alpha = score
+                self.root_best = (move, score)
+        if not self.root_restricted:
+            # A score over part of the root moves is not the value of the position
+            self.tt.store(board.zobrist ^ side_key(color), depth, alpha, EXACT, self.root_best[0])
+        return alpha
+
+    def _alpha_beta(self, board, color, depth, alpha, beta, ply):
+        self.nodes += 1
+        if self.nodes & 1023 == 0 and (time.perf_counter() > self.deadline or self.stop is not None and self.stop()):
+            raise _Timeout()
+        tablebase = self.tablebase
+        if tablebase is not None and board.occupied().bit_count() <= tablebase.max_pieces:
+            value = tablebase.probe_bits(board.white_men, board.white_kings, board.black_men, board.black_kings,
+                                         int(color == 'black'))
+            if value is not None:
+                return tablebase_score(value, ply)
+        if depth <= 0 or ply >= MAX_PLY:
+            return self._quiescence(board, color, alpha, beta, ply)
+
+        key = board.zobrist ^ side_key(color)
+        entry = self.tt.probe(key)
+        hash_move = None
+        if entry is not None:
+            entry_depth, value, bound, hash_move = entry
+            if entry_depth >= depth:
+                value = _from_tt(value, ply)
+                if bound == EXACT or (bound == LOWER_BOUND and value >= beta) or (bound == UPPER_BOUND and value <= alpha):
+                    return value
+
+        moves = board.generate_moves(color)
+        if not moves:
+            return -WIN_SCORE + ply
+
+        original_alpha = alpha
+        best_score, best_move = -WIN_SCORE - 1, None
+        opponent = other_color(color)
+        for move in self._order(board, moves, hash_move, ply):
+            board.make_bit_move(*move)
+            score = -self._alpha_beta(board, opponent, depth - 1, -beta, -alpha, ply + 1)
+            board.unmake_move()
+            if score > best_score:
+                best_score, best_move = score, move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        if not board.is_capture(*move):
+                            killers = self.killers[ply]
+                            if killers[0] != move:
+                                killers[1], killers[0] = killers[0], move
+                            self.history[move] = self.history.get(move, 0) + depth * depth
+                        break
+
+        if best_score <= original_alpha:
+            bound = UPPER_BOUND
+        elif best_score >= beta:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT
+        self.tt.store(key, depth, _to_tt(best_score, ply), bound, best_move)
+        return best_score
+
+    def _quiescence(self, board, color, alpha, beta, ply):
+        self.nodes += 1
+        if self.nodes & 1023 == 0 and (time.perf_counter() > self.deadline or self.stop is not None and self.stop()):
+            raise _Timeout()
+        stand_pat = evaluate(board, color)
+        if stand_pat >= beta or ply >= MAX_PLY:
+            return stand_pat
+        alpha = max(alpha, stand_pat)
+        captures = board.generate_captures(color)
+        # Take kings first
+        captures.sort(key=lambda move: board.captured_is_king(*move), reverse=True)
+        opponent = other_color(color)
+        for move in captures:
+            board.make_bit_move(*move)
+            score = -self._quiescence(board, opponent, -beta, -alpha, ply + 1)
+            board.unmake_move()
+            if score >= beta:
+                return score
+            alpha = max(alpha, score)
+        return alpha
+
+    def _order(self, board, moves, hash_move, ply):
+        killers = self.killers[ply]
+        history = self.history
+
+        def priority(move):
+            if move == hash_move:
+                return 1 << 40
+            if board.is_capture(*move):
+                return (1 << 36) + board.captured_is_king(*move)
+            if move == killers[0]:
+                return 1 << 33
+            if move == killers[1]:
+                return 1 << 32
+            return history.get(move, 0)
+
+        return sorted(moves, key=priority, reverse=True)
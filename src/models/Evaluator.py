@@ -0,0 +1,147 @@
+import json
+import os
+
+DEFAULT_WEIGHTS_FILE = os.path.join(os.path.dirname(__file__), 'evaluation.json')
+
+# man, king: material; advancement: per row a man has moved towards promotion;
+# back_rank: per man still on its own back row (it keeps the other side from
+# crowning there); centre_man, centre_king: per piece on the four centre squares
+WEIGHT_NAMES = ('man', 'king', 'advancement', 'back_rank', 'centre_man', 'centre_king')
+CENTRE = {(3, 2), (3, 4), (4, 3), (4, 5)}
+
+
+def load_weights(path=DEFAULT_WEIGHTS_FILE):
+    """Evaluation weights from a JSON file holding exactly the WEIGHT_NAMES keys"""
+    with open(path) as weights_file:
+        weights = json.load(weights_file)
+    if not isinstance(weights, dict) or set(weights) != set(WEIGHT_NAMES):
+        raise ValueError(f"{path}: expected an object with the keys {', '.join(WEIGHT_NAMES)}")
+    for name, value in weights.items():
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            raise ValueError(f"{path}: weight {name} must be a number, got {value!r}")
+    return weights
+
+
+class PieceSquareTables:
+    """Value of each piece kind on each square, from white's point of view.
+
+    White pieces count positively and black ones negatively, so the score of a
+    position is the plain sum over its pieces, and a change of the position moves
+    it by the values of the pieces that left and arrived.
+    """
+
+    def __init__(self, weights):
+        self.weights = dict(weights)
+        self.grid = {}   # (color, is_king) -> 8x8 values, 0 on light squares
+        for color, sign, back_row in (('white', 1, 7), ('black', -1, 0)):
+            for is_king in (False, True):
+                table = [[0] * 8 for _ in range(8)]
+                for row in range(8):
+                    for col in range(8):
+                        if (row + col) % 2 == 1:
+                            table[row][col] = sign * self._value(is_king, row, col, back_row)
+                self.grid[color, is_king] = table
+
+    def _value(self, is_king, row, col, back_row):
+        weights = self.weights
+        centre = (row, col) in CENTRE
+        if is_king:
+            return weights['king'] + (weights['centre_king'] if centre else 0)
+        return (weights['man'] + weights['advancement'] * abs(back_row - row)
+                + (weights['back_rank'] if row == back_row else 0)
+                + (weights['centre_man'] if centre else 0))
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_WEIGHTS_FILE):
+        return cls(load_weights(path))
+
+    def evaluate(self, board):
+        """Score of a board computed from scratch, from white's point of view"""
+        grid = self.grid
+        return sum(grid[piece.color, piece.is_king][row][col]
+                   for color in ('white', 'black') for piece, row, col in board.get_all_pieces(color))
+
+
+_default_tables = None
+
+
+def default_tables():
+    """Tables of the weights in evaluation.json, loaded once"""
+    global _default_tables
+    if _default_tables is None:
+        _default_tables = PieceSquareTables.from_file()
+    return _default_tables
+
+
+class Evaluator:
+    """Piece-square score of one board, kept up to date as the board changes.
+
+    Attaching sets itself as the board's evaluator; from then on set_piece,
+    remove_piece, make_move (and move_piece) and unmake_move report to it, and
+    the score moves by the table values of the pieces involved: the mover's
+    source and target squares (the target read as a king on promotion) and the
+    captured piece's square. Taking a move back restores the score it had.
+    Reading the score is then free however often a search asks for it.
+
+    With debug=True every update is checked against the score computed from
+    scratch, and a mismatch raises AssertionError.
+
+    The scores of positions already on the board's undo stack are unknown, so
+    attaching to a board with moves still to take back raises ValueError.
+    """
+
+    def __init__(self, board, tables=None, debug=False):
+        if board.undo_stack:
+            raise ValueError(f"board has {len(board.undo_stack)} moves on its undo stack; "
+                             "attach an Evaluator before make_move or after taking the moves back")
+        self.board = board
+        self.tables = tables or default_tables()
+        self.grid = self.tables.grid
+        self.debug = debug
+        self.history = []   # score before each move still on the board's undo stack
+        self.updates = 0
+        self.score = self.tables.evaluate(board)
+        board.evaluator = self
+
+    def detach(self):
+        if self.board.evaluator is self:
+            self.board.evaluator = None
+
+    def value(self, color):
+        """Score from color's point of view"""
+        return self.score if color == 'white' else -self.score
+
+    def reset(self):
+        """Recompute the score from scratch, after a change made behind the board's back"""
+        self.history.clear()
+        self.score = self.tables.evaluate(self.board)
+
+    def added(self, piece, row, col):
+        self.score += self.grid[piece.color, piece.is_king][row][col]
+        self._updated()
+
+    def removed(self, piece, row, col):
+        self.score -= self.grid[piece.color, piece.is_king][row][col]
+        self._updated()
+
+    def moved(self, piece, from_row, from_col, to_row, to_col, captured, captured_row, captured_col, promoted):
+        grid = self.grid
+        self.history.append(self.score)
+        score = (self.score + grid[piece.color, piece.is_king or promoted][to_row][to_col]
+                 - grid[piece.color, piece.is_king][from_row][from_col])
+        if captured is not None:
+            score -= grid[captured.color, captured.is_king][captured_row][captured_col]
+        self.score = score
+        self._updated()
+
+    def unmoved(self):
+        self.score = self.history.pop()
+        self._updated()
+
+    def _updated(self):
+        self.updates += 1
+        if self.debug:
+            expected = self.tables.evaluate(self.board)
+            if self.score != expected:
+                raise AssertionError(f"incremental evaluation {self.score} differs from {expected} "
+                                     f"computed from scratch after update {self.updates}")
@@ -0,0 +1,248 @@
+import json
+import mmap
+import os
+import struct
+
+from .Board import Board, SQUARE_OF, SQUARE_AT
+
+# One byte per move: landing square, direction of travel and a capture flag.
+# The 32 playable squares are numbered 0-31 as in Board (SQUARE_OF, SQUARE_AT).
+DIRECTIONS = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+CAPTURE_FLAG = 0x80
+
+RESULT_DRAW = 0
+RESULT_WHITE = 1
+RESULT_BLACK = 2
+RESULT_CODES = {None: RESULT_DRAW, 'white': RESULT_WHITE, 'black': RESULT_BLACK}
+RESULT_NAMES = {code: name for name, code in RESULT_CODES.items()}
+
+MAGIC = b'CKGA'
+FORMAT_VERSION = 1
+FILE_HEADER = struct.Struct('<4sBI')     # magic, format version, metadata length
+GAME_HEADER = struct.Struct('<IQBH')     # game number, seed, result, plies
+INDEX_MAGIC = b'CKIX'
+INDEX_ENTRY = struct.Struct('<Q')         # offset of a game header
+FOOTER = struct.Struct('<QI4s')           # index offset, game count, index magic
+
+
+def encode_move(board, from_row, from_col, to_row, to_col):
+    """Byte for a move about to be played on board"""
+    dr = 1 if to_row > from_row else -1
+    dc = 1 if to_col > from_col else -1
+    code = SQUARE_OF[to_row][to_col] | DIRECTIONS.index((dr, dc)) << 5
+    if abs(to_row - from_row) >= 2 and board.get_piece(to_row - dr, to_col - dc) is not None:
+        code |= CAPTURE_FLAG
+    return code
+
+
+def decode_move(board, code):
+    """(from_row, from_col, to_row, to_col) of a move byte in the position it was played from.
+
+    The mover travelled over empty squares, so it is the first piece found walking
+    back from the landing square, after the captured piece when there is one.
+    """
+    to_row, to_col = SQUARE_AT[code & 0x1f]
+    dr, dc = DIRECTIONS[code >> 5 & 3]
+    row, col = to_row - dr, to_col - dc
+    if code & CAPTURE_FLAG:
+        row, col = row - dr, col - dc
+    while 0 <= row < 8 and 0 <= col < 8:
+        if board.get_piece(row, col) is not None:
+            return row, col, to_row, to_col
+        row, col = row - dr, col - dc
+    raise ValueError(f"move byte {code:#04x} has no piece to move")
+
+
+def write_header(file, metadata=None):
+    data = json.dumps(metadata or {}).encode()
+    file.write(FILE_HEADER.pack(MAGIC, FORMAT_VERSION, len(data)))
+    file.write(data)
+
+
+def read_header(file):
+    """Metadata of an archive; leaves file at the first game"""
+    raw = file.read(FILE_HEADER.size)
+    if len(raw) < FILE_HEADER.size:
+        raise ValueError("not a game archive: file too short")
+    magic, version, length = FILE_HEADER.unpack(raw)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError("not a game archive or unsupported version")
+    return json.loads(file.read(length))
+
+
+def write_game(file, number, seed, result, moves):
+    """Append one game; moves are the bytes from encode_move and result a winner color or None"""
+    file.write(GAME_HEADER.pack(number, seed, RESULT_CODES[result], len(moves)))
+    file.write(bytes(moves))
+
+
+def read_index(file):
+    """(index offset, game offsets) from an archive's footer, or (None, None) if it has none"""
+    size = file.seek(0, os.SEEK_END)
+    if size < FILE_HEADER.size + FOOTER.size:
+        return None, None
+    file.seek(size - FOOTER.size)
+    index_offset, count, magic = FOOTER.unpack(file.read(FOOTER.size))
+    if magic != INDEX_MAGIC or index_offset + count * INDEX_ENTRY.size + FOOTER.size != size:
+        return None, None
+    file.seek(index_offset)
+    offsets = [offset for offset, in INDEX_ENTRY.iter_unpack(file.read(count * INDEX_ENTRY.size))]
+    return index_offset, offsets
+
+
+def write_index(file, offsets):
+    """Append the offset index and footer at the current position (the end of the last game)"""
+    index_offset = file.tell()
+    file.write(b''.join(INDEX_ENTRY.pack(offset) for offset in offsets))
+    file.write(FOOTER.pack(index_offset, len(offsets), INDEX_MAGIC))
+
+
+def read_games(file, end=None):
+    """Yield (number, seed, result, move bytes, end offset) for each complete game from the current offset.
+
+    Stops quietly at a truncated game, e.g. the one being written when a run crashed;
+    the end offset of the last game yielded is where appending can resume. end is where
+    the games stop, e.g. the index offset of a closed archive.
+    """
+    while end is None or file.tell() < end:
+        raw = file.read(GAME_HEADER.size)
+        if len(raw) < GAME_HEADER.size:
+            return
+        number, seed, result, plies = GAME_HEADER.unpack(raw)
+        moves = file.read(plies)
+        if len(moves) < plies:
+            return
+        yield number, seed, RESULT_NAMES[result], moves, file.tell()
+
+
+class ArchiveWriter:
+    """Appends games to an archive and writes the offset index on close.
+
+    An archive whose writer never closed (a crash) has no index; ArchiveReader
+    rebuilds it by hopping from game header to game header. With resume=True an
+    existing archive is reopened: its index is dropped, a half-written last game is
+    cut off, and the game numbers already present are left in self.done.
+    """
+
+    def __init__(self, path, metadata=None, resume=False):
+        self.offsets = []
+        self.done = set()
+        if resume and os.path.exists(path):
+            self.file = open(path, 'rb+')
+            self.metadata = read_header(self.file)
+            start = self.file.tell()
+            index_offset, _ = read_index(self.file)
+            self.file.seek(start)
+            end = start
+            for number, _, _, _, game_end in read_games(self.file, index_offset):
+                self.offsets.append(end)
+                self.done.add(number)
+                end = game_end
+            self.file.seek(end)
+            self.file.truncate()
+        else:
+            self.file = open(path, 'wb')
+            self.metadata = metadata or {}
+            write_header(self.file, self.metadata)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add(self, number, seed, result, moves):
+        self.offsets.append(self.file.tell())
+        write_game(self.file, number, seed, result, moves)
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            write_index(self.file, self.offsets)
+            self.file.close()
+
+
+class ArchiveReader:
+    """Random access to an archive through a read-only memory map.
+
+    game(k) and moves(k) return memoryviews into the map, so reading a game copies
+    nothing and touches only its own pages; replay(k, ply) rebuilds a position.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            self.metadata = read_header(file)
+            start = file.tell()
+            index_offset, offsets = read_index(file)
+            if offsets is None:
+                file.seek(start)
+                offsets, end = [], start
+                for _, _, _, _, game_end in read_games(file):
+                    offsets.append(end)
+                    end = game_end
+            self.offsets = offsets
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.map)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def close(self):
+        self.view.release()
+        try:
+            self.map.close()
+        except BufferError:
+            # Move views handed out are still alive; the map is unmapped once they are gone
+            pass
+
+    def game(self, k):
+        """(number, seed, result, move bytes as a memoryview) of the k-th game in the file"""
+        offset = self.offsets[k]
+        number, seed, result, plies = GAME_HEADER.unpack_from(self.map, offset)
+        start = offset + GAME_HEADER.size
+        return number, seed, RESULT_NAMES[result], self.view[start:start + plies]
+
+    def moves(self, k):
+        return self.game(k)[3]
+
+    def __iter__(self):
+        for k in range(len(self.offsets)):
+            yield self.game(k)
+
+    def replay(self, k, ply=None, board_class=Board):
+        """Board after the first ply moves of game k (all of them if ply is None)"""
+        board = board_class()
+        for code in self.moves(k)[:ply]:
+            board.make_move(*decode_move(board, code))
+        return board
+
+
+def encode_moves(moves, board_class=Board):
+    """Move bytes of a game given as ((from_row, from_col), (to_row, to_col)) moves from the start"""
+    board = board_class()
+    codes = bytearray()
+    for (from_row, from_col), (to_row, to_col) in moves:
+        if not board.is_valid_move(from_row, from_col, to_row, to_col):
+            raise ValueError(f"illegal move {(from_row, from_col)} -> {(to_row, to_col)} at ply {len(codes)}")
+        codes.append(encode_move(board, from_row, from_col, to_row, to_col))
+        board.make_move(from_row, from_col, to_row, to_col)
+    return bytes(codes)
+
+
+def decode_moves(codes, board_class=Board):
+    """((from_row, from_col), (to_row, to_col)) moves of a game's move bytes"""
+    board = board_class()
+    moves = []
+    for code in codes:
+        from_row, from_col, to_row, to_col = decode_move(board, code)
+        board.make_move(from_row, from_col, to_row, to_col)
+        moves.append(((from_row, from_col), (to_row, to_col)))
+    return moves
@@ -0,0 +1,470 @@
+import gc
+import os
+import struct
+import threading
+import time
+import zlib
+
+from .Board import Board, SQUARE_OF, SQUARE_AT, KINDS
+from .GameArchive import RESULT_CODES, RESULT_NAMES
+from .Match import Match
+from .Piece import Man, King
+
+try:
+    import fcntl
+except ImportError:   # Windows: a second process opening the store is not detected
+    fcntl = None
+
+# A store is a directory holding journal segments (journal-<n>.log) and at most
+# one snapshot (snapshot-<n>.snap). Snapshot n holds every game as it stood when
+# segment n was started, so recovery loads it and replays segments n, n+1, ...
+# A process never appends to a segment it did not start: recovery opens a new one,
+# and a torn record at the end of an old segment (a crash mid-write) only ends
+# that segment's replay.
+JOURNAL_MAGIC = b'CKWJ'
+SNAPSHOT_MAGIC = b'CKSS'
+FORMAT_VERSION = 1
+FILE_HEADER = struct.Struct('<4sB')      # magic, format version
+RECORD = struct.Struct('<IB16sIBB')      # crc32 of the rest, kind, game id, ply, from square, to square
+CREATE = 1                               # game started (again) from the initial position
+MOVE = 2                                 # move number ply of a game, as (from square, to square)
+DELETE = 3                               # game ended and freed
+SNAPSHOT_HEADER = struct.Struct('<4sBI')           # magic, format version, games
+SNAPSHOT_GAME = struct.Struct('<16sIIIIBI')        # id, white men, white kings, black men, black kings, flags, plies
+BLACK_TO_MOVE = 1
+GAME_OVER = 2
+WINNER_SHIFT = 2                         # flags bits 2-3: GameArchive result code of the winner
+CRC = struct.Struct('<I')
+
+# Squares are numbered 0-31 as in Board; a board is one 32-bit mask per piece kind, in KINDS order
+PIECE_CLASSES = {False: Man, True: King}
+
+
+def encode_board(board):
+    """(white men, white kings, black men, black kings) square masks of a board"""
+    return board.square_masks()
+
+
+START_MASKS = encode_board(Board())
+
+
+def restore_board(board, masks):
+    """Put the pieces of encode_board masks on a board standing at the initial position"""
+    # Only squares that differ from the initial position are touched
+    occupied = masks[0] | masks[1] | masks[2] | masks[3]
+    vacated = (START_MASKS[0] | START_MASKS[2]) & ~occupied
+    while vacated:
+        low = vacated & -vacated
+        board.remove_piece(*SQUARE_AT[low.bit_length() - 1])
+        vacated ^= low
+    for (color, is_king), mask, start in zip(KINDS, masks, START_MASKS):
+        changed = mask & ~start
+        while changed:
+            low = changed & -changed
+            board.set_piece(*SQUARE_AT[low.bit_length() - 1], PIECE_CLASSES[is_king](color))
+            changed ^= low
+
+
+def encode_match(match):
+    """Snapshot bytes of a match, without its id: SNAPSHOT_GAME fields and two bytes per move played"""
+    flags = BLACK_TO_MOVE if match.get_current_player_color() == 'black' else 0
+    if match.is_game_over():
+        flags |= GAME_OVER | RESULT_CODES[match.get_winner()] << WINNER_SHIFT
+    history = bytearray()
+    for (from_row, from_col), (to_row, to_col) in match.history:
+        history.append(SQUARE_OF[from_row][from_col])
+        history.append(SQUARE_OF[to_row][to_col])
+    return encode_board(match.board), flags, len(match.history), bytes(history)
+
+
+def restore_match(masks, flags, history, board_class=Board):
+    match = Match(board_class)
+    restore_board(match.board, masks)
+    match.current_player = match.player2 if flags & BLACK_TO_MOVE else match.player1
+    if flags & GAME_OVER:
+        match.game_over = True
+        winner = RESULT_NAMES[flags >> WINNER_SHIFT & 3]
+        match.winner = {match.player1.color: match.player1, match.player2.color: match.player2}.get(winner)
+    match.history = [(SQUARE_AT[history[index]], SQUARE_AT[history[index + 1]]) for index in range(0, len(history), 2)]
+    match.bump_version()
+    return match
+
+
+def read_records(path):
+    """Yield (kind, game id, ply, from square, to square) of a journal segment up to its first torn record"""
+    with open(path, 'rb') as file:
+        header = file.read(FILE_HEADER.size)
+        if len(header) < FILE_HEADER.size or FILE_HEADER.unpack(header) != (JOURNAL_MAGIC, FORMAT_VERSION):
+            return
+        data = file.read()
+    size = RECORD.size
+    for offset in range(0, len(data) - size + 1, size):
+        crc, kind, game_id, ply, from_square, to_square = RECORD.unpack_from(data, offset)
+        if zlib.crc32(data[offset + 4:offset + size]) != crc:
+            return
+        yield kind, game_id, ply, from_square, to_square
+
+
+def _record(kind, game_id, ply=0, from_square=0, to_square=0):
+    body = RECORD.pack(0, kind, game_id, ply, from_square, to_square)[4:]
+    return CRC.pack(zlib.crc32(body)) + body
+
+
+def _fsync_directory(directory):
+    if hasattr(os, 'O_DIRECTORY'):
+        descriptor = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+
+class GameStore:
+    """Makes games survive a restart: a write-ahead journal of every accepted move plus snapshots.
+
+    recover() rebuilds the games of a previous run, then attach() journals a game
+    (and every move later accepted by Match.make_move, through a listener) until
+    detach(). Appends go to a writer thread that writes and fsyncs whatever has
+    queued up since its last write in one go (group commit); with fsync=True a move
+    only returns once its record is on disk, so concurrent games share fsyncs. Once
+    snapshot_records records have been journaled a background snapshot folds the
+    journal into the compact board encoding above and deletes the segments it covers.
+    Once a write fails the store stops journaling: moves keep being played in
+    memory, and get_stats() reports the error and how many moves went unjournaled.
+    """
+
+    def __init__(self, directory, fsync=True, snapshot_records=1_000_000):
+        self.directory = directory
+        self.fsync = fsync
+        self.snapshot_records = snapshot_records
+        os.makedirs(directory, exist_ok=True)
+        self.lock_file = open(os.path.join(directory, 'lock'), 'a')
+        if fcntl is not None:
+            try:
+                fcntl.flock(self.lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                self.lock_file.close()
+                raise RuntimeError(f"game store {directory} is in use by another process")
+        self.games = {}                  # game id bytes -> (match, lock, listener or None until attached)
+        self.condition = threading.Condition()
+        self.pending = []
+        self.appended = self.written = 0
+        self.since_snapshot = 0
+        self.error = None
+        self.unjournaled = 0             # moves played after the journal failed
+        self.closing = False
+        self.file_lock = threading.Lock()   # held while a batch is written or the segment changes
+        self.snapshot_lock = threading.Lock()
+        self.snapshot_wanted = threading.Event()
+        self.file = None
+        self.segment = None
+        self.threads = []
+        self.batches = 0
+        self.bytes_written = 0
+        self.snapshots = 0
+        self.last_snapshot_seconds = None
+        self.recovery = None
+
+    # --- File names ---
+
+    def _path(self, kind, number):
+        return os.path.join(self.directory, f'{kind}-{number:08d}.{"log" if kind == "journal" else "snap"}')
+
+    def _numbers(self, kind):
+        prefix, suffix = kind + '-', '.log' if kind == 'journal' else '.snap'
+        return sorted(int(name[len(prefix):-len(suffix)]) for name in os.listdir(self.directory)
+                      if name.startswith(prefix) and name.endswith(suffix))
+
+    def _open_segment(self, number):
+        file = open(self._path('journal', number), 'wb')
+        file.write(FILE_HEADER.pack(JOURNAL_MAGIC, FORMAT_VERSION))
+        file.flush()
+        os.fsync(file.fileno())
+        _fsync_directory(self.directory)
+        self.file, self.segment = file, number
+
+    # --- Recovery ---
+
+    def recover(self, board_class=Board):
+        """{game id: Match} of the games left by the previous run; starts journaling.
+
+        The games stay in the store, and in its snapshots, until detached; attach
+        each one again with new=False so that its moves are journaled.
+        """
+        if self.file is not None:
+            raise RuntimeError("recover() starts the store and can only be called once")
+        start = time.perf_counter()
+        snapshots = self._numbers('snapshot')
+        base = snapshots[-1] if snapshots else 0
+        segments = [number for number in self._numbers('journal') if number >= base]
+        # Rebuilding games only allocates objects that stay alive, so the cycle
+        # collector's passes over them would be wasted: they took 2/3 of the time
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            games = self._read_snapshot(base, board_class) if snapshots else {}
+            loaded = len(games)
+            records, skipped = self._replay(games, segments, board_class)
+        finally:
+            if collecting:
+                gc.enable()
+        with self.condition:
+            self.games = {game_id: (match, None, None) for game_id, match in games.items()}
+        self._open_segment(max([base] + segments) + 1)
+        self._start_threads()
+        self.recovery = {
+            'games': len(games),
+            'snapshot_games': loaded,
+            'journal_records': records,
+            'skipped_records': skipped,
+            'seconds': round(time.perf_counter() - start, 3),
+        }
+        # The replayed journal counts towards the next snapshot
+        self.since_snapshot = records
+        if records >= self.snapshot_records:
+            self.snapshot_wanted.set()
+        return {game_id.hex(): match for game_id, match in games.items()}
+
+    def _replay(self, games, segments, board_class):
+        """Apply journal segments to {game id bytes: Match}; returns (records read, records skipped)"""
+        records = skipped = 0
+        for number in segments:
+            for kind, game_id, ply, from_square, to_square in read_records(self._path('journal', number)):
+                records += 1
+                if kind == CREATE:
+                    match = games[game_id] = Match(board_class)
+                    match.start_game()
+                elif kind == DELETE:
+                    games.pop(game_id, None)
+                else:
+                    match = games.get(game_id)
+                    if match is not None and ply < len(match.history):
+                        continue   # already in the snapshot
+                    # A game or move the journal does not lead to means a lost record
+                    if (match is None or ply > len(match.history)
+                            or not match.make_move(*SQUARE_AT[from_square], *SQUARE_AT[to_square])):
+                        skipped += 1
+        return records, skipped
+
+    def _read_snapshot(self, number, board_class):
+        with open(self._path('snapshot', number), 'rb') as file:
+            data = file.read()
+        body = memoryview(data)[:-CRC.size]
+        if len(data) < SNAPSHOT_HEADER.size + CRC.size or CRC.unpack_from(data, len(body))[0] != zlib.crc32(body):
+            raise ValueError(f"snapshot {number} is damaged")
+        magic, version, count = SNAPSHOT_HEADER.unpack_from(data)
+        if magic != SNAPSHOT_MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"snapshot {number} is not a game store snapshot or has an unsupported version")
+        games = {}
+        offset = SNAPSHOT_HEADER.size
+        for _ in range(count):
+            game_id, *masks, flags, plies = SNAPSHOT_GAME.unpack_from(data, offset)
+            offset += SNAPSHOT_GAME.size
+            history = data[offset:offset + 2 * plies]
+            offset += 2 * plies
+            games[game_id] = restore_match(masks, flags, history, board_class)
+        return games
+
+    # --- Journaling ---
+
+    def attach(self, game_id, match, lock=None, new=True):
+        """Journal match under game_id (32 hex digits) from now on, replacing any game of that id.
+
+        new=True records the game as started over and replays its moves so far into
+        the journal; pass new=False for a game returned by recover(). lock is held
+        while a snapshot reads the match, e.g. the session lock its requests hold.
+        """
+        key = bytes.fromhex(game_id)
+        if len(key) != 16:
+            raise ValueError(f"game id {game_id!r} is not 32 hex digits")
+        listener = lambda event: self._on_move(key, match, event)
+        with self.condition:
+            previous = self.games.get(key)
+            self.games[key] = (match, lock, listener)
+        if previous is not None and previous[2] is not None:
+            previous[0].remove_listener(previous[2])
+        if new:
+            records = [_record(CREATE, key)]
+            records += [_record(MOVE, key, ply, SQUARE_OF[from_row][from_col], SQUARE_OF[to_row][to_col])
+                        for ply, ((from_row, from_col), (to_row, to_col)) in enumerate(match.history)]
+            self._append(records, wait=False)
+        match.add_listener(listener)
+
+    def detach(self, game_id):
+        """Stop journaling a game and record that it is gone"""
+        key = bytes.fromhex(game_id)
+        with self.condition:
+            entry = self.games.pop(key, None)
+        if entry is None:
+            return
+        if entry[2] is not None:
+            entry[0].remove_listener(entry[2])
+        # Not waited for: a lost DELETE only brings the game back after a crash
+        self._append([_record(DELETE, key)], wait=False)
+
+    def _on_move(self, key, match, event):
+        (from_row, from_col), (to_row, to_col) = event['from'], event['to']
+        try:
+            self._append([_record(MOVE, key, len(match.history) - 1, SQUARE_OF[from_row][from_col],
+                                  SQUARE_OF[to_row][to_col])], wait=self.fsync)
+        except OSError:
+            # The move is already on the board: the game stays playable in memory,
+            # the store reports the failure (get_stats()['error']) and the moves
+            # from here on are lost on a restart
+            with self.condition:
+                self.unjournaled += 1
+
+    def _append(self, records, wait):
+        with self.condition:
+            if self.error is not None:
+                raise OSError(f"game store journal failed: {self.error}")
+            if self.file is None:
+                raise RuntimeError("call recover() before journaling games")
+            self.pending += records
+            self.appended += len(records)
+            target = self.appended
+            self.since_snapshot += len(records)
+            if self.since_snapshot >= self.snapshot_records:
+                self.since_snapshot = 0
+                self.snapshot_wanted.set()
+            self.condition.notify_all()
+            if wait:
+                self.condition.wait_for(lambda: self.written >= target or self.error is not None)
+                if self.error is not None:
+                    raise OSError(f"game store journal failed: {self.error}")
+
+    def _write_pending(self):
+        """Write (and fsync) the queued records; the caller holds file_lock"""
+        with self.condition:
+            batch, self.pending = self.pending, []
+            target = self.appended
+        if batch:
+            data = b''.join(batch)
+            try:
+                self.file.write(data)
+                self.file.flush()
+                if self.fsync:
+                    os.fsync(self.file.fileno())
+            except OSError as error:
+                with self.condition:
+                    self.error = error
+                    self.condition.notify_all()
+                return
+            self.batches += 1
+            self.bytes_written += len(data)
+        with self.condition:
+            self.written = target
+            self.condition.notify_all()
+
+    def _writer(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.pending or self.closing)
+                if not self.pending and self.closing:
+                    return
+            with self.file_lock:
+                self._write_pending()
+
+    def _snapshotter(self):
+        while True:
+            self.snapshot_wanted.wait()
+            self.snapshot_wanted.clear()
+            if self.closing:
+                return
+            try:
+                self.snapshot()
+            except OSError as error:
+                with self.condition:
+                    self.error = error
+                    self.condition.notify_all()
+
+    def _start_threads(self):
+        for target, name in ((self._writer, 'game-store-writer'), (self._snapshotter, 'game-store-snapshots')):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    # --- Snapshots ---
+
+    def snapshot(self):
+        """Write a snapshot of every attached game and delete the journal it replaces"""
+        with self.snapshot_lock:
+            start = time.perf_counter()
+            # Start a new segment: everything journaled from here on lands after the snapshot
+            with self.file_lock:
+                self._write_pending()
+                self.file.close()
+                number = self.segment + 1
+                self._open_segment(number)
+            with self.condition:
+                games = list(self.games.items())
+            parts = [b'']
+            count = 0
+            for key, (match, lock, _) in games:
+                if lock is not None:
+                    with lock:
+                        masks, flags, plies, history = encode_match(match)
+                else:
+                    masks, flags, plies, history = encode_match(match)
+                parts.append(SNAPSHOT_GAME.pack(key, *masks, flags, plies))
+                parts.append(history)
+                count += 1
+            parts[0] = SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, FORMAT_VERSION, count)
+            data = b''.join(parts)
+            path = self._path('snapshot', number)
+            with open(path + '.part', 'wb') as file:
+                file.write(data)
+                file.write(CRC.pack(zlib.crc32(data)))
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(path + '.part', path)
+            _fsync_directory(self.directory)
+            for old in self._numbers('snapshot'):
+                if old < number:
+                    os.remove(self._path('snapshot', old))
+            for old in self._numbers('journal'):
+                if old < number:
+                    os.remove(self._path('journal', old))
+            self.snapshots += 1
+            self.last_snapshot_seconds = round(time.perf_counter() - start, 3)
+            return count
+
+    def close(self):
+        """Write what is queued and stop; games are left attached but no longer journaled"""
+        with self.condition:
+            self.closing = True
+            self.condition.notify_all()
+        self.snapshot_wanted.set()
+        for thread in self.threads:
+            thread.join()
+        with self.file_lock:
+            if self.file is not None:
+                self._write_pending()
+                self.file.close()
+        self.lock_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get_stats(self):
+        with self.condition:
+            games = len(self.games)
+            appended, written = self.appended, self.written
+        return {
+            'games': games,
+            'records': appended,
+            'records_written': written,
+            'batches': self.batches,
+            'records_per_batch': round(written / self.batches, 2) if self.batches else None,
+            'bytes_written': self.bytes_written,
+            'fsync': self.fsync,
+            'segment': self.segment,
+            'snapshots': self.snapshots,
+            'last_snapshot_seconds': self.last_snapshot_seconds,
+            'recovery': self.recovery,
+            'error': str(self.error) if self.error is not None else None,
+            'unjournaled_moves': self.unjournaled,
+        }
@@ -1,31 +1,58 @@
+import itertools
+import threading
+
 from .Board import Board
 from .Player import Player
 from .Piece import Man, King
+from .Zobrist import side_key
+
+# Distinguishes Match objects of one process, e.g. a game and the one replacing it on reset
+_instance_ids = itertools.count(1)
+# Serializes listener changes (rare) of every match, so two concurrent changes don't lose one
+_listeners_lock = threading.Lock()
 
 class Match:
-    def __init__(self):
-        self.board = Board()
+    def __init__(self, board_class=Board):
+        # board_class lets callers pick the storage engine (Board or BitBoard)
+        self.board = board_class()
         self.player1 = Player("white")
         self.player2 = Player("black")
+        # Piece counts are read from the board's incremental piece index
+        self.player1.track_board(self.board)
+        self.player2.track_board(self.board)
         self.current_player = self.player2
         self.game_over = False
         self.winner = None
+        self.history = []     # ((from_row, from_col), (to_row, to_col)) of every move played
+        self.setup_fen = None # PDN FEN of the position history starts from, None for the initial one
+        # Moves of the side to move's pieces by square, kept while the position stays the
+        # same: every client showing the game asks for them again until a move is played
+        self.piece_moves = {}
+        self.piece_moves_key = None
+        # Callables notified with a move event after every successful move. The tuple is
+        # replaced on every change, so a listener added or removed from another thread
+        # never shifts what a notify() in progress is walking (and never skips a listener)
+        self.listeners = ()
+        self.instance_id = next(_instance_ids)
+        self.version = 0      # increases on every state change
+        self.version_changed = threading.Condition()
 
     def start_game(self):
         self.board.initialize_board()
-        self.update_players_pieces()
+        self.history = []
+        self.setup_fen = None
+        self.bump_version()
 
-    def update_players_pieces(self):
-        self.player1.pieces = []
-        self.player2.pieces = []
-        for r in range(8):
-            for c in range(8):
-                piece = self.board.get_piece(r, c)
-                if piece:
-                    if piece.color == self.player1.color:
-                        self.player1.add_piece(piece)
-                    else:
-                        self.player2.add_piece(piece)
+    def bump_version(self):
+        with self.version_changed:
+            self.version += 1
+            self.version_changed.notify_all()
+
+    def wait_for_version(self, version, timeout):
+        """Block until the version passes version or timeout seconds elapse; returns the version"""
+        with self.version_changed:
+            self.version_changed.wait_for(lambda: self.version > version, timeout)
+            return self.version
 
     def switch_player(self):
         self.current_player = self.player2 if self.current_player == self.player1 else self.player1
@@ -46,14 +73,46 @@ class Match:
         if piece is None or piece.color != self.current_player.color:
             return False
 
+        # Square a capture would empty: the one just before the landing square
+        captured = None
+        if abs(to_row - from_row) >= 2:
+            captured = (to_row - (1 if to_row > from_row else -1), to_col - (1 if to_col > from_col else -1))
+            if self.board.get_piece(*captured) is None:
+                captured = None
+
         if self.board.move_piece(from_row, from_col, to_row, to_col):
-            self.update_players_pieces()
+            self.history.append(((from_row, from_col), (to_row, to_col)))
             self.check_game_over()
             if not self.game_over:
                 self.switch_player()
+            self.bump_version()
+            if self.listeners:
+                self.notify({
+                    'type': 'move',
+                    'from': (from_row, from_col),
+                    'to': (to_row, to_col),
+                    'captured': captured,
+                    'promoted': not piece.is_king and self.board.get_piece(to_row, to_col).is_king,
+                    'current_player': self.get_current_player_color(),
+                    'game_over': self.game_over,
+                    'winner': self.get_winner(),
+                    'version': self.version,
+                })
             return True
         return False
 
+    def add_listener(self, listener):
+        with _listeners_lock:
+            self.listeners = self.listeners + (listener,)
+
+    def remove_listener(self, listener):
+        with _listeners_lock:
+            self.listeners = tuple(other for other in self.listeners if other is not listener)
+
+    def notify(self, event):
+        for listener in self.listeners:
+            listener(event)
+
     def get_board_state(self):
         state = []
         for r in range(8):
@@ -69,9 +128,21 @@ class Match:
 
     def get_possible_moves_for_piece(self, row, col):
         piece = self.board.get_piece(row, col)
-        if piece and piece.color == self.current_player.color:
-            return piece.get_possible_moves(self.board.board, row, col)
-        return []
+        if not piece or piece.color != self.current_player.color:
+            return []
+        key = (self.board.zobrist, piece.color)
+        if key != self.piece_moves_key:
+            # One pass over the side's moves answers every piece of the position
+            piece_moves = {}
+            for move in self.board.get_all_moves(piece.color):
+                piece_moves.setdefault(move[0], []).append(move)
+            self.piece_moves, self.piece_moves_key = piece_moves, key
+        # Handed out as is to every caller, which only reads it
+        return self.piece_moves.get((row, col), ())
+
+    def get_position_key(self):
+        # Zobrist key of the pieces plus the side to move
+        return self.board.zobrist ^ side_key(self.current_player.color)
 
     def get_current_player_color(self):
         return self.current_player.color
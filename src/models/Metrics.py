@@ -0,0 +1,344 @@
+"""Counters, latency histograms and a sampling profiler for the game server.
+
+Metrics live in a Registry and are rendered in the Prometheus text exposition
+format (registry.render()). The hot paths (the boards' move_piece and move
+generation, the pieces' get_possible_moves, Match.make_move and
+Match.check_game_over) are only timed after instrument_hot_paths(), which swaps
+timing wrappers into the classes; until then, and after uninstrument_hot_paths(),
+they run untouched.
+"""
+import bisect
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+from collections import Counter as _Tally
+
+from .ArrayBoard import ArrayBoard
+from .BitBoard import BitBoard
+from .Board import Board
+from .Match import Match
+from .Piece import Man, King
+
+# Seconds; fine enough for piece move generation (a few microseconds) as well as
+# engine searches and long-polls
+DEFAULT_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                   0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _label_text(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic count per label values"""
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def samples(self):
+        with self.lock:
+            values = sorted(self.values.items())
+        for label_values, value in values:
+            yield self.name + '_total', _label_text(self.labels, label_values), value
+
+
+class Histogram:
+    """Observation counts per bucket (upper bounds, seconds by default), sum and count per label values"""
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self.series = {}   # label values -> [bucket counts..., sum]
+        self.lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        # Counts are kept per bucket and only made cumulative when rendered
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(label_values)
+            if series is None:
+                series = self.series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def time(self, *label_values):
+        """Context manager observing the time spent in its block"""
+        return _Timer(self, label_values)
+
+    def samples(self):
+        with self.lock:
+            series = sorted((label_values, list(values)) for label_values, values in self.series.items())
+        for label_values, values in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), values):
+                cumulative += count
+                yield (self.name + '_bucket', _label_text(self.labels, label_values, [('le', _number(bound))]),
+                       cumulative)
+            labels = _label_text(self.labels, label_values)
+            yield self.name + '_sum', labels, values[-1]
+            yield self.name + '_count', labels, cumulative
+
+
+class _Timer:
+    __slots__ = ('histogram', 'label_values', 'start')
+
+    def __init__(self, histogram, label_values):
+        self.histogram = histogram
+        self.label_values = label_values
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, *self.label_values)
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def _register(self, metric):
+        with self.lock:
+            existing = self.metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labels != metric.labels:
+                    raise ValueError(f"metric {metric.name} already registered differently")
+                return existing
+            self.metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, help_text, labels=()):
+        return self._register(Counter(name, help_text, labels))
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help_text, labels, buckets))
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        with self.lock:
+            metrics = sorted(self.metrics.values(), key=lambda metric: metric.name)
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{labels} {_number(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+# --- Hot-path timers ---
+
+# (class, method) wrapped by instrument_hot_paths; subclasses that override a
+# method are listed on their own, as they don't call the base one, and so are
+# subclasses that inherit one, so that their calls carry their own label.
+# Board and ArrayBoard generate moves through the pieces' get_possible_moves,
+# BitBoard through its own generators
+HOT_PATHS = [
+    (Board, 'move_piece'),
+    (BitBoard, 'move_piece'),
+    (ArrayBoard, 'move_piece'),
+    (Board, 'list_moves'),
+    (BitBoard, 'list_moves'),
+    (BitBoard, 'generate_moves'),
+    (ArrayBoard, 'list_moves'),
+    (Man, 'get_possible_moves'),
+    (King, 'get_possible_moves'),
+    (Match, 'make_move'),
+    (Match, 'check_game_over'),
+]
+
+_originals = {}   # (class, method) -> function replaced by a timing wrapper, None if inherited
+
+
+def _timed(function, histogram, label):
+    perf_counter = time.perf_counter
+    observe = histogram.observe
+
+    def timed(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            observe(perf_counter() - start, label)
+
+    timed.__name__ = function.__name__
+    timed.__qualname__ = function.__qualname__
+    timed.__doc__ = function.__doc__
+    timed.__wrapped__ = function
+    return timed
+
+
+def _original(owner, method):
+    """owner's method as it was before any timing wrapper, defined there or inherited"""
+    for klass in owner.__mro__:
+        if (klass, method) in _originals:
+            if _originals[klass, method] is not None:
+                return _originals[klass, method]
+        elif method in klass.__dict__:
+            return klass.__dict__[method]
+    raise AttributeError(f'{owner.__name__} has no method {method}')
+
+
+def instrument_hot_paths(target=None):
+    """Time every HOT_PATHS call into the checkers_call_seconds histogram of target
+    (default: the module registry), labelled Class.method. Each call then costs
+    two clock reads and a histogram update more; calling it again does nothing."""
+    histogram = (target or registry).histogram(
+        'checkers_call_seconds', 'Time spent in instrumented game methods', ('method',))
+    for owner, method in HOT_PATHS:
+        if (owner, method) in _originals:
+            continue
+        function = _original(owner, method)
+        _originals[owner, method] = owner.__dict__.get(method)
+        setattr(owner, method, _timed(function, histogram, f'{owner.__name__}.{method}'))
+    return histogram
+
+
+def uninstrument_hot_paths():
+    """Put the original methods back"""
+    while _originals:
+        (owner, method), function = _originals.popitem()
+        if function is None:
+            delattr(owner, method)   # inherited again
+        else:
+            setattr(owner, method, function)
+
+
+# --- Profiling ---
+
+class SamplingProfiler:
+    """Samples the stacks of every thread at a fixed interval from a background thread.
+
+    Nothing runs outside a window: start() launches the sampling thread, stop()
+    ends it and returns the stacks in the collapsed format flame graph tools read
+    (flamegraph.pl, speedscope, inferno): one "outer;...;inner count" line per stack.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.stacks = _Tally()
+        self.samples = 0
+        self.stopping = threading.Event()
+        self.thread = None
+
+    @staticmethod
+    def _stack(frame):
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f'{code.co_name} ({code.co_filename.rsplit("/", 1)[-1]}:{code.co_firstlineno})')
+            frame = frame.f_back
+        return ';'.join(reversed(names))
+
+    def _run(self):
+        own = threading.get_ident()
+        names = {}
+        while not self.stopping.wait(self.interval):
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            for ident, frame in sys._current_frames().items():
+                if ident != own:
+                    self.stacks[f'{names.get(ident, ident)};{self._stack(frame)}'] += 1
+            self.samples += 1
+
+    def start(self):
+        self.stopping.clear()
+        self.thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopping.set()
+        self.thread.join()
+        return self.collapsed()
+
+    def collapsed(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+class RequestProfiler:
+    """cProfile over the requests handled during a window, merged into one report.
+
+    The server calls enter() when a request starts and leave() when it ends, as
+    cProfile follows the thread that enabled it; both return at once when no
+    window is open.
+    """
+
+    def __init__(self):
+        self.active = False
+        self.local = threading.local()
+        self.stats = None
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            self.stats = None
+            self.requests = 0
+            self.active = True
+
+    def enter(self):
+        if self.active:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Python 3.12+ profiles every thread from one profiler at a time:
+                # the request is seen by the one already running
+                return
+            self.local.profile = profile
+
+    def leave(self):
+        profile = getattr(self.local, 'profile', None)
+        if profile is None:
+            return
+        profile.disable()
+        self.local.profile = None
+        with self.lock:
+            if self.stats is None:
+                self.stats = pstats.Stats(profile)
+            else:
+                self.stats.add(profile)
+            self.requests += 1
+
+    def stop(self, sort='cumulative', limit=60):
+        """End the window; returns the pstats report of the requests profiled"""
+        with self.lock:
+            self.active = False
+            if self.stats is None:
+                return 'no requests were profiled\n'
+            output = io.StringIO()
+            self.stats.stream = output
+            print(f'{self.requests} requests profiled', file=output)
+            self.stats.sort_stats(sort).print_stats(limit)
+            return output.getvalue()
@@ -0,0 +1,46 @@
+"""Square and move notation shared by the servers and the command line tools.
+
+Squares are written like chess squares, column letter then row number from the
+bottom ('A1' is row 7, col 0), and moves as 'B6-A5'.
+"""
+
+
+def parse_position(pos_str):
+    """Convert chess notation (e.g., 'A1') to row, col coordinates; (None, None) if invalid"""
+    if len(pos_str) != 2:
+        return None, None
+    col_char = pos_str[0].upper()
+    row_char = pos_str[1]
+
+    if col_char not in 'ABCDEFGH' or row_char not in '12345678':
+        return None, None
+
+    col = ord(col_char) - ord('A')
+    row = 8 - int(row_char)  # Convert to 0-based index from top
+
+    return row, col
+
+
+def position_to_chess(row, col):
+    """Convert row, col coordinates to chess notation"""
+    return chr(ord('A') + col) + str(8 - row)
+
+
+def parse_moves(notation):
+    """((from_row, from_col), (to_row, to_col)) moves of 'B6-A5' strings"""
+    moves = []
+    for move in notation:
+        from_pos, _, to_pos = move.partition('-')
+        from_square, to_square = parse_position(from_pos), parse_position(to_pos)
+        if None in from_square or None in to_square:
+            raise ValueError(f"invalid move {move!r}, expected e.g. 'B6-A5'")
+        moves.append((from_square, to_square))
+    return moves
+
+
+def format_move(from_square, to_square):
+    return f"{position_to_chess(*from_square)}-{position_to_chess(*to_square)}"
+
+
+def format_moves(moves):
+    return [format_move(from_square, to_square) for from_square, to_square in moves]
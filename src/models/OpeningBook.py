@@ -0,0 +1,168 @@
+import bisect
+import mmap
+import os
+import struct
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .BitBoard import BitBoard
+from .Board import SQUARE_OF, SQUARE_AT
+from .GameArchive import ArchiveReader, decode_move
+from .Zobrist import side_key
+
+MAGIC = b'CKOB'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sB3xQ')   # magic, format version, entry count
+KEY = struct.Struct('<Q')
+ENTRY = struct.Struct('<HIIII')     # move, games, wins, draws, losses
+
+DEFAULT_PLIES = 16
+CHUNK_GAMES = 5000                  # games counted per pool task
+
+
+def encode_book_move(move):
+    (from_row, from_col), (to_row, to_col) = move
+    return SQUARE_OF[from_row][from_col] << 5 | SQUARE_OF[to_row][to_col]
+
+
+def decode_book_move(code):
+    return SQUARE_AT[code >> 5], SQUARE_AT[code & 0x1f]
+
+
+def count_games(path, start, stop, plies=DEFAULT_PLIES):
+    """{(position key, move code): [games, wins, draws, losses]} over games start..stop of an archive.
+
+    Results are from the point of view of the side that played the move.
+    """
+    counts = {}
+    with ArchiveReader(path) as reader:
+        for k in range(start, stop):
+            _, _, result, moves = reader.game(k)
+            board = BitBoard()
+            color = 'black'
+            for code in moves[:plies]:
+                from_row, from_col, to_row, to_col = decode_move(board, code)
+                key = (board.zobrist ^ side_key(color), SQUARE_OF[from_row][from_col] << 5 | SQUARE_OF[to_row][to_col])
+                stats = counts.get(key)
+                if stats is None:
+                    stats = counts[key] = [0, 0, 0, 0]
+                stats[0] += 1
+                if result is None:
+                    stats[2] += 1
+                elif result == color:
+                    stats[1] += 1
+                else:
+                    stats[3] += 1
+                board.make_move(from_row, from_col, to_row, to_col)
+                color = 'white' if color == 'black' else 'black'
+            del moves
+    return counts
+
+
+def build_book(archives, target, min_games=2, plies=DEFAULT_PLIES, workers=None):
+    """Count the first plies moves of every game in the archives and write the book to target.
+
+    Archives are read in chunks of games on a process pool, so no archive is ever
+    loaded whole; only the merged counts are held in memory. Moves played fewer than
+    min_games times are left out. Returns the number of entries written.
+    """
+    counts = {}
+    with ProcessPoolExecutor(workers or os.cpu_count() or 1) as executor:
+        futures = []
+        for path in archives:
+            with ArchiveReader(path) as reader:
+                games = len(reader)
+            for start in range(0, games, CHUNK_GAMES):
+                futures.append(executor.submit(count_games, path, start, min(start + CHUNK_GAMES, games), plies))
+        for future in as_completed(futures):
+            for key, (games, wins, draws, losses) in future.result().items():
+                stats = counts.get(key)
+                if stats is None:
+                    counts[key] = [games, wins, draws, losses]
+                else:
+                    stats[0] += games
+                    stats[1] += wins
+                    stats[2] += draws
+                    stats[3] += losses
+    entries = sorted((key, stats) for key, stats in counts.items() if stats[0] >= min_games)
+    write_book(target, entries)
+    return len(entries)
+
+
+def write_book(target, entries):
+    """Write ((position key, move code), (games, wins, draws, losses)) entries sorted by key.
+
+    Layout: header, then all keys as one array of 64-bit integers (what lookups
+    binary-search), then the entries in the same order.
+    """
+    with open(target, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(entries)))
+        file.write(b''.join(KEY.pack(key) for (key, _), _ in entries))
+        file.write(b''.join(ENTRY.pack(move, *stats) for (_, move), stats in entries))
+
+
+class OpeningBook:
+    """Read-only, memory-mapped opening book.
+
+    A lookup binary-searches the key array straight in the map, so opening a book
+    costs nothing up front and processes using the same file share its pages.
+    """
+
+    def __init__(self, path, min_games=1):
+        self.path = path
+        self.min_games = min_games
+        with open(path, 'rb') as file:
+            magic, version, self.count = HEADER.unpack(file.read(HEADER.size))
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f"{path} is not an opening book")
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.entries_offset = HEADER.size + self.count * KEY.size
+        if sys.byteorder == 'little':
+            self.keys = memoryview(self.map)[HEADER.size:self.entries_offset].cast('Q')
+        else:
+            self.keys = [key for key, in KEY.iter_unpack(self.map[HEADER.size:self.entries_offset])]
+
+    def __len__(self):
+        return self.count
+
+    def __getstate__(self):
+        # Pickled (e.g. into a worker process) as its path; the map is reopened there
+        return {'path': self.path, 'min_games': self.min_games}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'], state['min_games'])
+
+    def close(self):
+        if isinstance(self.keys, memoryview):
+            self.keys.release()
+        self.map.close()
+
+    def lookup(self, key):
+        """[(move, games, wins, draws, losses)] for a position key (Match.get_position_key)"""
+        start = bisect.bisect_left(self.keys, key)
+        found = []
+        for index in range(start, self.count):
+            if self.keys[index] != key:
+                break
+            code, *stats = ENTRY.unpack_from(self.map, self.entries_offset + index * ENTRY.size)
+            found.append((decode_book_move(code), *stats))
+        return found
+
+    def probe(self, board, color):
+        return self.lookup(board.zobrist ^ side_key(color))
+
+    def best_move(self, board, color):
+        """Book move with the best score (wins plus half the draws per game), or None"""
+        best, best_rank = None, None
+        for move, games, wins, draws, _ in self.probe(board, color):
+            if games < self.min_games:
+                continue
+            rank = ((wins + draws / 2) / games, games)
+            if best_rank is not None and rank <= best_rank:
+                continue
+            (from_row, from_col), (to_row, to_col) = move
+            # Checking legality also guards against two positions sharing a key
+            piece = board.get_piece(from_row, from_col)
+            if piece is not None and piece.color == color and board.is_valid_move(from_row, from_col, to_row, to_col):
+                best, best_rank = move, rank
+        return best
@@ -0,0 +1,270 @@
+"""Portable Draughts Notation (PDN) reading and writing.
+
+Squares are numbered 1-32 over the playable squares, row by row from the top
+(black's side): 1-4 is row 8 (B8, D8, F8, H8) and 29-32 is row 1 (A1, C1, E1, G1),
+as in English draughts. Moves are 'from-to' or 'fromxto' for a capture. Results
+give White's score first: 1-0 White wins, 0-1 Black wins, 1/2-1/2 a draw.
+
+This game has no multi-jumps, so a capture sequence such as 9x18x27 is rejected
+like any other move the rules don't allow.
+"""
+import re
+import time
+
+from .Board import Board, SQUARE_OF, SQUARE_AT
+from .Match import Match
+from .Piece import Man, King
+
+RESULTS = {'1-0': 'white', '2-0': 'white', '0-1': 'black', '0-2': 'black',
+           '1/2-1/2': None, '1-1': None, '*': None}
+RESULT_TOKENS = {'white': '1-0', 'black': '0-1', None: '1/2-1/2'}
+
+TAG = re.compile(r'\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]')
+TOKEN = re.compile(r'[{;()]|[^\s{};()]+')
+MOVE = re.compile(r'^(?:\d+\.+)?(\d+)([-x])(\d+)((?:x\d+)*)[!?]*$')
+MOVE_NUMBER = re.compile(r'^\d+\.+$')
+LINE_WIDTH = 79
+
+
+class PDNError(ValueError):
+    pass
+
+
+def square_number(row, col):
+    return SQUARE_OF[row][col] + 1
+
+
+def square_position(number):
+    if not 1 <= number <= 32:
+        raise PDNError(f"no square {number}")
+    return SQUARE_AT[number - 1]
+
+
+def setup_match(match, fen):
+    """Put the pieces and side to move of a PDN FEN tag, e.g. 'B:W18,24,K10:B12,16-20,K22', on match.
+
+    The match's history starts over from that position, and write_game writes
+    the FEN tag the game needs to be read back.
+    """
+    fields = fen.strip().rstrip('.').split(':')
+    if not fields or fields[0].upper() not in ('W', 'B'):
+        raise PDNError(f"bad FEN {fen!r}")
+    board = match.board
+    for color in ('white', 'black'):
+        for _, row, col in board.get_all_pieces(color):
+            board.remove_piece(row, col)
+    for field in fields[1:]:
+        if not field:
+            continue
+        color = {'W': 'white', 'B': 'black'}.get(field[0].upper())
+        if color is None:
+            raise PDNError(f"bad FEN {fen!r}")
+        for item in filter(None, field[1:].split(',')):
+            king = item[0].upper() == 'K'
+            first, _, last = item.lstrip('Kk').partition('-')
+            if not first.isdigit() or (last and not last.isdigit()):
+                raise PDNError(f"bad FEN square {item!r}")
+            for number in range(int(first), int(last or first) + 1):
+                row, col = square_position(number)
+                board.set_piece(row, col, King(color) if king else Man(color))
+    match.current_player = match.player1 if fields[0].upper() == 'W' else match.player2
+    match.history = []
+    match.setup_fen = fen.strip()
+
+
+class PDNReader:
+    """Yields (tags, Match) for each game of a PDN file, one game at a time.
+
+    Only the game being parsed is held in memory, so files of any size stream in
+    constant space. Every move is checked with Board.is_valid_move (through
+    Match.make_move) while the Match is rebuilt. Games with a move the rules don't
+    allow raise PDNError, or are counted in self.skipped when skip_invalid is set.
+    games, moves, skipped, bytes and seconds are kept for get_stats.
+    """
+
+    def __init__(self, file, board_class=Board, skip_invalid=False):
+        self.file = file
+        self.board_class = board_class
+        self.skip_invalid = skip_invalid
+        self.games = 0
+        self.moves = 0
+        self.skipped = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self.errors = []   # (game number, message) of skipped games
+
+    def __iter__(self):
+        tags, tokens = {}, []
+        in_comment = False
+        depth = 0        # nesting of ( ) variations, which are skipped
+        number = 0
+        start = time.perf_counter()
+        for line in self.file:
+            self.bytes += len(line)
+            position = 0
+            if not in_comment and depth == 0 and line.lstrip().startswith('['):
+                if tokens:
+                    # Tags after moves without a result: the previous game has ended
+                    game = self._finish(number, tags, tokens)
+                    tags, tokens = {}, []
+                    number += 1
+                    if game is not None:
+                        self.seconds += time.perf_counter() - start
+                        yield game
+                        start = time.perf_counter()
+                for name, value in TAG.findall(line):
+                    tags[name] = value.replace('\\"', '"')
+                continue
+            if not in_comment and line.startswith('%'):
+                continue   # escape line
+            while position < len(line):
+                if in_comment:
+                    end = line.find('}', position)
+                    if end < 0:
+                        break
+                    in_comment = False
+                    position = end + 1
+                    continue
+                match = TOKEN.search(line, position)
+                if match is None:
+                    break
+                token, position = match.group(), match.end()
+                if token == '{':
+                    in_comment = True
+                elif token == ';':
+                    break
+                elif token == '(':
+                    depth += 1
+                elif token == ')':
+                    depth = max(0, depth - 1)
+                elif depth == 0:
+                    tokens.append(token)
+                    if token in RESULTS:
+                        game = self._finish(number, tags, tokens)
+                        tags, tokens = {}, []
+                        number += 1
+                        if game is not None:
+                            self.seconds += time.perf_counter() - start
+                            yield game
+                            start = time.perf_counter()
+        if tokens or tags:
+            game = self._finish(number, tags, tokens)
+            if game is not None:
+                yield game
+        self.seconds += time.perf_counter() - start
+
+    def _finish(self, number, tags, tokens):
+        try:
+            match = self.build_match(tags, tokens)
+        except PDNError as error:
+            if not self.skip_invalid:
+                raise PDNError(f"game {number + 1}: {error}") from None
+            self.skipped += 1
+            self.errors.append((number + 1, str(error)))
+            return None
+        self.games += 1
+        self.moves += len(match.history)
+        return tags, match
+
+    def build_match(self, tags, tokens):
+        match = Match(self.board_class)
+        match.start_game()
+        if 'FEN' in tags:
+            setup_match(match, tags['FEN'])
+        result = tags.get('Result')
+        for token in tokens:
+            if token in RESULTS:
+                result = token
+                continue
+            if MOVE_NUMBER.match(token):
+                continue
+            move = MOVE.match(token)
+            if move is None:
+                raise PDNError(f"unreadable move {token!r}")
+            first, _, last, more = move.groups()
+            if more:
+                raise PDNError(f"multi-jump {token} at ply {len(match.history) + 1}")
+            (from_row, from_col), (to_row, to_col) = square_position(int(first)), square_position(int(last))
+            if not match.make_move(from_row, from_col, to_row, to_col):
+                raise PDNError(f"illegal move {token} at ply {len(match.history) + 1}")
+        if result in RESULTS and not match.is_game_over():
+            winner = RESULTS[result]
+            if winner is not None:
+                match.game_over = True
+                match.winner = match.player1 if winner == 'white' else match.player2
+        return match
+
+    def get_stats(self):
+        seconds = self.seconds or 1e-9
+        return {
+            'games': self.games,
+            'moves': self.moves,
+            'skipped': self.skipped,
+            'bytes': self.bytes,
+            'seconds': round(self.seconds, 3),
+            'games_per_second': round(self.games / seconds, 1),
+            'moves_per_second': round(self.moves / seconds),
+            'megabytes_per_second': round(self.bytes / seconds / 1e6, 2),
+        }
+
+
+def read_games(file, board_class=Board, skip_invalid=False):
+    """Shortcut for iterating a PDNReader"""
+    return iter(PDNReader(file, board_class, skip_invalid))
+
+
+def format_moves(moves, board=None):
+    """PDN movetext tokens (without numbers) of moves played from board's position (default: the start)"""
+    board = board or Board()
+    tokens = []
+    for (from_row, from_col), (to_row, to_col) in moves:
+        dr = 1 if to_row > from_row else -1
+        dc = 1 if to_col > from_col else -1
+        capture = abs(to_row - from_row) >= 2 and board.get_piece(to_row - dr, to_col - dc) is not None
+        tokens.append(f"{square_number(from_row, from_col)}{'x' if capture else '-'}{square_number(to_row, to_col)}")
+        board.make_move(from_row, from_col, to_row, to_col)
+    return tokens
+
+
+def write_moves(file, moves, result=None, tags=None, first_color='black'):
+    """Write one game given as a move list; result is the winner color, None for a draw or '*' if unfinished"""
+    tags = dict(tags or {})
+    tags['Result'] = RESULT_TOKENS.get(result, result)
+    board = None
+    if 'FEN' in tags:
+        setup = Match()
+        setup_match(setup, tags['FEN'])
+        board, first_color = setup.board, setup.get_current_player_color()
+    for name, value in tags.items():
+        value = str(value).replace('"', '\\"')
+        file.write(f'[{name} "{value}"]\n')
+    file.write('\n')
+
+    line, width = [], 0
+    # A game White starts is numbered '1...' before its first move
+    ply = 1 if first_color == 'white' else 0
+    words = [] if ply == 0 else ['1...']
+    for token in format_moves(moves, board):
+        if ply % 2 == 0:
+            words.append(f"{ply // 2 + 1}.")
+        words.append(token)
+        ply += 1
+    words.append(tags['Result'])
+    for word in words:
+        if line and width + 1 + len(word) > LINE_WIDTH:
+            file.write(' '.join(line) + '\n')
+            line, width = [], 0
+        width += len(word) + (1 if line else 0)
+        line.append(word)
+    file.write(' '.join(line) + '\n\n')
+
+
+def write_game(file, match, tags=None):
+    """Write a Match's history as a PDN game, with a FEN tag if it was set up from one"""
+    tags = dict(tags or {})
+    if match.setup_fen is not None:
+        tags.setdefault('FEN', match.setup_fen)
+    tags.setdefault('Event', 'Checkers game')
+    tags.setdefault('Black', match.player2.color)
+    tags.setdefault('White', match.player1.color)
+    write_moves(file, match.history, match.get_winner() if match.is_game_over() else '*', tags)
@@ -0,0 +1,136 @@
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .BitBoard import BitBoard
+from .Engine import Engine, MAX_PLY, WIN_SCORE, book_result, tablebase_result
+from .Player import Player
+
+# Engine living in each worker process, so its hash table survives between calls
+_worker_engine = None
+
+
+def _init_worker(tt_bytes, tablebase):
+    global _worker_engine
+    _worker_engine = Engine(tt_bytes, tablebase=tablebase)
+
+
+def _search_share(board, color, root_moves, time_ms, max_depth):
+    result = _worker_engine.search(board, color, time_ms, max_depth, root_moves=root_moves)
+    # Best move and score after every completed depth, so shares can be compared at equal depth
+    result['iterations'] = _worker_engine.iterations
+    return result
+
+
+def _share_at(iterations, depth):
+    """(move, score) of a share at depth, or None if it did not get that deep.
+    A share that stopped early on a forced win or loss keeps that result deeper."""
+    if depth <= len(iterations):
+        return iterations[depth - 1]
+    move, score = iterations[-1]
+    return (move, score) if abs(score) > WIN_SCORE - MAX_PLY else None
+
+
+def combine_shares(results):
+    """(move, score, depth) of the best share at the deepest depth every share completed.
+
+    Scores from different depths don't compare, and a share that did not finish
+    depth 1 has no tested move at all, so those are left out. If no share finished
+    depth 1 the first share's untested move is played, at depth 0.
+    """
+    shares = [result['iterations'] for result in results if result['depth'] > 0]
+    if not shares:
+        return (results[0]['move'], 0, 0) if results else (None, 0, 0)
+    depth = max(len(iterations) for iterations in shares)
+    while depth > 1 and any(_share_at(iterations, depth) is None for iterations in shares):
+        depth -= 1
+    move, score = max((_share_at(iterations, depth) for iterations in shares), key=lambda found: found[1])
+    return move, score, depth
+
+
+class ParallelEngine:
+    """Root-splitting search over a process pool.
+
+    The root moves from Player.get_all_possible_moves are dealt round-robin to the
+    workers; each worker runs a normal Engine restricted to its share, and the
+    shares are compared at the deepest depth all of them completed (see
+    combine_shares), which is the depth reported. The pool is created on first
+    use and reused by every later call, so one ParallelEngine should be kept for
+    the life of the process; searches from several threads share it. Book and
+    tablebase moves are answered here before any work is sent to the pool; the
+    workers probe the tablebase inside their searches too.
+    """
+
+    def __init__(self, workers=None, tt_bytes=16 * 1024 * 1024, book=None, tablebase=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.tt_bytes = tt_bytes
+        self.book = book
+        self.tablebase = tablebase
+        self.executor = None
+        self.executor_lock = threading.Lock()   # so concurrent first searches start one pool
+        self.last_search = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _get_executor(self):
+        with self.executor_lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.tt_bytes, self.tablebase))
+            return self.executor
+
+    def close(self):
+        with self.executor_lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown()
+
+    def best_move(self, position, color=None, time_ms=1000, max_depth=MAX_PLY):
+        return self.search(position, color, time_ms, max_depth)['move']
+
+    def search(self, position, color=None, time_ms=1000, max_depth=MAX_PLY):
+        """Same arguments and result as Engine.search; nodes and nps add up all workers"""
+        if hasattr(position, 'current_player'):
+            color = color or position.current_player.color
+            position = position.board
+        if color is None:
+            raise ValueError("color is required when searching a Board")
+
+        start = time.perf_counter()
+        if self.book is not None:
+            move = self.book.best_move(position, color)
+            if move is not None:
+                self.last_search = book_result(move, start)
+                return self.last_search
+        if self.tablebase is not None:
+            move = self.tablebase.best_move(position, color)
+            if move is not None:
+                self.last_search = tablebase_result(self.tablebase, move, position, color, start)
+                return self.last_search
+        root_moves = Player(color).get_all_possible_moves(position)
+        # Ship the compact bitboard to the workers rather than the 8x8 grid of objects
+        board = BitBoard.from_board(position)
+        shares = [root_moves[index::self.workers] for index in range(min(self.workers, len(root_moves)))]
+        executor = self._get_executor()
+        futures = [executor.submit(_search_share, board, color, share, time_ms, max_depth) for share in shares]
+        results = [future.result() for future in futures]
+
+        elapsed = time.perf_counter() - start
+        move, score, depth = combine_shares(results)
+        nodes = sum(result['nodes'] for result in results)
+        self.last_search = {
+            'move': move,
+            'score': score,
+            'depth': depth,
+            'nodes': nodes,
+            'nps': int(nodes / elapsed) if elapsed > 0 else 0,
+            'time_ms': round(elapsed * 1000, 1),
+            'workers': len(shares),
+            'book': False,
+            'tablebase': False,
+        }
+        return self.last_search
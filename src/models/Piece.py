@@ -1,8 +1,29 @@
 # Base class for all pieces (Man and King)
+# Pieces are flyweights: Man('white') always returns the same immutable object, so
+# boards share four pieces instead of allocating one per square, copy or promotion
 class Piece:
-    def __init__(self, color):
-        self.color = color
-        self.is_king = False
+    __slots__ = ('color',)
+    is_king = False
+    _shared = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._shared = {}   # color -> the one piece of this class and color
+
+    def __new__(cls, color):
+        piece = cls._shared.get(color)
+        if piece is None:
+            piece = object.__new__(cls)
+            object.__setattr__(piece, 'color', color)
+            cls._shared[color] = piece
+        return piece
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} pieces are shared and immutable")
+
+    def __reduce__(self):
+        # Unpickling and copying hand back the shared piece
+        return type(self), (self.color,)
 
     def __repr__(self):
         return f'{self.color[0].upper()}'
@@ -11,9 +32,8 @@ class Piece:
         raise NotImplementedError
 
 #Inheritance: Man class inherits from Piece
-class Man(Piece):                  
-    def __init__(self, color):
-        super().__init__(color)  # Man class inherits from Piece
+class Man(Piece):
+    __slots__ = ()
 
     def __repr__(self):
         return f'{self.color[0].upper()}'
@@ -43,10 +63,9 @@ class Man(Piece):
         return moves
 
 #Inheritance: King class inherits from Piece
-class King(Piece):               
-    def __init__(self, color):
-        super().__init__(color)
-        self.is_king = True   # King-specific property set to True
+class King(Piece):
+    __slots__ = ()
+    is_king = True   # King-specific property set to True
 
     def __repr__(self):
         return f'{self.color[0].upper()}K'
@@ -1,30 +1,22 @@
 class Player:
     def __init__(self, color):
         self.color = color   #data (attribute)
-        self.pieces = []     #data (attribute)
+        self.board = None    # board whose piece index answers counts, set by track_board
 
     def __repr__(self):      # Method that manipulates internal data
         return f'Player({self.color})'
 
-    def add_piece(self, piece):
-        self.pieces.append(piece)
-
-    def remove_piece(self, piece):
-        if piece in self.pieces:
-            self.pieces.remove(piece)
+    def track_board(self, board):
+        self.board = board
 
     def get_pieces_count(self):
-        return len(self.pieces)
+        if self.board is None:
+            return 0
+        return self.board.count_pieces(self.color)
 
     def has_pieces(self): # Method that gives access without exposing raw list
-        return len(self.pieces) > 0
+        return self.get_pieces_count() > 0
 
     def get_all_possible_moves(self, board):
-        all_moves = []
-        for row in range(8):
-            for col in range(8):
-                if board.board[row][col] is not None and board.board[row][col].color == self.color:
-                    piece_moves = board.board[row][col].get_possible_moves(board.board, row, col)
-                    all_moves.extend(piece_moves)
-        return all_moves
+        return board.get_all_moves(self.color)
 
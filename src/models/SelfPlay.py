@@ -0,0 +1,102 @@
+import random
+
+from .BitBoard import BitBoard
+from .Engine import Engine, MAX_PLY
+from .GameArchive import encode_move
+from .Match import Match
+
+MAX_GAME_PLIES = 300   # longer games are scored as draws
+
+
+class RandomPolicy:
+    """Uniformly random legal move"""
+
+    name = 'random'
+
+    def new_game(self):
+        pass
+
+    def choose(self, match, moves, rng):
+        return rng.choice(moves)
+
+
+class GreedyCapturePolicy:
+    """Random capture if there is one, kings first, otherwise a random move"""
+
+    name = 'greedy'
+
+    def new_game(self):
+        pass
+
+    def choose(self, match, moves, rng):
+        board = match.board
+        captures = []
+        for move in moves:
+            (from_row, from_col), (to_row, to_col) = move
+            if abs(to_row - from_row) >= 2:
+                captured = board.get_piece(to_row - (1 if to_row > from_row else -1),
+                                           to_col - (1 if to_col > from_col else -1))
+                if captured is not None:
+                    captures.append((captured.is_king, move))
+        if captures:
+            best = max(is_king for is_king, _ in captures)
+            return rng.choice([move for is_king, move in captures if is_king == best])
+        return rng.choice(moves)
+
+
+class SearchPolicy:
+    """Engine search to a fixed depth or for a fixed time per move, with the opening book and tablebase if given"""
+
+    def __init__(self, depth=None, time_ms=None, tt_bytes=16 * 1024 * 1024, book=None, tablebase=None):
+        self.depth = depth or MAX_PLY
+        # A fixed depth runs to completion, so only the depth limit applies
+        self.time_ms = time_ms if time_ms is not None else 10 ** 9
+        self.name = f'depth:{depth}' if depth else f'time:{time_ms}'
+        self.engine = Engine(tt_bytes, book, tablebase)
+
+    def new_game(self):
+        # Start every game from an empty hash table so results don't depend on game order
+        self.engine.tt.clear()
+
+    def choose(self, match, moves, rng):
+        return self.engine.best_move(match, time_ms=self.time_ms, max_depth=self.depth) or rng.choice(moves)
+
+
+def make_policy(spec, book=None, tablebase=None):
+    """Policy for 'random', 'greedy', 'depth:N' or 'time:MS'; search policies use book and tablebase"""
+    kind, _, value = spec.partition(':')
+    if kind == 'random' and not value:
+        return RandomPolicy()
+    if kind == 'greedy' and not value:
+        return GreedyCapturePolicy()
+    if kind == 'depth' and value.isdigit() and int(value) > 0:
+        return SearchPolicy(depth=int(value), book=book, tablebase=tablebase)
+    if kind == 'time' and value.isdigit() and int(value) > 0:
+        return SearchPolicy(time_ms=int(value), book=book, tablebase=tablebase)
+    raise ValueError(f"unknown policy {spec!r}: use random, greedy, depth:N or time:MS")
+
+
+def play_game(white, black, seed, max_plies=MAX_GAME_PLIES):
+    """Play one game between two policies.
+
+    Returns (winner color or None for a draw, moves as ((from_row, from_col), (to_row, to_col)),
+    moves as archive bytes). The same seed replays the same game for deterministic policies.
+    """
+    rng = random.Random(seed)
+    match = Match(BitBoard)
+    match.start_game()
+    white.new_game()
+    black.new_game()
+    moves, codes = [], []
+    while not match.is_game_over() and len(moves) < max_plies:
+        legal = sorted(match.current_player.get_all_possible_moves(match.board))
+        if not legal:
+            # The side to move is blocked: it loses
+            return ('white' if match.get_current_player_color() == 'black' else 'black'), moves, codes
+        policy = white if match.get_current_player_color() == 'white' else black
+        move = policy.choose(match, legal, rng)
+        (from_row, from_col), (to_row, to_col) = move
+        codes.append(encode_move(match.board, from_row, from_col, to_row, to_col))
+        match.make_move(from_row, from_col, to_row, to_col)
+        moves.append(move)
+    return match.get_winner(), moves, codes
@@ -0,0 +1,154 @@
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from .Board import Board
+from .Match import Match
+
+
+def estimate_match_bytes(match):
+    """Rough size of a Match: the match, its players and its board's containers
+    (pieces are shared by every board and not counted)"""
+    board = match.board
+    seen = set()
+    total = 0
+    objects = [match, match.__dict__, board, board.__dict__, match.player1, match.player2]
+    objects += list(vars(board).values())
+    for value in vars(board).values():
+        if isinstance(value, dict):
+            objects += list(value.values())
+    if isinstance(vars(board).get('board'), list):   # stored grid, not a computed view
+        objects += board.board
+    for obj in objects:
+        if id(obj) not in seen:
+            seen.add(id(obj))
+            total += sys.getsizeof(obj)
+    return total
+
+
+class Session:
+    def __init__(self, game_id, match):
+        self.game_id = game_id
+        self.match = match
+        self.lock = threading.Lock()   # held while a request reads or changes this game
+        self.created = time.monotonic()
+        self.last_access = self.created
+
+
+class SessionManager:
+    """Holds many Match instances under game IDs.
+
+    Each game has its own lock, so requests on unrelated games never wait on each
+    other; the manager lock only guards the ID table and is held for dictionary
+    operations, never while a game is being played. Games idle for longer than
+    idle_timeout seconds are dropped, and the least recently used ones are evicted
+    when max_games or the estimated max_memory_bytes would be exceeded. With a
+    GameStore every game is journaled from creation until it is deleted or evicted.
+    """
+
+    def __init__(self, max_games=10000, idle_timeout=3600, max_memory_bytes=None, board_class=Board,
+                 store=None):
+        self.max_games = max_games
+        self.idle_timeout = idle_timeout
+        self.board_class = board_class
+        self.store = store
+        self.sessions = OrderedDict()   # least recently used first
+        self.lock = threading.Lock()
+        self.created = 0
+        self.evicted_idle = 0
+        self.evicted_lru = 0
+        self.deleted = 0
+        if max_memory_bytes is not None:
+            self.game_bytes = estimate_match_bytes(self._new_match())
+            self.max_games = min(max_games, max(1, max_memory_bytes // self.game_bytes))
+        else:
+            self.game_bytes = None
+
+    def _new_match(self):
+        match = Match(self.board_class)
+        match.start_game()
+        return match
+
+    def create(self):
+        session = Session(uuid.uuid4().hex, self._new_match())
+        if self.store is not None:
+            self.store.attach(session.game_id, session.match, session.lock)
+        with self.lock:
+            self._evict_idle(session.created)
+            self._evict_lru(self.max_games - 1)
+            self.sessions[session.game_id] = session
+            self.created += 1
+        return session
+
+    def restore(self, matches):
+        """Host games recovered by GameStore.recover() ({game id: Match}) under their old IDs"""
+        for game_id, match in matches.items():
+            session = Session(game_id, match)
+            if self.store is not None:
+                self.store.attach(game_id, match, session.lock, new=False)
+            with self.lock:
+                self.sessions[game_id] = session
+        with self.lock:
+            self._evict_lru(self.max_games)
+
+    def _evict_lru(self, keep):
+        while len(self.sessions) > keep:
+            self._drop(self.sessions.popitem(last=False)[0])
+            self.evicted_lru += 1
+
+    def _drop(self, game_id):
+        if self.store is not None:
+            self.store.detach(game_id)
+
+    def get(self, game_id):
+        """Session for game_id, or None if it never existed or was evicted"""
+        now = time.monotonic()
+        with self.lock:
+            session = self.sessions.get(game_id)
+            if session is None:
+                return None
+            if now - session.last_access > self.idle_timeout:
+                del self.sessions[game_id]
+                self._drop(game_id)
+                self.evicted_idle += 1
+                return None
+            session.last_access = now
+            self.sessions.move_to_end(game_id)
+            return session
+
+    def delete(self, game_id):
+        with self.lock:
+            if self.sessions.pop(game_id, None) is None:
+                return False
+            self._drop(game_id)
+            self.deleted += 1
+            return True
+
+    def evict_idle(self):
+        with self.lock:
+            self._evict_idle(time.monotonic())
+
+    def _evict_idle(self, now):
+        # Sessions are in access order, so idle ones are all at the front
+        while self.sessions:
+            session = next(iter(self.sessions.values()))
+            if now - session.last_access <= self.idle_timeout:
+                break
+            self._drop(self.sessions.popitem(last=False)[0])
+            self.evicted_idle += 1
+
+    def get_stats(self):
+        with self.lock:
+            active = len(self.sessions)
+        return {
+            'active': active,
+            'created': self.created,
+            'evicted': self.evicted_idle + self.evicted_lru,
+            'evicted_idle': self.evicted_idle,
+            'evicted_lru': self.evicted_lru,
+            'deleted': self.deleted,
+            'max_games': self.max_games,
+            'estimated_game_bytes': self.game_bytes,
+        }
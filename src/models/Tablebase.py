@@ -0,0 +1,468 @@
+import mmap
+import os
+import struct
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations, product
+from math import comb
+
+from .BitBoard import BitBoard, BIT_INDEX, BIT_SQUARE, VALID_MASK, WHITE_KING_ROW, BLACK_KING_ROW, ALL_STEPS
+
+# A tablebase is a directory with one file per material signature
+# (white men, white kings, black men, black kings). Each file holds one byte per
+# placement of those pieces and side to move: 0 for a draw, plies + 1 for a win or
+# a loss in that many plies (odd plies win, even plies lose, as the side that
+# makes the last move wins), and INVALID for placements that are not positions.
+# Only signatures where white has at least black's material are stored; the others
+# are the same positions turned round with the colours swapped.
+MAGIC = b'CKTB'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sB4B3xI')   # magic, format version, signature, positions
+DRAW = 0
+INVALID = 255
+MAX_PLIES = INVALID - 2
+CANNOT_LOSE = 255                     # move counter of a position with a winning or drawing way out
+DEFAULT_PIECES = 5
+
+BINOMIAL = [[comb(n, k) for k in range(33)] for n in range(33)]
+
+# Placements are ranked over the 32 dark squares numbered 0-31 in bit order
+SQUARE_BITS = [bit for bit, square in enumerate(BIT_SQUARE) if square is not None]
+DENSE = [-1] * len(BIT_SQUARE)
+for _dense, _bit in enumerate(SQUARE_BITS):
+    DENSE[_bit] = _dense
+# Bit of the square a half turn of the board puts each bit on
+FLIP = [BIT_INDEX[7 - square[0]][7 - square[1]] if square else -1 for square in BIT_SQUARE]
+# Men never stand on their promotion row
+WHITE_MAN_BITS = [bit for bit in SQUARE_BITS if not WHITE_KING_ROW >> bit & 1]
+BLACK_MAN_BITS = [bit for bit in SQUARE_BITS if not BLACK_KING_ROW >> bit & 1]
+
+
+def _bits(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _flip(mask):
+    flipped = 0
+    for bit in _bits(mask):
+        flipped |= 1 << FLIP[bit]
+    return flipped
+
+
+def signatures(max_pieces=DEFAULT_PIECES):
+    """Stored signatures with 2 to max_pieces pieces, in an order where every
+    capture or promotion leads to a signature listed earlier"""
+    found = []
+    for total in range(2, max_pieces + 1):
+        for signature in product(range(total + 1), repeat=4):
+            white_men, white_kings, black_men, black_kings = signature
+            if (sum(signature) == total and white_men + white_kings and black_men + black_kings
+                    and (white_men, white_kings) >= (black_men, black_kings)):
+                found.append(signature)
+    # A capture takes a piece off, a promotion turns a man into a king
+    found.sort(key=lambda signature: (sum(signature), signature[0] + signature[2]))
+    return found
+
+
+def slice_name(signature):
+    return '-'.join(map(str, signature)) + '.cktb'
+
+
+def _group_sizes(signature):
+    sizes, free = [], 32
+    for count in signature:
+        sizes.append(BINOMIAL[free][count])
+        free -= count
+    return sizes
+
+
+def slice_size(signature):
+    size = 2
+    for group in _group_sizes(signature):
+        size *= group
+    return size
+
+
+def position_index(white_men, white_kings, black_men, black_kings, black_to_move):
+    """Index of a position in its signature's slice.
+
+    Each group of pieces is ranked (combinatorial number system) over the squares
+    the groups before it left free, so the index space holds no overlapping placements.
+    """
+    index = 0
+    occupied = 0   # dense squares taken by earlier groups
+    free = 32
+    for mask in (white_men, white_kings, black_men, black_kings):
+        rank = count = group = 0
+        while mask:
+            low = mask & -mask
+            square = DENSE[low.bit_length() - 1]
+            count += 1
+            rank += BINOMIAL[square - (occupied & ((1 << square) - 1)).bit_count()][count]
+            group |= 1 << square
+            mask ^= low
+        index = index * BINOMIAL[free][count] + rank
+        occupied |= group
+        free -= count
+    return index * 2 + black_to_move
+
+
+def position_at(signature, index):
+    """(white_men, white_kings, black_men, black_kings, black_to_move) at an index of a slice"""
+    black_to_move = index & 1
+    index >>= 1
+    sizes = _group_sizes(signature)
+    ranks = []
+    for size in reversed(sizes):
+        index, rank = divmod(index, size)
+        ranks.append(rank)
+    ranks.reverse()
+    masks = []
+    occupied = 0
+    for count, rank in zip(signature, ranks):
+        # Unrank the combination into ranks among the free squares, highest first
+        free_ranks = []
+        for k in range(count, 0, -1):
+            r = k - 1
+            while BINOMIAL[r + 1][k] <= rank:
+                r += 1
+            rank -= BINOMIAL[r][k]
+            free_ranks.append(r)
+        wanted = set(free_ranks)
+        mask = group = 0
+        free_rank = 0
+        for square in range(32):
+            if occupied >> square & 1:
+                continue
+            if free_rank in wanted:
+                mask |= 1 << SQUARE_BITS[square]
+                group |= 1 << square
+            free_rank += 1
+        masks.append(mask)
+        occupied |= group
+    return (*masks, black_to_move)
+
+
+def _placements(signature):
+    """(white_men, white_kings, black_men, black_kings) bitmasks of every placement of a signature"""
+    white_men_count, white_kings_count, black_men_count, black_kings_count = signature
+    for white_men in combinations(WHITE_MAN_BITS, white_men_count):
+        taken = set(white_men)
+        for white_kings in combinations([bit for bit in SQUARE_BITS if bit not in taken], white_kings_count):
+            taken_kings = taken.union(white_kings)
+            for black_men in combinations([bit for bit in BLACK_MAN_BITS if bit not in taken_kings], black_men_count):
+                taken_all = taken_kings.union(black_men)
+                white_men_mask = sum(1 << bit for bit in white_men)
+                white_kings_mask = sum(1 << bit for bit in white_kings)
+                black_men_mask = sum(1 << bit for bit in black_men)
+                for black_kings in combinations([bit for bit in SQUARE_BITS if bit not in taken_all],
+                                                black_kings_count):
+                    yield white_men_mask, white_kings_mask, black_men_mask, sum(1 << bit for bit in black_kings)
+
+
+def _predecessors(white_men, white_kings, black_men, black_kings, black_to_move):
+    """Indexes of the positions of the same slice that reach this one by a quiet move.
+
+    The side not to move made that move: a man one step back, a king any distance
+    back over empty squares. Captures and promotions come from other slices.
+    """
+    empty = VALID_MASK & ~(white_men | white_kings | black_men | black_kings)
+    if black_to_move:
+        for target in _bits(white_men):
+            for step in (4, 5):
+                source = target + step
+                if empty >> source & 1:
+                    yield position_index(white_men ^ (1 << target | 1 << source), white_kings,
+                                         black_men, black_kings, 0)
+        for target in _bits(white_kings):
+            for step in ALL_STEPS:
+                source = target + step
+                while source >= 0 and empty >> source & 1:
+                    yield position_index(white_men, white_kings ^ (1 << target | 1 << source),
+                                         black_men, black_kings, 0)
+                    source += step
+    else:
+        for target in _bits(black_men):
+            for step in (4, 5):
+                source = target - step
+                if source >= 0 and empty >> source & 1:
+                    yield position_index(white_men, white_kings,
+                                         black_men ^ (1 << target | 1 << source), black_kings, 1)
+        for target in _bits(black_kings):
+            for step in ALL_STEPS:
+                source = target + step
+                while source >= 0 and empty >> source & 1:
+                    yield position_index(white_men, white_kings, black_men,
+                                         black_kings ^ (1 << target | 1 << source), 1)
+                    source += step
+
+
+def _bit_board(white_men, white_kings, black_men, black_kings):
+    board = BitBoard.__new__(BitBoard)
+    board.white_men, board.white_kings = white_men, white_kings
+    board.black_men, board.black_kings = black_men, black_kings
+    board.zobrist = 0
+    board.undo_stack = []
+    return board
+
+
+def solve_slice(directory, signature):
+    """Solve one slice by retrograde analysis and write it to directory.
+
+    Every position first has its moves counted. Moves that capture or promote lead
+    to slices solved earlier and are looked up; a position with no moves is lost.
+    Solved positions are then taken in order of distance, and each one passes its
+    result back to the positions that reach it by a quiet move: a loss makes them
+    wins one ply longer, and a position whose every move reaches a win is lost.
+    Whatever is never reached is a draw. Returns a summary of the slice.
+    """
+    start = time.perf_counter()
+    tablebase = Tablebase(directory)
+    size = slice_size(signature)
+    values = bytearray([INVALID]) * size
+    counters = bytearray(size)        # quiet moves not yet known to reach a win
+    longest = bytearray(size)         # longest win reached by a capture or promotion
+    buckets = {}                      # plies -> indexes solved at that distance
+
+    def push(plies, index):
+        if plies > MAX_PLIES:
+            raise ValueError(f"slice {slice_name(signature)} has a result over {MAX_PLIES} plies")
+        bucket = buckets.get(plies)
+        if bucket is None:
+            bucket = buckets[plies] = array('I')
+        bucket.append(index)
+
+    board = _bit_board(0, 0, 0, 0)
+    for white_men, white_kings, black_men, black_kings in _placements(signature):
+        board.white_men, board.white_kings = white_men, white_kings
+        board.black_men, board.black_kings = black_men, black_kings
+        for black_to_move in (0, 1):
+            index = position_index(white_men, white_kings, black_men, black_kings, black_to_move)
+            values[index] = DRAW
+            if black_to_move:
+                color, men, king_row, probe_color = 'black', black_men, BLACK_KING_ROW, 0
+            else:
+                color, men, king_row, probe_color = 'white', white_men, WHITE_KING_ROW, 1
+            moves = board.generate_moves(color)
+            if not moves:
+                push(0, index)
+                continue
+            quiet = 0
+            win = None
+            can_lose = True
+            worst = 0
+            for source, target in moves:
+                if not board.is_capture(source, target) and not (men >> source & 1 and king_row >> target & 1):
+                    quiet += 1
+                    continue
+                board.make_bit_move(source, target)
+                value = tablebase.probe_bits(board.white_men, board.white_kings,
+                                             board.black_men, board.black_kings, probe_color)
+                board.unmake_move()
+                if value is None:
+                    raise ValueError(f"slice {slice_name(signature)} needs a slice that is not solved yet")
+                if value == DRAW:
+                    can_lose = False
+                elif value % 2:
+                    # The opponent loses in value - 1 plies
+                    win = value if win is None else min(win, value)
+                    can_lose = False
+                else:
+                    worst = max(worst, value - 1)
+            if not can_lose:
+                counters[index] = CANNOT_LOSE
+                if win is not None:
+                    push(win, index)
+            elif quiet:
+                counters[index] = quiet
+                longest[index] = worst
+            else:
+                push(worst + 1, index)
+
+    while buckets:
+        plies = min(buckets)
+        for index in buckets.pop(plies):
+            if values[index] != DRAW:
+                continue
+            values[index] = plies + 1
+            for previous in _predecessors(*position_at(signature, index)):
+                if values[previous] != DRAW:
+                    continue
+                if plies % 2 == 0:
+                    push(plies + 1, previous)
+                elif counters[previous] != CANNOT_LOSE:
+                    counters[previous] -= 1
+                    if counters[previous] == 0:
+                        push(max(plies, longest[previous]) + 1, previous)
+    tablebase.close()
+
+    path = os.path.join(directory, slice_name(signature))
+    with open(path + '.part', 'wb') as file:
+        file.write(HEADER.pack(MAGIC, FORMAT_VERSION, *signature, size))
+        file.write(values)
+    os.replace(path + '.part', path)
+    return {
+        'signature': signature,
+        'positions': size - values.count(INVALID),
+        'draws': values.count(DRAW),
+        'longest': max(max(values.translate(bytes(range(255)) + b'\x00')) - 1, 0),
+        'seconds': round(time.perf_counter() - start, 2),
+    }
+
+
+def is_solved(directory, signature):
+    path = os.path.join(directory, slice_name(signature))
+    try:
+        with open(path, 'rb') as file:
+            header = file.read(HEADER.size)
+    except OSError:
+        return False
+    return (len(header) == HEADER.size
+            and HEADER.unpack(header) == (MAGIC, FORMAT_VERSION, *signature, slice_size(signature))
+            and os.path.getsize(path) == HEADER.size + slice_size(signature))
+
+
+def generate(directory, max_pieces=DEFAULT_PIECES, workers=None, on_slice=None):
+    """Solve every slice with up to max_pieces pieces into directory.
+
+    Slices are solved in waves (same piece and man counts) whose slices only depend
+    on earlier waves, each wave spread over a process pool. Slices already in the
+    directory are kept, so an interrupted run picks up where it stopped. on_slice
+    is called with the summary of each slice solved. Returns the number solved.
+    """
+    os.makedirs(directory, exist_ok=True)
+    waves = {}
+    for signature in signatures(max_pieces):
+        if not is_solved(directory, signature):
+            waves.setdefault((sum(signature), signature[0] + signature[2]), []).append(signature)
+    solved = 0
+    with ProcessPoolExecutor(workers or os.cpu_count() or 1) as executor:
+        for wave in sorted(waves):
+            # Largest slices first, so the wave is not left waiting on one of them
+            wave_slices = sorted(waves[wave], key=slice_size, reverse=True)
+            for summary in executor.map(solve_slice, [directory] * len(wave_slices), wave_slices):
+                solved += 1
+                if on_slice is not None:
+                    on_slice(summary)
+    return solved
+
+
+class Tablebase:
+    """Read-only, memory-mapped endgame tablebase.
+
+    Slices are mapped on first use, so opening a tablebase costs nothing up front
+    and processes probing the same files share their pages. A probe ranks the
+    pieces into an index and reads one byte.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.slices = {}
+        self.max_pieces = 0
+        if os.path.isdir(directory):
+            for name in os.listdir(directory):
+                stem, extension = os.path.splitext(name)
+                counts = stem.split('-')
+                if extension == '.cktb' and len(counts) == 4 and all(count.isdigit() for count in counts):
+                    self.max_pieces = max(self.max_pieces, sum(map(int, counts)))
+
+    def __getstate__(self):
+        # Pickled (e.g. into a worker process) as its directory; slices are mapped again there
+        return {'directory': self.directory}
+
+    def __setstate__(self, state):
+        self.__init__(state['directory'])
+
+    def close(self):
+        for table in self.slices.values():
+            if table is not None:
+                table.close()
+        self.slices = {}
+
+    def _slice(self, signature):
+        table = self.slices.get(signature, False)
+        if table is False:
+            table = None
+            if is_solved(self.directory, signature):
+                with open(os.path.join(self.directory, slice_name(signature)), 'rb') as file:
+                    table = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.slices[signature] = table
+        return table
+
+    def probe_bits(self, white_men, white_kings, black_men, black_kings, black_to_move):
+        """Stored byte for a position given as BitBoard masks, or None when its slice is missing"""
+        white = white_men | white_kings
+        black = black_men | black_kings
+        if not (black if black_to_move else white):
+            return 1   # no pieces left: lost
+        if not (white if black_to_move else black):
+            return None
+        signature = (white_men.bit_count(), white_kings.bit_count(), black_men.bit_count(), black_kings.bit_count())
+        if signature[:2] < signature[2:]:
+            white_men, white_kings, black_men, black_kings = (
+                _flip(black_men), _flip(black_kings), _flip(white_men), _flip(white_kings))
+            signature = signature[2:] + signature[:2]
+            black_to_move ^= 1
+        table = self._slice(signature)
+        if table is None:
+            return None
+        return table[HEADER.size + position_index(white_men, white_kings, black_men, black_kings, black_to_move)]
+
+    def _bit_board(self, position, color):
+        if hasattr(position, 'current_player'):
+            color = color or position.current_player.color
+            position = position.board
+        if color is None:
+            raise ValueError("color is required when probing a Board")
+        if position.count_pieces('white') + position.count_pieces('black') > self.max_pieces:
+            return None, color
+        return BitBoard.from_board(position), color
+
+    def probe(self, position, color=None):
+        """('win' | 'loss' | 'draw', plies) for a Match (its current player) or a Board (color).
+
+        plies counts moves of both sides until the game is won, and is None for draws.
+        Returns None for positions the tablebase does not cover.
+        """
+        board, color = self._bit_board(position, color)
+        if board is None:
+            return None
+        value = self.probe_bits(board.white_men, board.white_kings, board.black_men, board.black_kings,
+                                int(color == 'black'))
+        if value is None:
+            return None
+        if value == DRAW:
+            return 'draw', None
+        return ('win' if value % 2 == 0 else 'loss'), value - 1
+
+    def best_move(self, position, color=None):
+        """Tablebase move as ((from_row, from_col), (to_row, to_col)), or None.
+
+        Wins take the shortest way, losses hold out the longest and draws keep the draw.
+        """
+        board, color = self._bit_board(position, color)
+        if board is None:
+            return None
+        probe_color = int(color != 'black')
+        best, best_rank = None, None
+        for source, target in board.generate_moves(color):
+            board.make_bit_move(source, target)
+            value = self.probe_bits(board.white_men, board.white_kings, board.black_men, board.black_kings,
+                                    probe_color)
+            board.unmake_move()
+            if value is None:
+                return None
+            # Rank from the mover's side: opponent lost soonest, then drawn, then lost latest
+            if value == DRAW:
+                rank = 0
+            elif value % 2:
+                rank = 1000 - value
+            else:
+                rank = value - 1000
+            if best_rank is None or rank > best_rank:
+                best, best_rank = (source, target), rank
+        return (BIT_SQUARE[best[0]], BIT_SQUARE[best[1]]) if best else None
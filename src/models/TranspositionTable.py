@@ -0,0 +1,88 @@
+import sys
+
+# Bound types of a stored value
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+# Approximate size of one stored entry: the slot in the list plus the entry tuple
+# and its small ints. Used to turn a memory budget into a number of slots.
+ENTRY_BYTES = 8 + sys.getsizeof((0, 0, 0, 0, None, 0)) + 5 * 32
+
+
+class TranspositionTable:
+    """Fixed-size table of search results keyed by Zobrist keys.
+
+    Slots are grouped in buckets of two. A new entry replaces the entry with the same
+    key, otherwise the bucket's weakest entry: empty first, then entries left over
+    from an older search (see new_search), then the shallowest one.
+    """
+
+    BUCKET_SIZE = 2
+
+    def __init__(self, max_bytes=16 * 1024 * 1024):
+        buckets = 1
+        while buckets * 2 * self.BUCKET_SIZE * ENTRY_BYTES <= max_bytes:
+            buckets *= 2
+        self.bucket_mask = buckets - 1
+        self.slots = [None] * (buckets * self.BUCKET_SIZE)
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return sum(1 for entry in self.slots if entry is not None)
+
+    @property
+    def capacity(self):
+        return len(self.slots)
+
+    def new_search(self):
+        """Start a new generation; entries from older ones become the first to go"""
+        self.generation += 1
+
+    def clear(self):
+        self.slots = [None] * len(self.slots)
+        self.generation = 0
+
+    def probe(self, key):
+        """Return (depth, value, bound, best_move) stored for key, or None"""
+        first = (key & self.bucket_mask) * self.BUCKET_SIZE
+        for index in range(first, first + self.BUCKET_SIZE):
+            entry = self.slots[index]
+            if entry is not None and entry[0] == key:
+                self.hits += 1
+                return entry[1:5]
+        self.misses += 1
+        return None
+
+    def store(self, key, depth, value, bound=EXACT, best_move=None):
+        first = (key & self.bucket_mask) * self.BUCKET_SIZE
+        victim = victim_rank = None
+        for index in range(first, first + self.BUCKET_SIZE):
+            entry = self.slots[index]
+            if entry is None or entry[0] == key:
+                victim = index
+                break
+            # Lower rank is replaced first: old generation before current, then shallower
+            rank = (entry[5] == self.generation, entry[1])
+            if victim is None or rank < victim_rank:
+                victim, victim_rank = index, rank
+        else:
+            self.evictions += 1
+        self.slots[victim] = (key, depth, value, bound, best_move, self.generation)
+        self.stores += 1
+
+    def get_stats(self):
+        probes = self.hits + self.misses
+        return {
+            'capacity': self.capacity,
+            'entries': len(self),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / probes if probes else 0.0,
+            'stores': self.stores,
+            'evictions': self.evictions,
+        }
@@ -0,0 +1,36 @@
+import random
+
+# Zobrist hashing: one random 64-bit key per (piece kind, square) plus one for the
+# side to move. A position's key is the XOR of the keys of everything on it, so a
+# move only has to XOR out what left a square and XOR in what arrived.
+# The generator is seeded so keys are stable across runs and can be stored on disk.
+_rng = random.Random(0x5EED_C0DE)
+
+# (color, is_king) -> 8x8 grid of keys (light squares get keys too but are never used)
+PIECE_KEYS = {
+    (color, is_king): [[_rng.getrandbits(64) for _ in range(8)] for _ in range(8)]
+    for color in ('white', 'black')
+    for is_king in (False, True)
+}
+
+BLACK_TO_MOVE_KEY = _rng.getrandbits(64)
+
+
+def piece_key(piece, row, col):
+    return PIECE_KEYS[piece.color, piece.is_king][row][col]
+
+
+def side_key(color):
+    """Key to XOR in for the side to move (white to move contributes nothing)"""
+    return BLACK_TO_MOVE_KEY if color == 'black' else 0
+
+
+def compute_key(board, color=None):
+    """Key of board computed from scratch, including the side to move when color is given"""
+    key = 0
+    for piece_color in ('white', 'black'):
+        for piece, row, col in board.get_all_pieces(piece_color):
+            key ^= piece_key(piece, row, col)
+    if color is not None:
+        key ^= side_key(color)
+    return key
@@ -0,0 +1,81 @@
+"""Generate and probe endgame tablebases (see src/models/Tablebase.py).
+
+    python tablebase.py generate tables/ [--pieces 5] [--workers N]
+    python tablebase.py probe tables/ "W:W18,K10:B12,K22"
+
+generate solves every ending with up to --pieces pieces into the directory; run it
+again after an interruption and it carries on with the slices still missing. probe
+gives the result of a position, written as a PDN FEN tag, and the value of each move.
+"""
+import argparse
+import sys
+import time
+
+from src.models.Match import Match
+from src.models.Notation import format_move
+from src.models.PDN import PDNError, setup_match
+from src.models.Tablebase import Tablebase, generate, signatures, slice_name, DEFAULT_PIECES
+
+
+def run_generate(args):
+    total = len(signatures(args.pieces))
+    done = [0]
+
+    def report(summary):
+        done[0] += 1
+        print(f"{slice_name(summary['signature']):>14} {summary['positions']:>11,} positions "
+              f"{summary['draws']:>11,} draws  longest {summary['longest']:>3} plies  {summary['seconds']:>8.1f}s")
+
+    start = time.perf_counter()
+    solved = generate(args.directory, args.pieces, args.workers, report)
+    print(f"{solved} slices solved, {total - solved} already there, in {time.perf_counter() - start:.1f}s")
+
+
+def describe(found):
+    if found is None:
+        return "not in the tablebase"
+    result, plies = found
+    return result if plies is None else f"{result} in {plies} plies"
+
+
+def run_probe(args):
+    match = Match()
+    try:
+        setup_match(match, args.fen)
+    except PDNError as error:
+        sys.exit(str(error))
+    tablebase = Tablebase(args.directory)
+    start = time.perf_counter()
+    found = tablebase.probe(match)
+    elapsed = time.perf_counter() - start
+    color = match.get_current_player_color()
+    print(f"{color} to move: {describe(found)} ({elapsed * 1e6:.1f} us)")
+    opponent = match.player1.color if match.current_player is match.player2 else match.player2.color
+    for (from_row, from_col), (to_row, to_col) in match.current_player.get_all_possible_moves(match.board):
+        match.board.make_move(from_row, from_col, to_row, to_col)
+        print(f"  {format_move((from_row, from_col), (to_row, to_col))}  "
+              f"{opponent} then {describe(tablebase.probe(match.board, opponent))}")
+        match.board.unmake_move()
+    best = tablebase.best_move(match)
+    if best:
+        print(f"tablebase move: {format_move(*best)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate and probe endgame tablebases")
+    commands = parser.add_subparsers(dest='command', required=True)
+    generate_parser = commands.add_parser('generate')
+    generate_parser.add_argument('directory')
+    generate_parser.add_argument('--pieces', type=int, default=DEFAULT_PIECES, help="most pieces on the board")
+    generate_parser.add_argument('--workers', type=int, default=None, help="processes (default: CPU count)")
+    generate_parser.set_defaults(run=run_generate)
+    probe_parser = commands.add_parser('probe')
+    probe_parser.add_argument('directory')
+    probe_parser.add_argument('fen', help='position as a PDN FEN tag, e.g. "W:W18,K10:B12,K22"')
+    probe_parser.set_defaults(run=run_probe)
+    args = parser.parse_args()
+    args.run(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""HTTP API behaviour through Flask's test client (the global game and /games sessions)."""
+import pytest
+
+import api_server
+
+
+@pytest.fixture
+def client():
+    api_server.app.testing = True
+    client = api_server.app.test_client()
+    client.post('/reset')
+    return client
+
+
+class MovingEngine:
+    """Engine stand-in whose search lets another request move first"""
+
+    def __init__(self, client, path):
+        self.client = client
+        self.path = path
+
+    def search(self, board, color, time_ms=1000):
+        assert self.client.post(self.path, json={'player': color, 'from': 'B6', 'to': 'A5'}).status_code == 200
+        return {'move': ((2, 1), (3, 0)), 'score': 0, 'depth': 1, 'nodes': 1, 'nps': 1, 'time_ms': 1,
+                'book': False, 'tablebase': False}
+
+
+def test_engine_move_refused_when_the_position_changed(client, monkeypatch):
+    monkeypatch.setattr(api_server, 'get_engine', lambda: MovingEngine(client, '/move'))
+    response = client.post('/engine/move', json={'time_ms': 10})
+    assert response.status_code == 409
+    assert not response.get_json().get('success')
+    assert client.get('/board').get_json()['current_player'] == 'white'
+
+
+def test_session_engine_move_refused_when_the_position_changed(client, monkeypatch):
+    game_id = client.post('/games').get_json()['game_id']
+    monkeypatch.setattr(api_server, 'get_engine', lambda: MovingEngine(client, f'/games/{game_id}/move'))
+    assert client.post(f'/games/{game_id}/engine/move', json={'time_ms': 10}).status_code == 409
+    client.delete(f'/games/{game_id}')
+
+
+def test_engine_move_is_played(client):
+    body = client.post('/engine/move', json={'time_ms': 20}).get_json()
+    assert body['success'] and body['current_player'] == 'white'
+    assert client.get('/board').get_json()['version'] == 2
+
+
+def test_session_lifecycle(client):
+    created = client.post('/games')
+    assert created.status_code == 201
+    game_id = created.get_json()['game_id']
+    assert client.post(f'/games/{game_id}/move', json={'player': 'black', 'from': 'B6', 'to': 'A5'}).get_json()['success']
+    assert client.post(f'/games/{game_id}/move', json={'player': 'black', 'from': 'D6', 'to': 'C5'}).status_code == 400
+
+    board = client.get(f'/games/{game_id}/board').get_json()
+    assert board['current_player'] == 'white' and board['version'] == 2
+    assert board['board'][3][0] == {'color': 'black', 'is_king': False, 'position': 'A5'}
+    info = client.get(f'/games/{game_id}/info', query_string={'piece': 'C3'}).get_json()
+    assert info['color'] == 'white' and sorted(info['possible_moves']) == ['B4', 'D4']
+    # The global game is a different one
+    assert client.get('/board').get_json()['current_player'] == 'black'
+
+    assert client.delete(f'/games/{game_id}').status_code == 200
+    assert client.get(f'/games/{game_id}/board').status_code == 404
+    assert client.delete(f'/games/{game_id}').status_code == 404
+
+
+def test_batch_stops_at_the_first_illegal_move(client):
+    response = client.post('/moves', json={'moves': ['B6-A5', ['C3', 'B4'], 'A5-A4', 'F6-E5'], 'results': True})
+    assert response.status_code == 400
+    body = response.get_json()
+    assert (body['applied'], body['total'], body['failed_index'], body['error']) == (2, 4, 2, 'Invalid move')
+    assert [ply['to'] for ply in body['plies']] == ['A5', 'B4'] and body['version'] == 3
+    assert client.post('/moves', json={'record': 'F6-E5 B4-C5'}).get_json()['success']
+    assert client.post('/moves', json={}).status_code == 400
+
+
+def test_game_created_from_a_record(client):
+    before = client.get('/games').get_json()
+    created = client.post('/games', json={'record': 'B6-A5 C3-B4 A5xC3'})
+    assert created.status_code == 201
+    body = created.get_json()
+    assert body['applied'] == 3 and body['current_player'] == 'white'
+    board = client.get(f"/games/{body['game_id']}/board").get_json()['board']
+    assert board[5][2]['color'] == 'black' and board[4][1] is None
+
+    # A record that fails part way is reported and no game is kept
+    failed = client.post('/games', json={'record': 'B6-A5 C3-B4 A5-A4'})
+    assert failed.status_code == 400 and failed.get_json()['failed_index'] == 2
+    after = client.get('/games').get_json()
+    assert after['created'] == before['created'] + 2 and after['active'] == before['active'] + 1
+    client.delete(f"/games/{body['game_id']}")
+
+
+def test_board_etag(client):
+    first = client.get('/board')
+    etag = first.headers['ETag']
+    assert client.get('/board', headers={'If-None-Match': etag}).status_code == 304
+    fen = client.get('/board', query_string={'format': 'fen'})
+    assert fen.headers['ETag'] != etag
+    assert client.get('/board', query_string={'format': 'fen'}, headers={'If-None-Match': fen.headers['ETag']}).status_code == 304
+
+    client.post('/move', json={'player': 'black', 'from': 'B6', 'to': 'A5'})
+    changed = client.get('/board', headers={'If-None-Match': etag})
+    assert changed.status_code == 200 and changed.headers['ETag'] != etag
+    # A reset game starts at version 1 again, but never answers to the old game's tags
+    client.post('/reset')
+    assert client.get('/board', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_board_formats_agree(client):
+    client.post('/moves', json={'record': 'B6-A5 C3-B4'})
+    fen = client.get('/board', query_string={'format': 'fen'}).get_json()
+    packed = client.get('/board', query_string={'format': 'bytes'})
+    assert packed.headers['X-Board-Version'] == str(fen['version']) == '3'
+    assert packed.headers['X-Game-Over'] == 'false'
+    board, color = api_server.BOARD_CLASS.from_bytes(packed.get_data())
+    assert board.to_fen(color) == fen['fen']
+    assert client.get('/board', query_string={'format': 'xml'}).status_code == 400
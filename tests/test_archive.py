@@ -0,0 +1,87 @@
+"""Binary game archives: move bytes, writer/reader round trip and recovery of unclosed files."""
+import json
+
+import pytest
+
+import archive
+from src.models.GameArchive import ArchiveReader, ArchiveWriter, encode_moves, decode_moves
+from src.models.Match import Match
+from src.models.SelfPlay import GreedyCapturePolicy, RandomPolicy, play_game
+
+
+def sample_games(count=6):
+    games = []
+    for number in range(count):
+        winner, moves, codes = play_game(RandomPolicy(), GreedyCapturePolicy(), number, 120)
+        games.append((number, 1000 + number, winner, moves, bytes(codes)))
+    return games
+
+
+def test_move_bytes_round_trip():
+    for _, _, _, moves, codes in sample_games():
+        assert encode_moves(moves) == codes
+        assert decode_moves(codes) == moves
+
+
+def test_illegal_move_is_refused():
+    with pytest.raises(ValueError, match='ply 1'):
+        encode_moves([((2, 1), (3, 0)), ((5, 0), (3, 0))])
+
+
+def test_writer_reader_round_trip(tmp_path):
+    path = str(tmp_path / 'games.ckga')
+    games = sample_games()
+    with ArchiveWriter(path, {'white': 'random', 'black': 'greedy'}) as writer:
+        for number, seed, winner, _, codes in games:
+            writer.add(number, seed, winner, codes)
+
+    with ArchiveReader(path) as reader:
+        assert reader.metadata == {'white': 'random', 'black': 'greedy'}
+        assert len(reader) == len(games)
+        for k, (number, seed, winner, moves, codes) in enumerate(games):
+            found_number, found_seed, found_winner, found_codes = reader.game(k)
+            assert (found_number, found_seed, found_winner, bytes(found_codes)) == (number, seed, winner, codes)
+            # Replaying part of a game gives the position a Match reaches with the same moves
+            ply = len(moves) // 2
+            match = Match()
+            match.start_game()
+            for (from_row, from_col), (to_row, to_col) in moves[:ply]:
+                assert match.make_move(from_row, from_col, to_row, to_col)
+            assert reader.replay(k, ply).to_fen('white') == match.board.to_fen('white')
+            del found_codes
+
+
+def test_unclosed_archive_is_read_and_resumed(tmp_path):
+    path = str(tmp_path / 'games.ckga')
+    games = sample_games()
+    writer = ArchiveWriter(path)
+    for number, seed, winner, _, codes in games[:4]:
+        writer.add(number, seed, winner, codes)
+    writer.flush()
+    writer.file.write(b'\x05\x00')   # a crash in the middle of the next game header
+
+    with ArchiveReader(path) as reader:
+        assert [number for number, _, _, _ in reader] == [0, 1, 2, 3]
+
+    with ArchiveWriter(path, resume=True) as writer:
+        assert writer.done == {0, 1, 2, 3}
+        for number, seed, winner, _, codes in games[4:]:
+            writer.add(number, seed, winner, codes)
+    with ArchiveReader(path) as reader:
+        assert [bytes(moves) for _, _, _, moves in reader] == [codes for *_, codes in games]
+
+
+def test_jsonl_import_export_round_trip(tmp_path):
+    games = sample_games(3)
+    source, target, exported = (str(tmp_path / name) for name in ('in.jsonl', 'games.ckga', 'out.jsonl'))
+    with open(source, 'w') as lines:
+        for number, seed, winner, moves, _ in games:
+            lines.write(json.dumps({'game': number, 'seed': seed, 'result': winner or 'draw',
+                                    'moves': archive.format_moves(moves)}) + '\n')
+    assert archive.import_jsonl(source, target) == 3
+    assert archive.export_jsonl(target, exported) == 3
+    with open(source) as before, open(exported) as after:
+        for original, record in zip(before, after):
+            original, record = json.loads(original), json.loads(record)
+            assert record == {**original, 'plies': len(original['moves'])}
+
@@ -0,0 +1,75 @@
+"""Board.to_fen / from_fen and to_bytes / from_bytes on every board storage."""
+import random
+
+import pytest
+
+from benchmarks.perft import BOARD_CLASSES
+from src.models.Board import PACKED
+from src.models.Match import Match
+
+INITIAL_FEN = 'B:bbbbbbbbbbbb........wwwwwwwwwwww'
+
+
+def positions(board_class, games=8, seed=11):
+    """(board, side to move) along random games, kings included"""
+    rng = random.Random(seed)
+    for _ in range(games):
+        match = Match(board_class)
+        match.start_game()
+        while not match.is_game_over() and len(match.history) < 150:
+            yield match.board, match.get_current_player_color()
+            legal = sorted(match.current_player.get_all_possible_moves(match.board))
+            if not legal:
+                break
+            (from_row, from_col), (to_row, to_col) = rng.choice(legal)
+            match.make_move(from_row, from_col, to_row, to_col)
+
+
+def pieces(board):
+    return [(row, col, piece.color, piece.is_king) for row in range(8) for col in range(8)
+            for piece in [board.get_piece(row, col)] if piece is not None]
+
+
+@pytest.mark.parametrize('board_name', list(BOARD_CLASSES))
+def test_round_trips(board_name):
+    board_class = BOARD_CLASSES[board_name]
+    kings = 0
+    for board, color in positions(board_class):
+        fen = board.to_fen(color)
+        packed = board.to_bytes(color)
+        assert len(packed) == PACKED.size
+        for read_class in BOARD_CLASSES.values():
+            # Any storage reads what any other wrote, with the same Zobrist key
+            for decoded, found_color in (read_class.from_fen(fen), read_class.from_bytes(packed)):
+                assert found_color == color
+                assert pieces(decoded) == pieces(board)
+                assert decoded.zobrist == board.zobrist
+                assert decoded.to_fen(color) == fen
+        kings += 'W' in fen[2:] or 'B' in fen[2:]
+    assert kings, "the sample games should reach kings"
+
+
+@pytest.mark.parametrize('board_name', list(BOARD_CLASSES))
+def test_initial_position(board_name):
+    match = Match(BOARD_CLASSES[board_name])
+    match.start_game()
+    assert match.board.to_fen('black') == INITIAL_FEN
+    # Black men on squares 0-11, white men on 20-31, no kings
+    assert match.board.to_bytes('black') == PACKED.pack(1, 0xfff00000, 0x00000fff, 0)
+
+
+@pytest.mark.parametrize('text', ['', 'W:' + '.' * 31, 'X:' + '.' * 32, 'W:' + 'x' + '.' * 31, 'W;' + '.' * 32])
+def test_bad_fen_is_refused(text):
+    with pytest.raises(ValueError):
+        BOARD_CLASSES['list'].from_fen(text)
+
+
+@pytest.mark.parametrize('data', [
+    b'',
+    PACKED.pack(2, 1, 2, 0),   # no such side to move
+    PACKED.pack(0, 1, 1, 0),   # a square both white and black
+    PACKED.pack(0, 1, 2, 4),   # a king on an empty square
+])
+def test_bad_bytes_are_refused(data):
+    with pytest.raises(ValueError):
+        BOARD_CLASSES['list'].from_bytes(data)
@@ -0,0 +1,55 @@
+"""Incremental piece-square evaluation against the score computed from scratch."""
+import random
+
+import pytest
+
+from benchmarks.perft import BOARD_CLASSES
+from src.models.Evaluator import Evaluator, default_tables
+
+
+@pytest.mark.parametrize('board_name', list(BOARD_CLASSES))
+def test_incremental_score_follows_moves_and_take_backs(board_name):
+    board = BOARD_CLASSES[board_name]()
+    board.initialize_board()
+    evaluator = Evaluator(board, debug=True)
+    rng = random.Random(3)
+    color = 'black'
+    for _ in range(60):
+        moves = sorted(board.get_all_moves(color))
+        if not moves:
+            break
+        for move in moves:
+            board.make_move(*move[0], *move[1])
+            board.unmake_move()
+        move = rng.choice(moves)
+        board.make_move(*move[0], *move[1])
+        color = 'white' if color == 'black' else 'black'
+    assert evaluator.score == default_tables().evaluate(board)
+    while board.undo_stack:
+        board.unmake_move()
+    assert evaluator.history == []
+
+
+@pytest.mark.parametrize('board_name', list(BOARD_CLASSES))
+def test_attaching_with_moves_to_take_back_is_refused(board_name):
+    board = BOARD_CLASSES[board_name]()
+    board.initialize_board()
+    board.make_move(5, 0, 4, 1)
+    with pytest.raises(ValueError):
+        Evaluator(board)
+    board.unmake_move()
+    Evaluator(board, debug=True)
+
+
+@pytest.mark.parametrize('board_name', list(BOARD_CLASSES))
+def test_initialize_board_updates_the_score(board_name):
+    board = BOARD_CLASSES[board_name]()
+    evaluator = Evaluator(board)
+    reset = evaluator.reset
+    calls = []
+    evaluator.reset = lambda: calls.append(reset())
+    updates = evaluator.updates
+    board.initialize_board()
+    # The initial position scores 0 either way, so check the evaluator heard of the change
+    assert calls or evaluator.updates > updates
+    assert evaluator.score == default_tables().evaluate(board)
@@ -0,0 +1,80 @@
+"""GameStore journal and snapshot round trips: record, close, recover."""
+import random
+
+from src.models.BitBoard import BitBoard
+from src.models.GameStore import GameStore
+from src.models.Match import Match
+
+FIRST, SECOND, GONE = '01' * 16, '02' * 16, '03' * 16
+
+
+def play(match, plies, seed):
+    rng = random.Random(seed)
+    for _ in range(plies):
+        if match.is_game_over():
+            break
+        move = rng.choice(sorted(match.current_player.get_all_possible_moves(match.board)))
+        assert match.make_move(*move[0], *move[1])
+
+
+def new_match():
+    match = Match()
+    match.start_game()
+    return match
+
+
+def assert_same_game(recovered, match):
+    assert recovered.history == match.history
+    assert recovered.board.zobrist == match.board.zobrist
+    assert recovered.get_current_player_color() == match.get_current_player_color()
+    assert recovered.is_game_over() == match.is_game_over()
+    assert recovered.get_winner() == match.get_winner()
+
+
+def test_journal_and_snapshot_round_trip(tmp_path):
+    store = GameStore(str(tmp_path), fsync=False)
+    assert store.recover() == {}
+    games = {FIRST: new_match(), SECOND: new_match(), GONE: new_match()}
+    for game_id, match in games.items():
+        store.attach(game_id, match)
+    play(games[FIRST], 12, seed=1)
+    play(games[GONE], 4, seed=2)
+    assert store.snapshot() == 3
+    # After the snapshot: more moves, a deleted game and one played to the end
+    play(games[FIRST], 8, seed=3)
+    play(games[SECOND], 400, seed=4)
+    store.detach(GONE)
+    store.close()
+
+    store = GameStore(str(tmp_path), fsync=False)
+    recovered = store.recover()
+    assert set(recovered) == {FIRST, SECOND}
+    assert_same_game(recovered[FIRST], games[FIRST])
+    assert_same_game(recovered[SECOND], games[SECOND])
+    assert store.get_stats()['recovery']['snapshot_games'] == 3
+
+    # Recovered games journal on when attached again, here on another board storage
+    store.attach(FIRST, recovered[FIRST], new=False)
+    play(recovered[FIRST], 6, seed=5)
+    store.close()
+    again = GameStore(str(tmp_path), fsync=False)
+    assert_same_game(again.recover(BitBoard)[FIRST], recovered[FIRST])
+    again.close()
+
+
+def test_failed_journal_leaves_the_game_playable(tmp_path):
+    store = GameStore(str(tmp_path), fsync=True)
+    store.recover()
+    match = new_match()
+    seen = []
+    store.attach(FIRST, match)
+    match.add_listener(seen.append)
+
+    def fail(data):
+        raise OSError('disk full')
+    store.file.write = fail
+    play(match, 3, seed=6)
+    assert len(match.history) == 3 and len(seen) == 3
+    stats = store.get_stats()
+    assert stats['error'] == 'disk full' and stats['unjournaled_moves'] == 3
+    store.close()
@@ -0,0 +1,35 @@
+"""Match behaviour shared by every board storage (piece move queries, versions)."""
+import random
+
+import pytest
+
+from benchmarks.perft import BOARD_CLASSES
+from src.models.Match import Match
+
+
+@pytest.mark.parametrize('board_name', list(BOARD_CLASSES))
+def test_piece_moves_follow_the_position(board_name):
+    rng = random.Random(7)
+    match = Match(BOARD_CLASSES[board_name])
+    match.start_game()
+    while not match.is_game_over() and len(match.history) < 80:
+        color = match.get_current_player_color()
+        for _, row, col in match.board.get_all_pieces(color):
+            assert sorted(match.get_possible_moves_for_piece(row, col)) == sorted(match.board.get_piece_moves(row, col))
+        legal = sorted(match.current_player.get_all_possible_moves(match.board))
+        if not legal:
+            break
+        (from_row, from_col), (to_row, to_col) = rng.choice(legal)
+        # A move tried on the board and taken back leaves the answers of the position as they were
+        match.board.make_move(from_row, from_col, to_row, to_col)
+        match.board.unmake_move()
+        assert (sorted(match.get_possible_moves_for_piece(from_row, from_col))
+                == sorted(match.board.get_piece_moves(from_row, from_col)))
+        assert match.make_move(from_row, from_col, to_row, to_col)
+
+
+def test_piece_moves_only_for_the_side_to_move():
+    match = Match()
+    match.start_game()
+    assert match.get_possible_moves_for_piece(5, 0) == []   # white man, black to move
+    assert match.get_possible_moves_for_piece(2, 1) == [((2, 1), (3, 0)), ((2, 1), (3, 2))]
@@ -0,0 +1,101 @@
+"""Opening books: built from an archive, looked up by position key, played from by best_move."""
+import pytest
+
+from src.models.BitBoard import BitBoard
+from src.models.GameArchive import ArchiveWriter
+from src.models.Match import Match
+from src.models.OpeningBook import OpeningBook, build_book, write_book, encode_book_move
+from src.models.SelfPlay import RandomPolicy, play_game
+
+GAMES = 40
+PLIES = 4
+
+
+@pytest.fixture(scope='module')
+def games(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('book') / 'games.ckga')
+    played = []
+    with ArchiveWriter(path) as writer:
+        for number in range(GAMES):
+            winner, moves, codes = play_game(RandomPolicy(), RandomPolicy(), number, 60)
+            writer.add(number, number, winner, bytes(codes))
+            played.append((winner, moves))
+    return path, played
+
+
+def expected_counts(played, plies):
+    """{(position key, move): [games, wins, draws, losses]} counted by replaying the games on a Match"""
+    counts = {}
+    for winner, moves in played:
+        match = Match()
+        match.start_game()
+        for move in moves[:plies]:
+            color = match.get_current_player_color()
+            stats = counts.setdefault((match.get_position_key(), move), [0, 0, 0, 0])
+            stats[0] += 1
+            stats[1 if winner == color else 2 if winner is None else 3] += 1
+            assert match.make_move(*move[0], *move[1])
+    return counts
+
+
+def book_counts(book, played, plies):
+    counts = {}
+    for _, moves in played:
+        match = Match()
+        match.start_game()
+        for move in moves[:plies]:
+            for found, *stats in book.lookup(match.get_position_key()):
+                counts[match.get_position_key(), found] = stats
+            match.make_move(*move[0], *move[1])
+    return counts
+
+
+def test_build_and_lookup(games, tmp_path):
+    path, played = games
+    target = str(tmp_path / 'book.bin')
+    expected = expected_counts(played, PLIES)
+    assert build_book([path], target, min_games=1, plies=PLIES, workers=1) == len(expected)
+    book = OpeningBook(target)
+    try:
+        assert len(book) == len(expected)
+        assert book_counts(book, played, PLIES) == expected
+        start = Match()
+        start.start_game()
+        assert sum(games for _, games, *_ in book.lookup(start.get_position_key())) == GAMES
+        assert book.lookup(12345) == []
+    finally:
+        book.close()
+
+
+def test_min_games_leaves_rare_moves_out(games, tmp_path):
+    path, played = games
+    target = str(tmp_path / 'book.bin')
+    expected = {key: stats for key, stats in expected_counts(played, PLIES).items() if stats[0] >= 3}
+    assert build_book([path], target, min_games=3, plies=PLIES, workers=1) == len(expected)
+    book = OpeningBook(target)
+    try:
+        assert book_counts(book, played, PLIES) == expected
+    finally:
+        book.close()
+
+
+def test_best_move_ranks_and_checks_legality(tmp_path):
+    match = Match(BitBoard)
+    match.start_game()
+    key = match.get_position_key()
+    entries = sorted([
+        ((key, encode_book_move(((2, 1), (3, 0)))), (10, 3, 2, 5)),
+        ((key, encode_book_move(((2, 3), (3, 4)))), (10, 6, 2, 2)),
+        ((key, encode_book_move(((5, 0), (4, 1)))), (50, 50, 0, 0)),   # white's move: never played for black
+    ])
+    target = str(tmp_path / 'book.bin')
+    write_book(target, entries)
+    book = OpeningBook(target)
+    try:
+        assert book.best_move(match.board, 'black') == ((2, 3), (3, 4))
+    finally:
+        book.close()
+    with open(target, 'r+b') as file:
+        file.write(b'XXXX')   # not a book any more
+    with pytest.raises(ValueError):
+        OpeningBook(target)
@@ -0,0 +1,54 @@
+"""PDN writing and reading back, from the start and from a FEN set-up position."""
+import io
+import random
+
+from src.models.Match import Match
+from src.models.PDN import read_games, setup_match, write_game
+
+FEN = 'W:W18,24,K10:B12,16-20,K22'
+
+
+def random_game(match, plies, seed):
+    rng = random.Random(seed)
+    for _ in range(plies):
+        if match.is_game_over():
+            break
+        move = rng.choice(sorted(match.current_player.get_all_possible_moves(match.board)))
+        assert match.make_move(*move[0], *move[1])
+    return match
+
+
+def round_trip(match):
+    text = io.StringIO()
+    write_game(text, match)
+    (tags, read), = read_games(io.StringIO(text.getvalue()))
+    return text.getvalue(), tags, read
+
+
+def test_game_from_the_start_round_trips():
+    match = Match()
+    match.start_game()
+    random_game(match, 60, seed=1)
+    text, tags, read = round_trip(match)
+    assert 'FEN' not in tags and text.split('\n\n')[1].startswith('1. ')
+    assert read.history == match.history
+    assert read.board.zobrist == match.board.zobrist
+
+
+def test_game_from_a_fen_round_trips():
+    match = Match()
+    match.start_game()
+    setup_match(match, FEN)
+    capture = next(move for move in sorted(match.current_player.get_all_possible_moves(match.board))
+                   if abs(move[1][0] - move[0][0]) == 2 and match.board.get_piece(
+                       (move[0][0] + move[1][0]) // 2, (move[0][1] + move[1][1]) // 2) is not None)
+    assert match.make_move(*capture[0], *capture[1])
+    random_game(match, 10, seed=2)
+    text, tags, read = round_trip(match)
+    assert tags['FEN'] == FEN
+    # White moves first from this position, so the movetext opens with '1...' and a capture
+    movetext = text.split('\n\n')[1].split()
+    assert movetext[0] == '1...' and 'x' in movetext[1]
+    assert read.history == match.history
+    assert read.board.zobrist == match.board.zobrist
+    assert read.get_current_player_color() == match.get_current_player_color()
@@ -0,0 +1,31 @@
+"""Perft counts of every board storage against benchmarks/perft_reference.json.
+
+Each stored position is counted on the list, bitboard and array boards to the
+deepest stored depth under MAX_NODES, timed with the pytest-benchmark fixture;
+the shallower stored depths are checked once without timing.
+
+    python -m pytest tests/test_perft.py                      # check and time
+    python -m pytest tests/test_perft.py --benchmark-disable  # check only
+"""
+import pytest
+
+from benchmarks.perft import BOARD_CLASSES, load_reference, perft, setup_position
+
+MAX_NODES = 50000
+POSITIONS = load_reference()['positions']
+
+
+@pytest.mark.parametrize('position', POSITIONS, ids=[position['name'] for position in POSITIONS])
+@pytest.mark.parametrize('board_name', list(BOARD_CLASSES))
+def test_perft(benchmark, board_name, position):
+    board_class = BOARD_CLASSES[board_name]
+    counts = [count for count in position['counts'] if count <= MAX_NODES] or position['counts'][:1]
+    for depth, expected in enumerate(counts[:-1], 1):
+        board, color = setup_position(board_class, position)
+        assert perft(board, color, depth) == expected, f"depth {depth}"
+
+    depth = len(counts)
+    board, color = setup_position(board_class, position)
+    nodes = benchmark(perft, board, color, depth)
+    assert nodes == counts[-1], f"depth {depth}"
+    benchmark.extra_info['nodes'] = nodes
@@ -0,0 +1,60 @@
+"""selfplay.py outputs: resuming keeps the finished games and refuses other settings."""
+import json
+
+import pytest
+
+import selfplay
+from src.models.GameArchive import ArchiveReader
+from src.models.SelfPlay import RandomPolicy, play_game
+
+METADATA = {'white': 'random', 'black': 'random', 'seed': 3, 'games': 4, 'max_plies': 40}
+
+
+def write_games(output, numbers):
+    for number in numbers:
+        winner, moves, codes = play_game(RandomPolicy(), RandomPolicy(), (3 << 32) + number, 40)
+        output.write(number, (3 << 32) + number, winner, selfplay.format_moves(moves), codes)
+
+
+@pytest.mark.parametrize('name', ['games.jsonl', 'games.ckga'])
+def test_resume_keeps_the_games_of_the_same_run(tmp_path, name):
+    path = str(tmp_path / name)
+    output_class = selfplay.JsonlOutput if name.endswith('.jsonl') else selfplay.ArchiveOutput
+    output = output_class(path, METADATA, resume=False)
+    write_games(output, [1, 0])
+    output.close()
+    if name.endswith('.jsonl'):
+        # Simulate a crash in the middle of the next game
+        with open(path, 'a') as file:
+            file.write('{"game": 2, "se')
+
+    output = output_class(path, dict(METADATA), resume=True)
+    assert output.done == {0, 1}
+    write_games(output, [2, 3])
+    output.close()
+
+    if name.endswith('.jsonl'):
+        with open(path) as file:
+            records = [json.loads(line) for line in file]
+        assert [record['game'] for record in records] == [1, 0, 2, 3]
+        assert records[0]['run'] == METADATA and all('run' not in record for record in records[1:])
+    else:
+        with ArchiveReader(path) as reader:
+            assert reader.metadata == METADATA and len(reader) == 4
+
+
+@pytest.mark.parametrize('name', ['games.jsonl', 'games.ckga'])
+@pytest.mark.parametrize('change', [{'black': 'greedy'}, {'seed': 4}, {'games': 10}])
+def test_resume_refuses_other_settings(tmp_path, name, change):
+    path = str(tmp_path / name)
+    output_class = selfplay.JsonlOutput if name.endswith('.jsonl') else selfplay.ArchiveOutput
+    output = output_class(path, METADATA, resume=False)
+    write_games(output, [0])
+    output.close()
+    with open(path, 'rb') as file:
+        before = file.read()
+
+    with pytest.raises(ValueError, match=next(iter(change))):
+        output_class(path, {**METADATA, **change}, resume=True)
+    with open(path, 'rb') as file:
+        assert file.read() == before
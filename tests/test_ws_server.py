@@ -0,0 +1,26 @@
+"""WebSocket messages of ws_server (the server itself needs the optional websockets package)."""
+import json
+
+import ws_server
+from src.models.Match import Match
+
+
+def test_events_carry_the_version_after_the_snapshot():
+    match = Match()
+    match.start_game()
+    events = []
+    match.add_listener(lambda event: events.append(json.loads(ws_server.move_message(event))))
+    snapshot = json.loads(ws_server.snapshot_message(match))
+    assert match.make_move(2, 1, 3, 0) and match.make_move(5, 2, 4, 1)
+    assert [event['version'] for event in events] == [snapshot['version'] + 1, snapshot['version'] + 2]
+    assert events[-1]['version'] == match.version == json.loads(ws_server.snapshot_message(match))['version']
+    assert events[0]['from'] == 'B6' and events[0]['to'] == 'A5'
+
+
+def test_find_match_returns_the_lock_of_the_game():
+    key, match, lock = ws_server.find_match('/board')
+    assert key == ws_server.DEFAULT_GAME and lock is ws_server.api_server.game_lock
+    session = ws_server.sessions.create()
+    assert ws_server.find_match(f'/games/{session.game_id}') == (session.game_id, session.match, session.lock)
+    assert ws_server.find_match('/games/unknown') == (None, None, None)
+    ws_server.sessions.delete(session.game_id)
@@ -0,0 +1,172 @@
+"""Checkers API with WebSocket push.
+
+Runs the Flask API from api_server.py in a background thread and an asyncio
+WebSocket server next to it. Clients subscribe to a game and get a small event
+the moment a move is accepted, instead of polling GET /board:
+
+    ws://localhost:8765/board              the global game
+    ws://localhost:8765/games/<game_id>    a game created with POST /games
+
+On connect a client receives one snapshot, then one event per move, e.g.
+    {"type": "move", "from": "B6", "to": "A5", "captured": null, "promoted": false,
+     "current_player": "white", "game_over": false, "winner": null, "version": 2}
+
+Snapshots and events carry the game's version (Match.version, as in GET /board).
+A move accepted while the snapshot is being sent can be in it and arrive as an
+event too, so clients ignore events whose version is at or below the last
+snapshot's. A new snapshot (sent again when the global game is reset) replaces
+the client's board and version.
+
+Requires the optional 'websockets' package (pip install websockets).
+"""
+import asyncio
+import json
+import threading
+
+try:
+    from websockets.asyncio.server import serve, broadcast
+except ImportError:   # optional dependency, only needed for this server mode
+    serve = broadcast = None
+
+import api_server
+from api_server import app, sessions
+from src.models.Notation import position_to_chess
+
+DEFAULT_GAME = 'board'
+
+
+def move_message(event):
+    """Serialize a Match move event once, in the API's A1-H8 notation"""
+    captured = event['captured']
+    return json.dumps({
+        'type': 'move',
+        'from': position_to_chess(*event['from']),
+        'to': position_to_chess(*event['to']),
+        'captured': position_to_chess(*captured) if captured else None,
+        'promoted': event['promoted'],
+        'current_player': event['current_player'],
+        'game_over': event['game_over'],
+        'winner': event['winner'],
+        'version': event['version'],
+    })
+
+
+def snapshot_message(match):
+    """Serialize the whole game; called under the game's lock, so board and version agree"""
+    return json.dumps({
+        'type': 'snapshot',
+        'board': match.get_board_state(),
+        'current_player': match.get_current_player_color(),
+        'game_over': match.is_game_over(),
+        'winner': match.get_winner(),
+        'version': match.version,
+    })
+
+
+class Broadcaster:
+    """Fans Match move events out to the WebSocket subscribers of each game.
+
+    Moves are made on Flask threads; the event is serialized there once and handed
+    to the asyncio loop, which writes the same message to every subscriber. The
+    subscriber and watch tables belong to the loop: watch, unwatch, subscribe and
+    unsubscribe must only be called on it (other threads go through
+    loop.call_soon_threadsafe).
+    """
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.subscribers = {}   # game key -> set of connections
+        self.watched = {}       # game key -> (Match we listen to, its listener)
+
+    def watch(self, key, match):
+        if key in self.watched:
+            if self.watched[key][0] is match:
+                return
+            self.unwatch(key)
+        listener = lambda event: self.publish(key, move_message(event))
+        self.watched[key] = (match, listener)
+        match.add_listener(listener)
+
+    def unwatch(self, key):
+        match, listener = self.watched.pop(key)
+        match.remove_listener(listener)
+
+    def publish(self, key, message):
+        # Called from request threads
+        self.loop.call_soon_threadsafe(self._send, key, message)
+
+    def _send(self, key, message):
+        connections = self.subscribers.get(key)
+        if connections:
+            broadcast(connections, message)
+
+    def subscribe(self, key, connection):
+        self.subscribers.setdefault(key, set()).add(connection)
+
+    def unsubscribe(self, key, connection):
+        connections = self.subscribers.get(key)
+        if connections is not None:
+            connections.discard(connection)
+            if not connections:
+                del self.subscribers[key]
+                if key != DEFAULT_GAME:
+                    self.unwatch(key)
+
+
+def find_match(path):
+    """Game key, Match and the lock guarding it for a subscription path, or (None, None, None)"""
+    parts = path.strip('/').split('/')
+    if parts == [DEFAULT_GAME]:
+        return DEFAULT_GAME, api_server.game_match, api_server.game_lock
+    if len(parts) == 2 and parts[0] == 'games':
+        session = sessions.get(parts[1])
+        if session is not None:
+            return parts[1], session.match, session.lock
+    return None, None, None
+
+
+async def run(host='0.0.0.0', port=8765, ready=None):
+    if serve is None:
+        raise RuntimeError("WebSocket mode needs the 'websockets' package: pip install websockets")
+    broadcaster = Broadcaster(asyncio.get_running_loop())
+
+    def on_reset(match):
+        # Called on a Flask thread holding game_lock: the watch happens on the loop, before the snapshot is sent
+        broadcaster.loop.call_soon_threadsafe(broadcaster.watch, DEFAULT_GAME, match)
+        broadcaster.publish(DEFAULT_GAME, snapshot_message(match))
+
+    api_server.reset_hooks.append(on_reset)
+    broadcaster.watch(DEFAULT_GAME, api_server.game_match)
+
+    async def handler(connection):
+        key, match, lock = find_match(connection.request.path)
+        if match is None:
+            await connection.close(1008, 'unknown game')
+            return
+        broadcaster.watch(key, match)
+        broadcaster.subscribe(key, connection)
+        try:
+            with lock:
+                snapshot = snapshot_message(match)
+            await connection.send(snapshot)
+            await connection.wait_closed()
+        finally:
+            broadcaster.unsubscribe(key, connection)
+
+    async with serve(handler, host, port) as server:
+        if ready is not None:
+            ready(server, broadcaster)
+        await server.serve_forever()
+
+
+def main():
+    http = threading.Thread(target=app.run, kwargs={'host': '0.0.0.0', 'port': 5000, 'threaded': True}, daemon=True)
+    http.start()
+    print("Starting Checkers API Server with WebSocket push...")
+    print("API Documentation available at: http://localhost:5000/")
+    print("Subscribe at: ws://localhost:8765/board or ws://localhost:8765/games/<game_id>")
+    asyncio.run(run())
+
+
+if __name__ == '__main__':
+    main()